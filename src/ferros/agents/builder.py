@@ -2,9 +2,11 @@ import json
 import pathlib
 from typing import Any
 
-from agents import Agent, RunContextWrapper, Runner, custom_span
+from agents import Agent, RunContextWrapper, custom_span
 from agents.mcp import MCPServer
 
+from ferros.core.checkpoints import run_checkpointed
+from ferros.core.hedging import get_model
 from ferros.core.logging import get_logger
 from ferros.core.store import send_update
 from ferros.core.utils import get_settings
@@ -43,7 +45,7 @@ def get_builder(
     settings = get_settings()
     return Agent(
         name="Context Builder",
-        model=settings.context.model,
+        model=get_model(settings.context.model, settings.context.hedging),
         instructions=get_instructions,
         model_settings=settings.context.model_settings,
         tool_use_behavior="run_llm_again",
@@ -92,7 +94,9 @@ async def build_context(
         input = f"{context_input}\n\nUse the UUID: {plan_id} as the plan id."
         try:
             agent = get_builder(mcp_servers=[server])
-            result = await Runner.run(agent, input=input, max_turns=20)
+            result = await run_checkpointed(
+                agent, input, f"{plan_id}:{STEP_ID}", max_turns=20
+            )
             context: Context = result.final_output
             size = len(context.contexts)
             logger.info(f"✔ Context created with {size} items...")
@@ -0,0 +1,126 @@
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from ferros.agents.factory import get_agent_configs
+from ferros.agents.registry import get_registry
+from ferros.core.logging import get_logger
+from ferros.models.agents import AgentsConfig, AgentSDKConfig
+
+
+@dataclass(frozen=True, eq=False)
+class AgentCatalog:
+    """
+    A rendered snapshot of the agent registry used to build planner prompts.
+    Instances are compared and hashed by identity so they can key caches for
+    the lifetime of a registry snapshot.
+    """
+
+    agents: AgentsConfig
+    text: str
+    hash: str
+
+
+catalog: None | AgentCatalog = None
+generation: int = 0
+watching: bool = False
+lock = threading.Lock()
+
+
+def render_agent(config: AgentSDKConfig) -> str:
+    """
+    Render a single agent configuration for the planner prompt.
+
+    Args:
+        config (AgentSDKConfig): The agent configuration to render.
+
+    Returns:
+        str: The rendered agent entry.
+    """
+    name = config.name.strip().capitalize()
+    instructions = config.instructions.strip()
+    return (
+        f"--\n> "
+        f">**Agent Name**: {name}\n"
+        f">**Agent SDK**: {config.sdk}\n"
+        f">**Agent Version**: {config.version}\n"
+        f">**Agent Instruction**: {instructions}\n"
+        f"--\n"
+    )
+
+
+def build_catalog(configs: AgentsConfig) -> AgentCatalog:
+    """
+    Build the catalog text and hash for a set of agent configurations.
+
+    The agents are sorted by registry key so the text and hash do not depend
+    on the order the registry returns them in.
+
+    Args:
+        configs (AgentsConfig): The agent configurations to render.
+
+    Returns:
+        AgentCatalog: The rendered catalog.
+    """
+    agents = sorted(configs.agents, key=lambda x: x.key)
+    text = "\n".join(render_agent(config) for config in agents)
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return AgentCatalog(agents=AgentsConfig(agents=agents), text=text, hash=digest)
+
+
+def invalidate_catalog(message: Any = None) -> None:
+    """
+    Drop the cached catalog so the next lookup rebuilds it from the registry.
+    This is registered as the callback for the registry update channel.
+
+    Args:
+        message (Any): The registry update message, if any.
+    """
+    global catalog, generation
+    with lock:
+        catalog = None
+        generation += 1
+    get_logger(__name__).info(f"Agent catalog invalidated: {message}")
+
+
+def get_catalog() -> AgentCatalog:
+    """
+    Get the agent catalog for the current registry snapshot, building it on
+    first use and after every registry update.
+
+    Returns:
+        AgentCatalog: The cached agent catalog.
+    """
+    global catalog, watching
+    with lock:
+        if not watching:
+            get_registry().watch(invalidate_catalog)
+            watching = True
+        if catalog is not None:
+            return catalog
+        started = generation
+
+    built = build_catalog(get_agent_configs())
+    with lock:
+        # only keep the snapshot if no update arrived while it was being built
+        if generation == started:
+            catalog = built
+    get_logger(__name__).info(
+        f"Agent catalog built with {len(built.agents.agents)} agents "
+        f"(hash {built.hash[:12]})"
+    )
+    return built
+
+
+def get_catalog_hash() -> str:
+    """
+    Get the hash of the current registry snapshot.
+
+    Returns:
+        str: The SHA256 hash of the rendered agent catalog.
+    """
+    return get_catalog().hash
+
+
+__all__ = ["AgentCatalog", "get_catalog", "get_catalog_hash", "invalidate_catalog"]
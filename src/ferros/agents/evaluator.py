@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import asyncio
+import math
 import pathlib
+import statistics
 from typing import Any
 
 import loguru
-from agents import Agent, RunContextWrapper, Runner, custom_span
+from agents import Agent, RunContextWrapper, custom_span
 from agents.mcp import MCPServer
-from tenacity import retry, stop_after_attempt, wait_random_exponential
 
+from ferros.core.budget import BudgetExceeded
+from ferros.core.checkpoints import run_checkpointed
+from ferros.core.deadlines import deadline
+from ferros.core.hedging import get_model
 from ferros.core.logging import get_logger
+from ferros.core.snapshot import update_snapshot
 from ferros.core.store import send_update
 from ferros.core.utils import get_settings
 from ferros.models.agents import AgentsConfig
@@ -42,13 +48,16 @@ def get_instructions(
 def get_evaluator(
     tools: list[Any] | None = None,
     mcp_servers: list[MCPServer] | None = None,
+    model: str | None = None,
 ) -> Agent[AgentsConfig]:
     """
     Get the evaluator agent with the appropriate instructions.
 
     Args:
-        context (RunContextWrapper[AgentsConfig]): The run context.
-        agent (Agent[AgentsConfig]): The agent instance.
+        tools (list[Any] | None): The tools of the agent.
+        mcp_servers (list[MCPServer] | None): The MCP servers of the agent.
+        model (str | None): The model of the agent. Defaults to the evaluator
+            model.
 
     Returns:
         Agent[AgentsConfig]: The evaluator agent.
@@ -57,7 +66,7 @@ def get_evaluator(
     return Agent(
         name="Evaluator",
         instructions=get_instructions,
-        model=settings.evaluator.model,
+        model=get_model(model or settings.evaluator.model, settings.evaluator.hedging),
         tool_use_behavior="run_llm_again",
         model_settings=settings.evaluator.model_settings,
         output_type=EvaluationResult,
@@ -67,13 +76,20 @@ def get_evaluator(
 
 
 def process_evals(
-    evals: list[EvaluationResult | None], checks: int, logger: loguru.Logger
+    evals: list[EvaluationResult | None],
+    checks: int,
+    logger: loguru.Logger,
+    minimum: int = MINIMUM_EVALUATION_CHECKS,
 ) -> EvaluationResults:
     """
     Process the evaluation results to ensure they meet the minimum checks.
 
     Args:
-        evaluations (EvaluationResults): The evaluation results to process.
+        evals (list[EvaluationResult | None]): The results of the checks, None
+            for the failed checks.
+        checks (int): The number of checks run.
+        logger (loguru.Logger): The logger.
+        minimum (int): The minimum number of successful checks.
 
     Returns:
         EvaluationResults: The processed evaluation results.
@@ -89,29 +105,77 @@ def process_evals(
             "All evaluation runs failed. Please check the evaluation results."
         )
 
-    if len(success) < MINIMUM_EVALUATION_CHECKS:
+    if len(success) < minimum:
         logger.error(
             f"Not enough successful evaluation runs found: {len(success)}. "
-            f"Expected at least {MINIMUM_EVALUATION_CHECKS} successful runs."
+            f"Expected at least {minimum} successful runs."
         )
         raise ValueError(
             f"Not enough successful evaluation runs found: {len(success)}. "
-            f"Expected at least 3 successful runs."
+            f"Expected at least {minimum} successful runs."
         )
 
     evaluations: EvaluationResults = EvaluationResults(results=success)
     return evaluations
 
 
+def is_decisive(evaluations: EvaluationResults) -> bool:
+    """
+    Check if the results of the cheap evaluation checks of a cascade agree and
+    are far enough from the threshold to decide the evaluation.
+
+    Args:
+        evaluations (EvaluationResults): The results of the cheap checks.
+
+    Returns:
+        bool: True if the evaluator model does not need to run.
+    """
+    settings = get_settings().evaluation
+    scores = [result.score for result in evaluations.results]
+    threshold = evaluations.threshold
+    return (
+        len({score >= threshold for score in scores}) == 1
+        and max(scores) - min(scores) <= settings.cascade_spread
+        and abs(evaluations.score - threshold) >= settings.cascade_margin
+    )
+
+
+def is_conclusive(evaluations: EvaluationResults) -> bool:
+    """
+    Check if the mean score of the evaluation checks is above or below the
+    threshold with the configured confidence.
+
+    Args:
+        evaluations (EvaluationResults): The results of the checks so far.
+
+    Returns:
+        bool: True if running more checks would not change the outcome.
+    """
+    scores = [result.score for result in evaluations.results]
+    if len(scores) < 2:
+        return False
+    error = math.sqrt(statistics.variance(scores) / len(scores))
+    distance = abs(evaluations.score - evaluations.threshold)
+    return distance > get_settings().evaluation.confidence * error
+
+
 async def run_eval(
-    plan_id: str, revision: int, server: MCPServer, check_num: int
+    plan_id: str,
+    revision: int,
+    server: MCPServer,
+    check_num: int,
+    model: str | None = None,
 ) -> EvaluationResult | None:
     """
     Run the evaluation process for a given plan and revision.
 
     Args:
-        user_input (str): The user input for the evaluation.
+        plan_id (str): The ID of the plan.
+        revision (int): The revision of the plan.
         server (MCPServer): The MCP server to use for evaluation.
+        check_num (int): The number of the check.
+        model (str | None): The model of the evaluator. Defaults to the
+            evaluator model.
 
     Returns:
         RunResult | BaseException: The result of the evaluation run.
@@ -133,8 +197,17 @@ async def run_eval(
         try:
             await send_update(plan_id, STEP_ID + check_num, AGENT_NAME, "running")
             logger.info(f"Running evaluation for plan: {plan_id}, revision: {revision}")
-            agent = get_evaluator(tools=[evaluation_check_tool], mcp_servers=[server])
-            result = await Runner.run(agent, input=user_input, max_turns=20)
+            agent = get_evaluator(
+                tools=[evaluation_check_tool], mcp_servers=[server], model=model
+            )
+            result = await run_checkpointed(
+                agent,
+                user_input,
+                f"{plan_id}:{STEP_ID + check_num}:{revision}",
+                # failed checks are retried from their checkpoint on their own
+                attempts=get_settings().evaluation.check_retries + 1,
+                max_turns=20,
+            )
             eval = result.final_output
             logger.info(
                 f"Evaluation run completed for plan: {plan_id}, "
@@ -142,6 +215,9 @@ async def run_eval(
             )
             await send_update(plan_id, STEP_ID + check_num, AGENT_NAME, "completed")
             return eval
+        except BudgetExceeded:
+            await send_update(plan_id, STEP_ID + check_num, AGENT_NAME, "failed")
+            raise
         except Exception as e:
             await send_update(plan_id, STEP_ID + check_num, AGENT_NAME, "failed")
             logger.error(
@@ -151,37 +227,85 @@ async def run_eval(
             return None
 
 
-@retry(
-    stop=stop_after_attempt(3),
-    wait=wait_random_exponential(multiplier=1, max=15),
-    reraise=True,
-)
 async def evaluate_result(
     plan: Plan,
     revision: int,
     server: MCPServer,
-    checks: int = MINIMUM_EVALUATION_CHECKS,
+    checks: int | None = None,
 ) -> EvaluationResults:
     """
     Evaluate the latest writer or editor result for a given plan and revision.
+    With a cascade model configured, the checks run on the cascade model first
+    and only run on the evaluator model when their results are not decisive,
+    in which case the cheap and the escalated results are combined.
+    In the adaptive mode, checks run in batches until the score is confidently
+    above or below the threshold, or the maximum number of checks ran. Failed
+    checks are retried on their own, keeping the results of the other checks,
+    until their retries or the evaluation deadline run out.
 
     Args:
         plan (Plan): The plan to evaluate.
         revision (int): The revision number of the plan.
         server (MCPServer): The MCP server to use for evaluation.
-        checks (int, optional): The number of evaluation checks to perform.
-            Defaults to 3.
+        checks (int | None): The number of evaluation checks to perform in
+            the fixed mode. Defaults to the configured number of checks.
     Returns:
         EvaluationResults: The results of the evaluation.
     """
 
     logger = get_logger(__name__)
 
-    async def run_eval_func(check_num: int) -> EvaluationResult | None:
-        return await run_eval(
-            plan_id=plan.id, revision=revision, server=server, check_num=check_num
-        )
+    settings = get_settings().evaluation
+    cascade_model = settings.cascade_model
+    adaptive = settings.mode == "adaptive"
+    checks = checks or settings.checks
+    if adaptive:
+        checks = settings.max_checks
+
+    async def run_batch(
+        check_nums: range, model: str | None
+    ) -> list[EvaluationResult | None]:
+        futures = [
+            run_eval(
+                plan_id=plan.id,
+                revision=revision,
+                server=server,
+                check_num=check_num,
+                model=model,
+            )
+            for check_num in check_nums
+        ]
+        return await asyncio.gather(*futures)
 
+    async def run_checks(
+        first: int,
+        model: str | None = None,
+        prior: list[EvaluationResult] | None = None,
+    ) -> EvaluationResults:
+        # the results of earlier checks, e.g. the cheap checks of a cascade,
+        # are kept and count towards the minimum and the confidence
+        prior = prior or []
+        if not adaptive:
+            results = await run_batch(range(first, first + checks), model)
+            results = [*prior, *results]
+            minimum = min(checks, MINIMUM_EVALUATION_CHECKS)
+            return process_evals(results, len(results), logger, minimum)
+
+        results = []
+        while len(results) < checks:
+            start = first + len(results)
+            size = min(settings.batch_size, checks - len(results))
+            results += await run_batch(range(start, start + size), model)
+            success = prior + [r for r in results if r is not None]
+            if len(success) >= settings.min_checks and is_conclusive(
+                EvaluationResults(results=success)
+            ):
+                break
+        logger.info(f"Adaptive evaluation of plan {plan.id} ran {len(results)} checks")
+        results = [*prior, *results]
+        return process_evals(results, len(results), logger, settings.min_checks)
+
+    timeout = get_settings().timeouts.evaluation
     with custom_span(
         name="Evaluation",
         data={"Plan Id": plan.id, "Revision": revision, "Checks": checks},
@@ -189,12 +313,31 @@ async def evaluate_result(
         await send_update(plan.id, STEP_ID, AGENT_NAME, "running")
         logger.info(
             f"Evaluating results for plan: {plan.id}, revision: {revision}, "
-            f"checks: {checks}"
+            f"checks: {'up to ' if adaptive else ''}{checks}"
         )
         try:
-            futures = [run_eval_func(check_num=i) for i in range(1, checks + 1)]
-            results: list[EvaluationResult | None] = await asyncio.gather(*futures)
-            evaluations = process_evals(results, checks, logger)
+            evaluations: EvaluationResults | None = None
+            async with deadline("Evaluation", timeout):
+                if cascade_model:
+                    try:
+                        evaluations = await run_checks(1, model=cascade_model)
+                    except ValueError:
+                        pass  # too few cheap checks succeeded, escalate
+                    if evaluations is None or not is_decisive(evaluations):
+                        logger.info(
+                            f"Escalating evaluation of plan {plan.id} to the "
+                            f"evaluator model {get_settings().evaluator.model}"
+                        )
+                        prior = evaluations.results if evaluations else []
+                        evaluations = await run_checks(checks + 1, prior=prior)
+                else:
+                    evaluations = await run_checks(1)
+            update_snapshot(
+                plan.id,
+                score=evaluations.score,
+                threshold=evaluations.threshold,
+                passed=evaluations.passed,
+            )
             logger.info(
                 f"Evaluation results for plan {plan.id}, revision {revision}: "
                 f"Score: {evaluations.score:0.2f}% - "
@@ -3,7 +3,12 @@ import asyncio
 from agents import custom_span
 from agents.mcp import MCPServer
 
+from ferros.core.deadlines import DeadlineExceeded, deadline, remaining
+from ferros.core.finalize import get_output_step
 from ferros.core.logging import get_logger
+from ferros.core.snapshot import record_step
+from ferros.core.store import send_update
+from ferros.core.utils import get_settings
 from ferros.models.agents import SDKType
 from ferros.models.plan import Plan, PlanStep
 from ferros.runtime.openai import run as run_openai_agent
@@ -21,7 +26,14 @@ class TaskManager:
         """Set a new plan for the task manager."""
         self.plan = plan
         self.dependencies = {s.id: set(s.depends_on) for s in plan.steps}
-        self.completed = {s.id for s in plan.steps if s.status == "completed"}
+        self.completed = {s.id for s in plan.steps if s.status != "pending"}
+        # only the output step is user-facing and streams partial results
+        self.streamed: int | None = None
+        if get_settings().streaming.partial_results:
+            try:
+                self.streamed = get_output_step(plan).id
+            except ValueError:
+                pass
 
     async def run_step(self, step: PlanStep) -> int:
         # run the step
@@ -30,10 +42,46 @@ class TaskManager:
             f"{step.id}/{len(self.plan.steps)} "
             f"for plan {self.plan.id[:8]:8s}..."
         )
+        record_step(self.plan.id, step.id, step.agent_name, "running")
+        timeouts = get_settings().timeouts
+        for attempt in range(timeouts.step_retries + 1):
+            try:
+                async with deadline(f"Step {step.id}", timeouts.step):
+                    await self.run_agent(step)
+                break
+            except DeadlineExceeded as e:
+                left = remaining()
+                retry = attempt < timeouts.step_retries and (left is None or left > 0)
+                await send_update(
+                    self.plan.id,
+                    step.id,
+                    step.agent_name,
+                    "running" if retry else "failed",
+                    message=f"{e}, retrying." if retry else str(e),
+                )
+                if not retry:
+                    raise
+        # update the completed steps
+        step.status = "completed"
+        self.completed.add(step.id)
+        record_step(self.plan.id, step.id, step.agent_name, "completed")
+        self.logger.info(message)
+        return step.id
+
+    async def run_agent(self, step: PlanStep) -> None:
+        """
+        Run the agent of a plan step with its SDK.
+
+        Args:
+            step (PlanStep): The step to run.
+        """
         match step.agent_sdk:
             case SDKType.OPENAI:
                 await run_openai_agent(
-                    plan_id=self.plan.id, step=step, mcp_servers=[self.server]
+                    plan_id=self.plan.id,
+                    step=step,
+                    mcp_servers=[self.server],
+                    stream=step.id == self.streamed,
                 )
             case SDKType.GOOGLE:
                 raise NotImplementedError(
@@ -49,18 +97,16 @@ class TaskManager:
                 )
             case _:
                 raise ValueError("Unsupported agent SDK")
-        # update the completed steps
-        self.plan.steps[step.id - 1].status = "completed"
-        self.completed.add(step.id)
-        self.logger.info(message)
-        return step.id
 
     async def run(self, plan: Plan, revision: int) -> None:
         self.set_plan(plan)
         pending = {s.id: s for s in self.plan.steps if s.status == "pending"}
+        reused = len([s for s in self.plan.steps if s.status == "reused"])
         with custom_span("Execution", data={"Plan Id": self.plan.id}):
             self.logger.info(
-                f"Executing plan {self.plan.id} with goal: {self.plan.goal[:30]}..."
+                f"Executing plan {self.plan.id} with goal: {self.plan.goal[:30]}... "
+                f"({len(pending)} of {len(self.plan.steps)} steps pending, "
+                f"{reused} reused)"
             )
             while pending:
                 ready = [
@@ -74,7 +120,14 @@ class TaskManager:
                     )
                     raise RuntimeError("Circular dependency detected!")
 
-                done = await asyncio.gather(*(self.run_step(s) for s in ready))
+                tasks = [asyncio.create_task(self.run_step(s)) for s in ready]
+                try:
+                    done = await asyncio.gather(*tasks)
+                except BaseException:
+                    # do not leave the other steps running after a failure
+                    for task in tasks:
+                        task.cancel()
+                    raise
                 for sid in done:
                     pending.pop(sid, None)
 
@@ -0,0 +1,153 @@
+import hashlib
+import re
+from collections import Counter
+from pathlib import PurePosixPath
+from urllib.parse import urlsplit
+
+from ferros.agents.catalog import get_catalog_hash
+from ferros.core.cache import TTLCache
+from ferros.core.logging import get_logger
+from ferros.core.metrics import incr, set_gauge
+from ferros.core.utils import get_settings
+from ferros.models.plan import Plan
+
+ContextInput = str | list[str] | dict[str, str] | None
+
+plan_cache: None | TTLCache[str, Plan] = None
+
+
+def normalize_goal(goal: str) -> str:
+    """
+    Normalize a goal so that formatting differences do not change the cache key.
+
+    Args:
+        goal (str): The goal of the task.
+
+    Returns:
+        str: The lower-cased goal with collapsed whitespace.
+    """
+    return re.sub(r"\s+", " ", goal).strip().lower()
+
+
+def context_signature(contexts: ContextInput) -> str:
+    """
+    Get the shape of the task contexts, i.e. the scheme and file extension of
+    each item, ignoring the actual locations of the documents.
+
+    Args:
+        contexts (ContextInput): The context input of the task.
+
+    Returns:
+        str: The sorted context shape signature.
+    """
+    if isinstance(contexts, str):
+        contexts = contexts.split(",")
+    elif isinstance(contexts, dict):
+        contexts = list(contexts.values())
+
+    shapes: Counter[str] = Counter()
+    for context in contexts or []:
+        context = context.strip()
+        parts = urlsplit(context)
+        suffix = PurePosixPath(parts.path).suffix.lower()
+        shapes[f"{parts.scheme.lower()}:{suffix}"] += 1
+    return ",".join(f"{shape}*{count}" for shape, count in sorted(shapes.items()))
+
+
+def plan_cache_key(goal: str, contexts: ContextInput) -> str:
+    """
+    Generate the plan cache key for a goal against the current registry snapshot.
+
+    Args:
+        goal (str): The goal of the task.
+        contexts (ContextInput): The context input of the task.
+
+    Returns:
+        str: The plan cache key.
+    """
+    h = hashlib.sha256()
+    parts = (normalize_goal(goal), context_signature(contexts), get_catalog_hash())
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def rewrite_plan(plan: Plan, plan_id: str) -> Plan:
+    """
+    Rewrite a stored plan for a new plan id with all steps pending.
+
+    Args:
+        plan (Plan): The stored plan.
+        plan_id (str): The new plan id.
+
+    Returns:
+        Plan: A copy of the plan for the new plan id.
+    """
+    new_plan = plan.model_copy(deep=True)
+    new_plan.id = plan_id
+    for step in new_plan.steps:
+        step.prompt = step.prompt.replace(plan.id, plan_id)
+        step.status = "pending"
+        step.revision = 1
+    return new_plan
+
+
+def get_plan_cache() -> TTLCache[str, Plan] | None:
+    """
+    Get the process-wide plan cache if plan caching is enabled.
+
+    Returns:
+        TTLCache[str, Plan] | None: The plan cache or None if disabled.
+    """
+    global plan_cache
+    settings = get_settings().planning
+    if not settings.cache_enabled:
+        return None
+    if plan_cache is None:
+        plan_cache = TTLCache(settings.cache_max_size, settings.cache_ttl)
+    return plan_cache
+
+
+def lookup_plan(plan_id: str, goal: str, contexts: ContextInput) -> Plan | None:
+    """
+    Look up a cached plan for the goal and rewrite it for the given plan id.
+
+    Args:
+        plan_id (str): The id of the new plan.
+        goal (str): The goal of the task.
+        contexts (ContextInput): The context input of the task.
+
+    Returns:
+        Plan | None: The rewritten plan or None on a cache miss.
+    """
+    cache = get_plan_cache()
+    if cache is None:
+        return None
+    plan = cache.get(plan_cache_key(goal, contexts))
+    incr("plan_cache.hits" if plan else "plan_cache.misses")
+    set_gauge("plan_cache.hit_rate", cache.hit_rate)
+    get_logger(__name__).info(
+        f"Plan cache {'hit' if plan else 'miss'} for plan {plan_id} "
+        f"(hit rate {cache.hit_rate:0.2%})"
+    )
+    return rewrite_plan(plan, plan_id) if plan else None
+
+
+def store_plan(plan: Plan, goal: str, contexts: ContextInput) -> None:
+    """
+    Store a plan in the cache for the goal and context shape.
+
+    Args:
+        plan (Plan): The plan to store.
+        goal (str): The goal of the task.
+        contexts (ContextInput): The context input of the task.
+    """
+    cache = get_plan_cache()
+    if cache is None:
+        return
+    cache.put(plan_cache_key(goal, contexts), plan.model_copy(deep=True))
+    set_gauge("plan_cache.size", len(cache))
+
+
+__all__ = ["lookup_plan", "store_plan"]
@@ -1,15 +1,29 @@
+import asyncio
 import pathlib
+from collections import Counter
+from functools import lru_cache
 from typing import Any
 
-from agents import Agent, RunContextWrapper, Runner, custom_span
+from agents import Agent, RunContextWrapper, custom_span
 from agents.mcp import MCPServer
 
-from ferros.agents.factory import get_agent_configs
+from ferros.agents.catalog import AgentCatalog, get_catalog
+from ferros.agents.plan_cache import ContextInput, lookup_plan, rewrite_plan
+from ferros.agents.templates import (
+    TemplateMatch,
+    find_templates,
+    format_templates,
+    reusable_template,
+)
+from ferros.core.checkpoints import run_checkpointed
+from ferros.core.hedging import get_model
 from ferros.core.logging import get_logger
+from ferros.core.snapshot import update_snapshot
 from ferros.core.store import send_update
 from ferros.core.utils import get_settings
 from ferros.models.agents import AgentsConfig
-from ferros.models.plan import Plan
+from ferros.models.plan import Plan, PlanStep
+from ferros.tools.mcps import save_plan
 
 STEP_ID = 60000
 AGENT_NAME = "planner"
@@ -17,6 +31,24 @@ PLANNER_MESSAGE = "✔ Task plan created with {num_of_steps} steps..."
 REPLANNER_MESSAGE = "✔ Task re-planning created with {num_of_steps} steps..."
 
 
+@lru_cache(maxsize=8)
+def render_prompt(prompt_file: str, catalog: AgentCatalog) -> str:
+    """
+    Render a planner prompt with the agent catalog. The result is cached per
+    prompt file and registry snapshot.
+
+    Args:
+        prompt_file (str): The name of the prompt file.
+        catalog (AgentCatalog): The agent catalog snapshot.
+
+    Returns:
+        str: The rendered planner prompt.
+    """
+    prompts_home = pathlib.Path(__file__).parent / "prompts"
+    planner_prompt = open(prompts_home / prompt_file).read()
+    return planner_prompt.format(agent_list=catalog.text)
+
+
 def get_instructions(
     replanner: bool,
     context: RunContextWrapper[AgentsConfig],
@@ -28,23 +60,94 @@ def get_instructions(
     Returns:
         str: The instructions for the planner agent.
     """
-    text: list[str] = []
-    for agent_config in context.context.agents:
-        name = agent_config.name.strip().capitalize()
-        instructions = agent_config.instructions.strip()
-        string = (
-            f"--\n> "
-            f">**Agent Name**: {name}\n"
-            f">**Agent SDK**: {agent_config.sdk}\n"
-            f">**Agent Version**: {agent_config.version}\n"
-            f">**Agent Instruction**: {instructions}\n"
-            f"--\n"
+    prompt_file = "planner.md"
+    if replanner:
+        incremental = get_settings().planning.replan_mode == "incremental"
+        prompt_file = "re-planner-incremental.md" if incremental else "re-planner.md"
+    return render_prompt(prompt_file, get_catalog())
+
+
+def merge_plan(previous: Plan, revised: Plan, revision: int) -> Plan:
+    """
+    Merge a revised plan into the previous plan for incremental re-planning.
+    The completed previous steps are kept as they were executed, and the ones
+    the new steps depend on are marked as reused. Previous steps that did not
+    run, e.g. after an execution timeout, stay pending and run again with the
+    new steps of the revision.
+
+    Args:
+        previous (Plan): The plan executed in the previous revision.
+        revised (Plan): The plan returned by the re-planner.
+        revision (int): The revision number of the revised plan.
+
+    Returns:
+        Plan: The merged plan.
+    """
+    logger = get_logger(__name__)
+    known = {s.id: s for s in previous.steps}
+    new_steps = [
+        s.model_copy()
+        for s in revised.steps
+        if s.id not in known
+        or (s.agent_name, s.prompt) != (known[s.id].agent_name, known[s.id].prompt)
+    ]
+    if not new_steps:
+        logger.warning(
+            f"Re-planner added no new steps to plan {previous.id}, "
+            "running the revised plan again."
+        )
+        steps = [
+            s.model_copy(update={"status": "pending", "revision": revision})
+            for s in revised.steps
+        ]
+        return Plan(id=previous.id, goal=previous.goal, steps=steps)
+
+    # steps that reuse the id of a different previous step get a new id
+    next_id = max(set(known) | {s.id for s in new_steps}) + 1
+    renumbered: dict[int, int] = {}
+    for step in new_steps:
+        if step.id in known:
+            renumbered[step.id] = next_id
+            step.id = next_id
+            next_id += 1
+    if renumbered:
+        logger.warning(
+            f"Re-planner reused step ids of plan {previous.id}, renumbered {renumbered}"
         )
-        text.append(string)
-    prompt_file = "re-planner.md" if replanner else "planner.md"
-    prompts_home = pathlib.Path(__file__).parent / "prompts"
-    planner_prompt = open(prompts_home / prompt_file).read()
-    return planner_prompt.format(agent_list="\n".join(text))
+
+    ids = set(known) | {s.id for s in new_steps}
+    for step in new_steps:
+        step.status = "pending"
+        step.revision = revision
+        step.depends_on = [
+            renumbered.get(i, i) for i in step.depends_on if renumbered.get(i, i) in ids
+        ]
+
+    # walk the dependencies of the new steps back into the previous plan
+    reused: set[int] = set()
+    stack = [i for s in new_steps for i in s.depends_on if i in known]
+    while stack:
+        step_id = stack.pop()
+        if step_id not in reused:
+            reused.add(step_id)
+            stack.extend(known[step_id].depends_on)
+
+    steps: list[PlanStep] = []
+    for step in previous.steps:
+        status = step.status
+        if status != "pending":
+            status = "reused" if step.id in reused else "completed"
+        steps.append(step.model_copy(update={"status": status}))
+    counts = Counter(s.status for s in steps)
+    logger.info(
+        f"Incremental re-plan for {previous.id}: {len(new_steps)} new steps, "
+        f"{counts['reused']} reused steps, {counts['pending']} unfinished steps"
+    )
+    return Plan(
+        id=previous.id,
+        goal=previous.goal,
+        steps=sorted(steps + new_steps, key=lambda x: x.id),
+    )
 
 
 def get_planner(
@@ -72,7 +175,7 @@ def get_planner(
     return Agent(
         name="Planner" if not replanner else "Re-Planner",
         instructions=_instructions,
-        model=settings.planner.model,
+        model=get_model(settings.planner.model, settings.planner.hedging),
         tool_use_behavior="run_llm_again",
         model_settings=settings.planner.model_settings,
         output_type=Plan,
@@ -82,16 +185,28 @@ def get_planner(
 
 
 async def plan_task(
-    plan_id: str, revision: int, prompt: str, server: MCPServer
+    plan_id: str,
+    revision: int,
+    prompt: str,
+    server: MCPServer,
+    context_input: ContextInput = None,
+    previous: Plan | None = None,
 ) -> Plan:
     """
-    Plan the task using the planner agent.
+    Plan the task using the planner agent. First revisions are served from
+    the plan cache when a plan for the same goal, context shape and registry
+    snapshot is available. Otherwise similar successful plans are reused
+    directly or given to the planner as templates. In incremental re-planning
+    mode, later revisions are merged into the previous plan so only the
+    changed steps run.
 
     Args:
         plan_id (str): The unique identifier for the plan.
         revision (int): The revision number for the plan.
         prompt (str): The prompt for the planner agent.
         server (MCPServerSse): The MCP server to fetch the output from.
+        context_input (ContextInput): The context input for the task.
+        previous (Plan | None): The plan executed in the previous revision.
 
     Returns:
         Plan: The generated plan object with the steps for the task.
@@ -104,11 +219,50 @@ async def plan_task(
         await send_update(plan_id, STEP_ID, AGENT_NAME, "running")
         logger.info(f"Planning task {plan_id} with goal: {input[:30]}...")
         try:
-            context = get_agent_configs()
+            cached: Plan | None = None
+            templates: list[TemplateMatch] = []
+            if revision == 1:
+                cached = lookup_plan(plan_id, prompt, context_input)
+            if revision == 1 and not cached:
+                # the index is read from disk and scanned, keep it off the loop
+                templates = await asyncio.to_thread(find_templates, prompt)
+                reusable = reusable_template(templates, context_input)
+                if reusable:
+                    logger.info(
+                        f"Reusing template plan {reusable.plan.id} for plan {plan_id} "
+                        f"(similarity {reusable.similarity:0.2f})"
+                    )
+                    cached = rewrite_plan(reusable.plan, plan_id)
+            if cached:
+                await save_plan(cached, server)
+                update_snapshot(
+                    plan_id, plan=cached.model_dump(mode="json"), revision=revision
+                )
+                logger.info(PLANNER_MESSAGE.format(num_of_steps=len(cached.steps)))
+                await send_update(plan_id, STEP_ID, AGENT_NAME, "completed")
+                return cached
+
+            if templates:
+                input = f"{input}\n\n{format_templates(templates)}"
+
+            context = get_catalog().agents
             message = REPLANNER_MESSAGE if revision > 1 else PLANNER_MESSAGE
             agent = get_planner(mcp_servers=[server], replanner=revision > 1)
-            result = await Runner.run(agent, input=input, max_turns=20, context=context)
+            result = await run_checkpointed(
+                agent,
+                input,
+                f"{plan_id}:{STEP_ID}:{revision}",
+                max_turns=20,
+                context=context,
+            )
             plan: Plan = result.final_output
+            incremental = get_settings().planning.replan_mode == "incremental"
+            if previous and incremental and revision > 1:
+                plan = merge_plan(previous, plan, revision)
+                await save_plan(plan, server)
+            update_snapshot(
+                plan_id, plan=plan.model_dump(mode="json"), revision=revision
+            )
             num_of_steps = len([s for s in plan.steps if s.revision == revision])
             logger.info(message.format(num_of_steps=num_of_steps))
             await send_update(plan_id, STEP_ID, AGENT_NAME, "completed")
@@ -1,14 +1,23 @@
+import asyncio
+
 from agents import custom_span, gen_trace_id, trace
 
 from ferros.agents.builder import build_context
 from ferros.agents.evaluator import evaluate_result
 from ferros.agents.manager import TaskManager
+from ferros.agents.plan_cache import store_plan
 from ferros.agents.planner import plan_task
+from ferros.agents.templates import add_template
+from ferros.core.budget import Budget, current_budget
+from ferros.core.deadlines import DeadlineExceeded, deadline, remaining
 from ferros.core.finalize import save_result
 from ferros.core.logging import get_logger
+from ferros.core.snapshot import update_snapshot
 from ferros.core.store import send_update
+from ferros.core.utils import get_settings
 from ferros.models.evaluation import EvaluationResults
 from ferros.models.plan import Plan
+from ferros.models.task import task_id
 from ferros.tools.mcps import get_mcp_server
 
 STEP_ID = 10000
@@ -21,6 +30,7 @@ async def run_agent(
     revisions: int = 3,
     trace_id: str | None = None,
     session_id: str | None = None,
+    budget: Budget | None = None,
 ) -> None:
     """
     Run the agent to perform a task based on user input and context.
@@ -33,82 +43,169 @@ async def run_agent(
             will be generated.
         session_id (str | None): The session ID for the run. If None, a new session
             ID will be generated.
+        budget (Budget | None): The budget of the task. If None, a budget with
+            the configured default limits is used.
     """
 
     trace_id = gen_trace_id() if trace_id is None else trace_id
-    guid = trace_id.split("_")[-1]
+    guid = task_id(trace_id)
     revision_prefix = (
         "The evaluation did not pass. Please revise the "
         "plan based on the feedback: \n\n"
     )
+    timeout_prefix = (
+        "The previous plan did not finish in time, so it was not evaluated. "
+        "Please revise the plan with fewer or simpler steps, reusing the results "
+        "of the completed steps: \n\n"
+    )
     logger = get_logger(__name__)
+    timeouts = get_settings().timeouts
 
+    goal = user_input
     plan: Plan | None = None
     evals: EvaluationResults | None = None
 
-    async with get_mcp_server(
-        cache_tools_list=True,
-        name="Blackboard MCP Server",
-        client_session_timeout_seconds=180,
-    ) as server:
-        metadata = {"Plan Id": guid, "User Input": user_input}
-        short_id = guid.upper()[:8]
-        with trace(
-            workflow_name=f"Knowledge Worker: {short_id}",
-            trace_id=trace_id,
-            group_id=session_id,
-            metadata=metadata,
+    budget = budget or Budget.create()
+    budget.listeners.append(lambda b, _: update_snapshot(guid, usage=b.usage))
+    token = current_budget.set(budget)
+    try:
+        async with (
+            deadline("Task", timeouts.task),
+            get_mcp_server(
+                cache_tools_list=True,
+                name="Blackboard MCP Server",
+                client_session_timeout_seconds=180,
+            ) as server,
         ):
-            logger.info(f"Starting new task execution id: {guid}")
-            await send_update(guid, STEP_ID, AGENT_NAME, "running")
-
-            # initialize manager
-            manager = TaskManager(server=server)
-
-            # build context
-            if context_input:
-                _ = await build_context(guid, context_input, server)
-
-            for revision in range(1, revisions + 1):
-                name = f"Task Pass {revision} of {revisions}"
-                data = {"Plan Id": guid, "User Input": user_input}
-
-                with custom_span(name=name, data=data):
-                    # plan the task
-                    plan = await plan_task(guid, revision, user_input, server)
-
-                    # run the plan steps
-                    await manager.run(plan, revision)
-
-                    # evaluate the results from the last step
-                    evals = await evaluate_result(plan, revision, server, checks=3)
-
-                if evals.passed:
-                    # if the evaluation passed, break the loop
-                    break
-
-                # prepare the user input for the next iteration or final output
-                user_input = (
-                    f"Plan goal:\n{plan.goal}\n\n{revision_prefix}{evals.feedback}"
-                )
-
-            # save results
-            if plan:
-                await save_result(plan, server)
-
-            if evals and not evals.passed:
-                await send_update(
-                    guid,
-                    STEP_ID,
-                    AGENT_NAME,
-                    "completed",
-                    message="Task did not pass all evaluations.",
-                )
-                logger.warning(
-                    f"Task execution did not pass all evaluations: {guid}. "
-                    "Please check the feedback and revise the plan."
-                )
-                return
-
-            await send_update(guid, STEP_ID, AGENT_NAME, "completed")
-            logger.info(f"Task execution completed successfully: {guid}")
+            metadata = {"Plan Id": guid, "User Input": user_input}
+            short_id = guid.upper()[:8]
+            with trace(
+                workflow_name=f"Knowledge Worker: {short_id}",
+                trace_id=trace_id,
+                group_id=session_id,
+                metadata=metadata,
+            ):
+                logger.info(f"Starting new task execution id: {guid}")
+                update_snapshot(guid, "running", goal=goal)
+                await send_update(guid, STEP_ID, AGENT_NAME, "running")
+
+                # initialize manager
+                manager = TaskManager(server=server)
+
+                # build context
+                if context_input:
+                    async with deadline("Context building", timeouts.context):
+                        _ = await build_context(guid, context_input, server)
+
+                for revision in range(1, revisions + 1):
+                    if revision > 1 and budget.exhausted:
+                        logger.warning(
+                            f"Budget of task {guid} exhausted, "
+                            f"skipping revisions from {revision}."
+                        )
+                        break
+
+                    name = f"Task Pass {revision} of {revisions}"
+                    data = {"Plan Id": guid, "User Input": user_input}
+
+                    with custom_span(name=name, data=data):
+                        try:
+                            # plan the task
+                            async with deadline("Planning", timeouts.planning):
+                                plan = await plan_task(
+                                    guid,
+                                    revision,
+                                    user_input,
+                                    server,
+                                    context_input,
+                                    plan,
+                                )
+
+                            # run the plan steps
+                            async with deadline("Execution", timeouts.execution):
+                                await manager.run(plan, revision)
+                        except DeadlineExceeded as e:
+                            left = remaining()
+                            if (
+                                timeouts.on_timeout != "replan"
+                                or revision == revisions
+                                or (left is not None and left <= 0)
+                            ):
+                                raise
+                            # re-plan instead of retrying the same slow plan
+                            await send_update(
+                                guid,
+                                STEP_ID,
+                                AGENT_NAME,
+                                "running",
+                                message=f"{e}, re-planning.",
+                            )
+                            # the plan was not evaluated, describe how far it got
+                            # in place of the evaluated steps
+                            steps = plan.steps if plan else []
+                            done = [s.id for s in steps if s.status != "pending"]
+                            unfinished = [s.id for s in steps if s.status == "pending"]
+                            user_input = (
+                                f"Plan goal:\n{plan.goal if plan else goal}\n\n"
+                                "Evaluated steps: []\n\n"
+                                f"Completed steps: {done}\n\n"
+                                f"Unfinished steps: {unfinished}\n\n"
+                                f"{timeout_prefix}{e}."
+                            )
+                            # the evaluation of an earlier revision does not
+                            # apply to the re-planned steps
+                            evals = None
+                            continue
+
+                        # evaluate the results from the last step
+                        evals = await evaluate_result(plan, revision, server)
+
+                    if evals.passed:
+                        # cache and index the successful plan and break the loop
+                        if revision == 1:
+                            store_plan(plan, goal, context_input)
+                        await asyncio.to_thread(
+                            add_template, goal, plan, revision, context_input
+                        )
+                        break
+
+                    # prepare the user input for the next iteration or final output
+                    user_input = (
+                        f"Plan goal:\n{plan.goal}\n\n"
+                        f"Evaluated steps: {evals.steps_evaluated}\n\n"
+                        f"{revision_prefix}{evals.feedback}"
+                    )
+
+                if plan and evals is None:
+                    # the budget ran out before the re-planned steps were
+                    # evaluated, so the partial results are not the outcome
+                    message = "Task plan was not evaluated, the task budget ran out."
+                    update_snapshot(guid, "failed", passed=False, error=message)
+                    await send_update(
+                        guid, STEP_ID, AGENT_NAME, "failed", message=message
+                    )
+                    logger.warning(f"Task execution was not evaluated: {guid}.")
+                    return
+
+                # save results
+                if plan:
+                    await save_result(plan, server)
+
+                update_snapshot(guid, "completed")
+                if evals and not evals.passed:
+                    message = "Task did not pass all evaluations."
+                    if budget.exhausted:
+                        message = f"{message} The task budget ran out."
+                    await send_update(
+                        guid, STEP_ID, AGENT_NAME, "completed", message=message
+                    )
+                    logger.warning(
+                        f"Task execution did not pass all evaluations: {guid}. "
+                        "Please check the feedback and revise the plan."
+                    )
+                    return
+
+                await send_update(guid, STEP_ID, AGENT_NAME, "completed")
+                logger.info(f"Task execution completed successfully: {guid}")
+    finally:
+        current_budget.reset(token)
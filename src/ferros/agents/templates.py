@@ -0,0 +1,316 @@
+import fcntl
+import json
+import math
+import re
+import threading
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from ferros.agents.catalog import get_catalog_hash
+from ferros.agents.plan_cache import ContextInput, context_signature, normalize_goal
+from ferros.core.logging import get_logger
+from ferros.core.metrics import incr
+from ferros.core.utils import get_settings
+from ferros.models.plan import Plan
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]{3,}")
+TEMPLATES_HEADER = (
+    "## Similar Plans\n\n"
+    "The plans below were successful for similar goals. Use them as templates "
+    "for the structure of the new plan, but adapt the steps and prompts to the "
+    "goal above."
+)
+
+
+@dataclass
+class TemplateMatch:
+    similarity: float
+    goal: str
+    plan: Plan
+    revisions: int
+    catalog: str
+    contexts: str | None
+
+
+def tokenize(text: str) -> Counter[str]:
+    """
+    Split a goal into term counts for the TF-IDF index.
+
+    Args:
+        text (str): The text to tokenize.
+
+    Returns:
+        Counter[str]: The term counts for the text.
+    """
+    return Counter(TOKEN_PATTERN.findall(normalize_goal(text)))
+
+
+class PlanTemplateIndex:
+    """
+    A local TF-IDF index over the goals of successful plans. The index is kept
+    in a JSON file and updated incrementally as tasks pass evaluation. Workers
+    sharing the file add their plans under a file lock, merging the plans the
+    other workers added since the file was last read.
+    """
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.entries: list[dict[str, Any]] = []
+        self.df: Counter[str] = Counter()
+        self.mtime: float | None = None
+        self.lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Reload the index if the file was changed by another worker.
+        """
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self.mtime:
+            return
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        self.entries = data.get("entries", [])
+        self.df = Counter(term for entry in self.entries for term in entry["terms"])
+        self.mtime = mtime
+
+    def weights(self, terms: dict[str, int]) -> dict[str, float]:
+        """
+        Compute the normalized TF-IDF weights for a set of term counts.
+
+        Args:
+            terms (dict[str, int]): The term counts of a goal.
+
+        Returns:
+            dict[str, float]: The unit-length TF-IDF vector.
+        """
+        n = len(self.entries)
+        vector: dict[str, float] = {}
+        for term, count in terms.items():
+            idf = math.log((1 + n) / (1 + self.df[term])) + 1
+            vector[term] = (1 + math.log(count)) * idf
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        return {term: w / norm for term, w in vector.items()}
+
+    def search(self, goal: str, top_k: int) -> list[TemplateMatch]:
+        """
+        Find the indexed plans with the most similar goals.
+
+        Args:
+            goal (str): The goal to search for.
+            top_k (int): The maximum number of matches to return.
+
+        Returns:
+            list[TemplateMatch]: The matches sorted by descending similarity.
+        """
+        with self.lock:
+            self.refresh()
+            query = self.weights(tokenize(goal))
+            scored: list[tuple[float, dict[str, Any]]] = []
+            for entry in self.entries:
+                vector = self.weights(entry["terms"])
+                similarity = sum(w * vector.get(t, 0.0) for t, w in query.items())
+                scored.append((similarity, entry))
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [
+            TemplateMatch(
+                similarity=similarity,
+                goal=entry["goal"],
+                plan=Plan.model_validate(entry["plan"]),
+                revisions=entry["revisions"],
+                catalog=entry["catalog"],
+                contexts=entry.get("contexts"),
+            )
+            for similarity, entry in scored[:top_k]
+        ]
+
+    def add(
+        self, goal: str, plan: Plan, revisions: int, catalog: str, contexts: str
+    ) -> None:
+        """
+        Add a successful plan to the index and persist it, replacing the plan
+        of the same goal and registry snapshot. The file is read again under
+        the lock, so the plans of other workers are kept.
+
+        Args:
+            goal (str): The original goal of the task.
+            plan (Plan): The plan that passed evaluation.
+            revisions (int): The number of revisions the plan needed to pass.
+            catalog (str): The registry catalog hash the plan was made against.
+            contexts (str): The context shape signature of the task.
+        """
+        terms = tokenize(goal)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock, open(self.path.with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            self.refresh()
+            key = (normalize_goal(goal), catalog)
+            replaced = [
+                e
+                for e in self.entries
+                if (normalize_goal(e["goal"]), e["catalog"]) == key
+            ]
+            for entry in replaced:
+                self.entries.remove(entry)
+                self.df.subtract(entry["terms"].keys())
+            self.entries.append(
+                {
+                    "id": uuid.uuid4().hex,
+                    "goal": goal,
+                    "terms": dict(terms),
+                    "plan": plan.model_dump(mode="json"),
+                    "revisions": revisions,
+                    "catalog": catalog,
+                    "contexts": contexts,
+                }
+            )
+            self.df.update(terms.keys())
+            while len(self.entries) > self.max_entries:
+                evicted = self.entries.pop(0)
+                self.df.subtract(evicted["terms"].keys())
+            self.df = +self.df
+            self.save()
+            self.mtime = self.path.stat().st_mtime
+
+    def save(self) -> None:
+        """
+        Write the index to disk, replacing the previous file atomically.
+        """
+        tmp = self.path.with_suffix(".tmp")
+        data = {"entries": self.entries, "df": dict(self.df)}
+        tmp.write_text(json.dumps(data), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+index: None | PlanTemplateIndex = None
+
+
+def get_template_index() -> PlanTemplateIndex | None:
+    """
+    Get the plan template index if template retrieval is enabled.
+
+    Returns:
+        PlanTemplateIndex | None: The template index or None if disabled.
+    """
+    global index
+    settings = get_settings().planning
+    if not settings.templates_enabled:
+        return None
+    if index is None:
+        index = PlanTemplateIndex(
+            settings.templates_path, settings.templates_max_entries
+        )
+    return index
+
+
+def find_templates(goal: str) -> list[TemplateMatch]:
+    """
+    Find the successful plans with goals similar to the given goal.
+
+    Args:
+        goal (str): The goal of the task.
+
+    Returns:
+        list[TemplateMatch]: The matches above the minimum similarity.
+    """
+    templates = get_template_index()
+    if templates is None:
+        return []
+    settings = get_settings().planning
+    matches = [
+        match
+        for match in templates.search(goal, settings.templates_top_k)
+        if match.similarity >= settings.templates_min_similarity
+    ]
+    incr("plan_templates.hits" if matches else "plan_templates.misses")
+    return matches
+
+
+def reusable_template(
+    matches: list[TemplateMatch], contexts: ContextInput = None
+) -> TemplateMatch | None:
+    """
+    Get the best match if it is similar enough to be reused without planning.
+    Like the plan cache, only plans that passed on their first revision for
+    the same context shape against the current registry snapshot are reused
+    directly.
+
+    Args:
+        matches (list[TemplateMatch]): The template matches.
+        contexts (ContextInput): The context input of the task.
+
+    Returns:
+        TemplateMatch | None: The reusable match, if any.
+    """
+    if not matches:
+        return None
+    best = matches[0]
+    threshold = get_settings().planning.templates_reuse_threshold
+    if (
+        best.similarity >= threshold
+        and best.revisions == 1
+        and best.catalog == get_catalog_hash()
+        and best.contexts == context_signature(contexts)
+    ):
+        return best
+    return None
+
+
+def format_templates(matches: list[TemplateMatch]) -> str:
+    """
+    Format template matches as few-shot examples for the planner input.
+
+    Args:
+        matches (list[TemplateMatch]): The template matches.
+
+    Returns:
+        str: The few-shot examples or an empty string if there are no matches.
+    """
+    if not matches:
+        return ""
+    examples: list[str] = [TEMPLATES_HEADER]
+    for i, match in enumerate(matches, start=1):
+        steps = [
+            step.model_dump(include={"id", "agent_name", "prompt", "depends_on"})
+            for step in match.plan.steps
+        ]
+        for step in steps:
+            step["prompt"] = step["prompt"].replace(match.plan.id, "<plan id>")
+        example = json.dumps({"goal": match.goal, "steps": steps}, indent=2)
+        examples.append(
+            f"### Template {i} (similarity {match.similarity:0.2f})\n\n"
+            f"```json\n{example}\n```"
+        )
+    return "\n\n".join(examples)
+
+
+def add_template(
+    goal: str, plan: Plan, revisions: int, contexts: ContextInput = None
+) -> None:
+    """
+    Index a plan that passed evaluation so later tasks can reuse it. The
+    index file is written, so this should run off the event loop.
+
+    Args:
+        goal (str): The original goal of the task.
+        plan (Plan): The plan that passed evaluation.
+        revisions (int): The number of revisions the plan needed to pass.
+        contexts (ContextInput): The context input of the task.
+    """
+    templates = get_template_index()
+    if templates is None:
+        return
+    signature = context_signature(contexts)
+    templates.add(goal, plan, revisions, get_catalog_hash(), signature)
+    get_logger(__name__).info(
+        f"Plan {plan.id} added to the template index ({len(templates.entries)} plans)"
+    )
+
+
+__all__ = ["add_template", "find_templates", "format_templates", "reusable_template"]
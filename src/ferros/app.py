@@ -1,21 +1,43 @@
-import asyncio
 import uuid
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
+from datetime import datetime
 from typing import Annotated, Any
 
 import arrow
 import uvicorn
-from fastapi import FastAPI, File, Form, UploadFile, WebSocket, WebSocketDisconnect
-from pydantic import AnyUrl
+from fastapi import (
+    FastAPI,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Request,
+    UploadFile,
+    WebSocket,
+    WebSocketDisconnect,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import AnyUrl, TypeAdapter, ValidationError
 
 from ferros.core.logging import get_logger
+from ferros.core.snapshot import get_snapshot
 from ferros.core.store import save_file
-from ferros.messaging.producer import publish_task
+from ferros.messaging.admission import check_admission
+from ferros.messaging.cancellation import FINAL_STATUSES, cancel_task
+from ferros.messaging.constants import STREAM_LAST_ID
+from ferros.messaging.idempotency import find_task, find_tasks
+from ferros.messaging.multiplexer import parse_id
+from ferros.messaging.producer import publish_task, publish_tasks
+from ferros.messaging.scheduler import PRIORITIES
 from ferros.messaging.streamer import (
     TaskResult,
+    stream_task_events,
     stream_task_updates,
     unwrap_stream_data,
 )
-from ferros.models.task import TaskConfig
+from ferros.models.snapshot import TaskSnapshot
+from ferros.models.task import Priority, TaskConfig
 
 app = FastAPI(
     title="Agent foundry API",
@@ -27,6 +49,29 @@ app = FastAPI(
     version="0.1.0",
 )
 started = arrow.now("Canada/Eastern")
+task_list = TypeAdapter(list[TaskConfig])
+NDJSON_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-seq")
+
+
+def admit(count: int = 1, priority: Priority = "normal") -> None:
+    """
+    Reject new tasks with 429 Too Many Requests while the workers are too far
+    behind, advising clients when to retry based on the drain rate.
+
+    Args:
+        count (int): The number of tasks to admit.
+        priority (Priority): The priority of the tasks.
+
+    Raises:
+        HTTPException: If the tasks are not admitted.
+    """
+    retry_after = check_admission(count, priority)
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many tasks are waiting, please retry later.",
+            headers={"Retry-After": str(retry_after)},
+        )
 
 
 @app.get("/")
@@ -61,15 +106,82 @@ async def health_check() -> dict[str, str]:
 
 
 @app.post("/run-task/json")
-async def run_task(task_config: TaskConfig) -> dict[str, str]:
+async def run_task(
+    task_config: TaskConfig,
+    idempotency_key: Annotated[str | None, Header()] = None,
+) -> dict[str, str]:
     """
-    Run the agent with the provided input.
+    Run the agent with the provided input. Duplicate submissions return the
+    id of the task that is already queued, running or completed, and are not
+    subject to admission control.
 
     Returns:
         dict: A dictionary indicating the agent has been run.
     """
-    await publish_task(task_config)
-    return {"task_id": task_config.trace_id, "status": "task published"}
+    task_config.idempotency_key = idempotency_key or task_config.idempotency_key
+    existing = find_task(task_config.idempotency_key or task_config.fingerprint)
+    if existing:
+        state = existing.get("state", "queued")
+        return {"task_id": existing["trace_id"], "status": f"task {state}"}
+    admit(priority=task_config.priority)
+    return await publish_task(task_config)
+
+
+async def read_lines(request: Request) -> AsyncGenerator[bytes, None]:
+    """
+    Read the non-empty lines of a streamed request body.
+
+    Args:
+        request (Request): The request.
+
+    Yields:
+        bytes: Each non-empty line of the body.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if buffer.strip():
+        yield buffer
+
+
+@app.post("/run-task/batch")
+async def run_task_batch(request: Request) -> list[dict[str, str]]:
+    """
+    Run the agent for many tasks at once. The body is either a JSON array of
+    task configurations or NDJSON with one task configuration per line. All
+    tasks are validated before any of them is enqueued.
+
+    Returns:
+        list: The task id and status of each task, in the order of the input.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith(NDJSON_TYPES):
+            tasks: list[TaskConfig] = []
+            async for line in read_lines(request):
+                tasks.append(TaskConfig.model_validate_json(line))
+        else:
+            tasks = task_list.validate_json(await request.body())
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False)
+        if content_type.startswith(NDJSON_TYPES):
+            errors = [{"line": len(tasks) + 1, **error} for error in errors]
+        raise HTTPException(status_code=422, detail=errors) from e
+
+    # only the tasks that are not duplicates count towards admission
+    new: dict[str, TaskConfig] = {}
+    for task, existing in zip(tasks, find_tasks(tasks), strict=True):
+        if not existing:
+            new.setdefault(task.idempotency_key or task.fingerprint, task)
+    for priority in PRIORITIES:
+        count = len([t for t in new.values() if t.priority == priority])
+        if count:
+            admit(count, priority)
+    return await publish_tasks(tasks)
 
 
 @app.post("/run-task/form")
@@ -78,13 +190,24 @@ async def run_task_form(
     files: Annotated[list[UploadFile], File()],
     context_urls: Annotated[str, Form()] = "",
     revisions: Annotated[int, Form()] = 2,
+    priority: Annotated[Priority, Form()] = "normal",
+    deadline: Annotated[datetime | None, Form()] = None,
+    idempotency_key: Annotated[str | None, Header()] = None,
 ) -> dict[str, Any]:
     """
-    Run the agent with the provided form data.
+    Run the agent with the provided form data. Submissions with the
+    idempotency key of an existing task return that task without uploading
+    the files again.
 
     Returns:
         dict: A dictionary indicating the agent has been run.
     """
+    existing = find_task(idempotency_key) if idempotency_key else None
+    if existing:
+        state = existing.get("state", "queued")
+        return {"task_id": existing["trace_id"], "status": f"task {state}"}
+    admit(priority=priority)
+
     # upload file to mcp blackboard server and use response to create
     # contexts - https, http, s3, abs, etc.
     trace_id = f"{uuid.uuid4().hex}"
@@ -106,10 +229,80 @@ async def run_task_form(
         contexts.append(AnyUrl(ret.get("file_url", "")))
 
     task = TaskConfig(
-        goal=goal, contexts=contexts, revisions=revisions, trace_id=trace_id
+        goal=goal,
+        contexts=contexts,
+        revisions=revisions,
+        trace_id=trace_id,
+        idempotency_key=idempotency_key,
+        priority=priority,
+        deadline=deadline,
+    )
+    return await publish_task(task)
+
+
+@app.get("/tasks/{task_id}")
+async def task_status(task_id: str) -> TaskSnapshot:
+    """
+    Get the current plan, step statuses, result pointer, evaluation score and
+    timings of a task from its snapshot, without replaying the update stream.
+
+    Returns:
+        TaskSnapshot: The task snapshot.
+    """
+    snapshot = get_snapshot(task_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return snapshot
+
+
+@app.delete("/tasks/{task_id}", status_code=202)
+async def cancel(task_id: str) -> dict[str, str]:
+    """
+    Cancel a queued or running task. The worker running the task stops all of
+    its steps and evaluation checks and picks up the next task.
+
+    Returns:
+        dict: A dictionary indicating the task is being cancelled.
+    """
+    snapshot = cancel_task(task_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    if snapshot.status in FINAL_STATUSES:
+        raise HTTPException(
+            status_code=409, detail=f"Task {task_id} is already {snapshot.status}"
+        )
+    return {"task_id": task_id, "status": "task cancelling"}
+
+
+@app.get("/tasks/{task_id}/events")
+async def task_events(
+    task_id: str,
+    request: Request,
+    last_event_id: Annotated[str | None, Header()] = None,
+) -> StreamingResponse:
+    """
+    Stream the task updates as Server-Sent Events. The Redis stream ids are
+    used as event ids, so reconnecting clients resume after the
+    `Last-Event-ID` they received last instead of replaying the whole stream.
+
+    Returns:
+        StreamingResponse: The event stream.
+    """
+    last_id = last_event_id or STREAM_LAST_ID
+    try:
+        parse_id(last_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid Last-Event-ID") from e
+
+    compress = "gzip" in request.headers.get("accept-encoding", "")
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if compress:
+        headers.update({"Content-Encoding": "gzip", "Vary": "Accept-Encoding"})
+    return StreamingResponse(
+        stream_task_events(task_id, last_id, compress),
+        media_type="text/event-stream",
+        headers=headers,
     )
-    await publish_task(task)
-    return {"task_id": task.trace_id, "status": "task published"}
 
 
 @app.websocket("/ws/run-task/updates")
@@ -126,13 +319,13 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
                 continue
 
             result = TaskResult()
-            async for update in stream_task_updates(task_id):
-                await websocket.send_json(update)
-                unwrap_stream_data(update, result)
-                await asyncio.sleep(0.1)
-                if result.is_completed:
-                    logger.info(f"Task streaming {task_id} completed.")
-                    break
+            async with aclosing(stream_task_updates(task_id)) as updates:
+                async for update in updates:
+                    await websocket.send_json(update)
+                    unwrap_stream_data(update, result)
+                    if result.is_completed:
+                        logger.info(f"Task streaming {task_id} completed.")
+                        break
 
     except WebSocketDisconnect:
         logger.info("Client disconnected from WebSocket.")
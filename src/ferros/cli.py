@@ -210,6 +210,43 @@ def worker(env_file: str, host: str, port: int) -> None:
     asyncio.run(consume_tasks())
 
 
+@cli.command()
+@click.option(
+    "-e",
+    "--env-file",
+    type=click.Path(exists=False),
+    default=".env",
+    help="Path to the environment file.",
+)
+@click.option(
+    "-h",
+    "--host",
+    type=str,
+    default=None,
+    help="Host for the stand-in servers.",
+)
+@click.option(
+    "-p", "--port", type=int, default=None, help="Port for the model stand-in."
+)
+def simulate(env_file: str, host: str | None, port: int | None) -> None:
+    """
+    Start local stand-ins of the model provider and the blackboard service.
+
+    Args:
+        env_file (str): The path to the environment file.
+        host (str | None): The host for the stand-in servers.
+        port (int | None): The port for the model stand-in.
+
+    Returns:
+        None
+    """
+    from ferros.core.utils import load_settings
+    from ferros.simulate.servers import run_simulation
+
+    load_settings(env_file)
+    run_simulation(host=host, model_port=port)
+
+
 @cli.command()
 @click.option(
     "-t",
@@ -243,5 +280,46 @@ def stream(task_id: str, env_file: str = ".env") -> None:
     asyncio.run(stream_updates(task_id))
 
 
+@cli.command()
+@click.option(
+    "-t",
+    "--task-id",
+    type=str,
+    required=True,
+    help="The ID of the task to cancel.",
+)
+@click.option(
+    "-e",
+    "--env-file",
+    type=click.Path(exists=False),
+    default=".env",
+    help="Path to the environment file.",
+)
+def cancel(task_id: str, env_file: str = ".env") -> None:
+    """
+    Cancel a queued or running task.
+
+    Args:
+        task_id (str): The ID of the task to cancel.
+        env_file (str): The path to the environment file.
+
+    Returns:
+        None
+    """
+    from ferros.core.logging import get_logger
+    from ferros.core.utils import load_settings
+    from ferros.messaging.cancellation import FINAL_STATUSES, cancel_task
+
+    load_settings(env_file)
+    logger = get_logger(__name__)
+    snapshot = cancel_task(task_id)
+    if snapshot is None:
+        logger.error(f"Task {task_id} not found.")
+    elif snapshot.status in FINAL_STATUSES:
+        logger.warning(f"Task {task_id} is already {snapshot.status}.")
+    else:
+        logger.info(f"Task {task_id} is being cancelled.")
+
+
 if __name__ == "__main__":
     cli()
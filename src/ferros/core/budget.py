@@ -0,0 +1,275 @@
+import time
+from collections.abc import AsyncIterator, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from agents import Agent, Model, ModelResponse, Runner, RunResult, Usage
+from agents.models.multi_provider import MultiProvider
+
+from ferros.core.logging import get_logger
+from ferros.core.utils import get_settings
+from ferros.models.task import TaskBudget
+
+BudgetListener = Callable[["Budget", int], None]
+
+current_budget: ContextVar["Budget | None"] = ContextVar("budget", default=None)
+
+
+class BudgetExceeded(Exception):
+    """Raised when a task starts an agent run after its budget ran out."""
+
+
+@dataclass(eq=False)
+class Budget:
+    """
+    The token, cost and wall-clock budget of a task. Every model call of the
+    task is charged to the budget, and listeners are notified of the tokens
+    used so they can report or account for them.
+    """
+
+    max_tokens: int | None = None
+    max_usd: float | None = None
+    max_seconds: float | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    requests: int = 0
+    cost: float = 0.0
+    started: float = field(default_factory=time.monotonic)
+    listeners: list[BudgetListener] = field(default_factory=list)
+
+    @classmethod
+    def create(cls, limits: TaskBudget | None = None) -> "Budget":
+        """
+        Create a budget from the limits of a task and the configured defaults.
+
+        Args:
+            limits (TaskBudget | None): The limits of the task, if any.
+
+        Returns:
+            Budget: The budget of the task.
+        """
+        defaults = get_settings().budget
+        limits = limits or TaskBudget()
+        return cls(
+            max_tokens=limits.max_tokens or defaults.max_tokens,
+            max_usd=limits.max_usd or defaults.max_usd,
+            max_seconds=limits.max_seconds or defaults.max_seconds,
+        )
+
+    @property
+    def tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def spent(self) -> float:
+        """
+        Get the largest fraction of a limit spent so far.
+
+        Returns:
+            float: The fraction, 0 if the budget has no limits.
+        """
+        fractions = [0.0]
+        if self.max_tokens:
+            fractions.append(self.tokens / self.max_tokens)
+        if self.max_usd:
+            fractions.append(self.cost / self.max_usd)
+        if self.max_seconds:
+            fractions.append(self.elapsed / self.max_seconds)
+        return max(fractions)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.spent >= 1
+
+    @property
+    def usage(self) -> dict[str, Any]:
+        """
+        Get the cumulative usage of the task for its status snapshot.
+
+        Returns:
+            dict[str, Any]: The tokens, cost, time and limits of the task.
+        """
+        return {
+            "requests": self.requests,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "total_tokens": self.tokens,
+            "cost": round(self.cost, 6),
+            "seconds": round(self.elapsed, 3),
+            "max_tokens": self.max_tokens,
+            "max_usd": self.max_usd,
+            "max_seconds": self.max_seconds,
+        }
+
+    def charge(self, model: str | None, usage: Usage) -> None:
+        """
+        Charge the usage of a model call to the budget.
+
+        Args:
+            model (str | None): The name of the model called.
+            usage (Usage): The usage of the call.
+        """
+        price = get_settings().budget.prices.get(model or "")
+        self.requests += usage.requests
+        self.input_tokens += usage.input_tokens
+        self.output_tokens += usage.output_tokens
+        if price:
+            self.cost += (
+                usage.input_tokens * price.input + usage.output_tokens * price.output
+            ) / 1e6
+        for listener in self.listeners:
+            listener(self, usage.input_tokens + usage.output_tokens)
+
+
+def get_budget() -> Budget | None:
+    """
+    Get the budget of the task running in the current context.
+
+    Returns:
+        Budget | None: The budget, or None outside of a task.
+    """
+    return current_budget.get()
+
+
+def model_name(agent: Agent[Any]) -> str | None:
+    """
+    Get the name of the model of an agent.
+
+    Args:
+        agent (Agent): The agent.
+
+    Returns:
+        str | None: The model name, or None if it is not known.
+    """
+    if isinstance(agent.model, str):
+        return agent.model
+    return getattr(agent.model, "model", None)
+
+
+def swap_model(model: str | Model | None, name: str) -> str | Model:
+    """
+    Replace the model called by a model, keeping the wrappers around it such
+    as hedging and compaction.
+
+    Args:
+        model (str | Model | None): The model or model name of an agent.
+        name (str): The name of the new model.
+
+    Returns:
+        str | Model: The wrapped new model, or its name.
+    """
+    with_model = getattr(model, "with_model", None)
+    return with_model(name) if with_model else name
+
+
+class BudgetModel(Model):
+    """
+    A model that charges the usage of every model call to the budget of the
+    current task as the response arrives, so the calls of failed and retried
+    runs are charged as well as the calls of successful ones.
+    """
+
+    def __init__(self, model: str | Model, budget: Budget) -> None:
+        self.wrapped = model
+        self.model = model if isinstance(model, str) else getattr(model, "model", None)
+        self.budget = budget
+
+    def get_wrapped(self) -> Model:
+        if isinstance(self.wrapped, str):
+            self.wrapped = MultiProvider().get_model(self.wrapped)
+        return self.wrapped
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        response = await self.get_wrapped().get_response(*args, **kwargs)
+        self.budget.charge(self.model, response.usage)
+        return response
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        async for event in self.get_wrapped().stream_response(*args, **kwargs):
+            if getattr(event, "type", None) == "response.completed":
+                usage = event.response.usage
+                if usage is not None:
+                    self.budget.charge(
+                        self.model,
+                        Usage(
+                            requests=1,
+                            input_tokens=usage.input_tokens,
+                            output_tokens=usage.output_tokens,
+                            total_tokens=usage.total_tokens,
+                        ),
+                    )
+            yield event
+
+
+def budget_agent(agent: Agent[Any]) -> Agent[Any]:
+    """
+    Check the budget of the current task before running an agent, switching
+    the agent to the fallback model once most of the budget is spent. The
+    model calls of the returned agent are charged to the budget.
+
+    Args:
+        agent (Agent): The agent to run.
+
+    Returns:
+        Agent: The agent to run, with the fallback model if needed.
+
+    Raises:
+        BudgetExceeded: If the budget of the task is exhausted.
+    """
+    budget = get_budget()
+    if budget is None:
+        return agent
+    if budget.exhausted:
+        raise BudgetExceeded(f"Budget exhausted before running {agent.name}.")
+    settings = get_settings().budget
+    fallback = settings.fallback_model
+    model = agent.model
+    if (
+        fallback
+        and model_name(agent) != fallback
+        and budget.spent >= settings.fallback_at
+    ):
+        get_logger(__name__).info(
+            f"Using fallback model {fallback} for {agent.name}, "
+            f"{budget.spent:0.0%} of the budget spent."
+        )
+        model = swap_model(model, fallback)
+    if model is None:
+        return agent  # the run config picks the model, it cannot be wrapped
+    return agent.clone(model=BudgetModel(model, budget))
+
+
+async def run_agent(agent: Agent[Any], input: Any, **kwargs: Any) -> RunResult:
+    """
+    Run an agent with `Runner.run` and charge its usage to the budget of the
+    current task. Runs are refused once the budget is exhausted, and use the
+    fallback model once most of the budget is spent.
+
+    Args:
+        agent (Agent): The agent to run.
+        input (Any): The input of the agent.
+        **kwargs (Any): The other arguments of `Runner.run`.
+
+    Returns:
+        RunResult: The result of the run.
+
+    Raises:
+        BudgetExceeded: If the budget of the task is exhausted.
+    """
+    return await Runner.run(budget_agent(agent), input=input, **kwargs)
+
+
+__all__ = [
+    "Budget",
+    "BudgetExceeded",
+    "BudgetModel",
+    "budget_agent",
+    "current_budget",
+    "get_budget",
+    "run_agent",
+]
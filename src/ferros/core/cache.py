@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache[K, V]:
+    """
+    A thread-safe LRU cache whose entries expire after a fixed time to live.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """
+        Get a value from the cache, marking it as recently used.
+
+        Args:
+            key (K): The cache key.
+
+        Returns:
+            V | None: The cached value or None if missing or expired.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self.entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: K, value: V) -> None:
+        """
+        Add a value to the cache, evicting the least recently used entry
+        when the cache is full.
+
+        Args:
+            key (K): The cache key.
+            value (V): The value to cache.
+        """
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        """
+        Remove a value from the cache.
+
+        Args:
+            key (K): The cache key.
+
+        Returns:
+            V | None: The removed value or None if it was not cached.
+        """
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            return entry[1] if entry else None
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Get the ratio of cache hits to lookups.
+
+        Returns:
+            float: The hit rate between 0 and 1.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+__all__ = ["TTLCache"]
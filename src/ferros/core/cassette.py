@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from ferros.core.logging import get_logger
+from ferros.models.settings import CassetteSettings
+
+# ids generated per run (plan ids, trace ids) would change every request hash
+ID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{32}"
+)
+DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def request_key(request: httpx.Request, base_url: str) -> str:
+    """
+    Get the key of a model request in the cassette, a hash of its method, path
+    and body with the generated ids masked.
+
+    Args:
+        request (httpx.Request): The request.
+        base_url (str): The base URL of the model client, stripped from the path
+            so the key does not depend on the endpoint.
+
+    Returns:
+        str: The key of the request.
+    """
+    url = str(request.url)
+    path = url[len(base_url) :] if url.startswith(base_url) else request.url.path
+    body = request.content.decode("utf-8", errors="replace")
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True)
+    except ValueError:
+        pass
+    raw = f"{request.method} {path}\n{ID_PATTERN.sub('<id>', body)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """
+    An httpx transport that records the model requests and responses of the
+    model client to a cassette file, or replays the recorded responses without
+    network access. Identical requests are replayed in the order they were
+    recorded.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        settings: CassetteSettings,
+        base_url: str,
+    ) -> None:
+        self.transport = transport
+        self.settings = settings
+        self.base_url = base_url
+        self.path = Path(settings.path)
+        self.entries: dict[str, list[dict[str, Any]]] = defaultdict(list)
+        self.served: dict[str, int] = defaultdict(int)
+        if settings.mode == "replay":
+            self.load()
+
+    def load(self) -> None:
+        """
+        Load the recorded entries of the cassette.
+
+        Raises:
+            FileNotFoundError: If the cassette does not exist.
+        """
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["key"]].append(entry)
+        get_logger(__name__).info(
+            f"Loaded {sum(len(e) for e in self.entries.values())} recorded "
+            f"responses from {self.path}"
+        )
+
+    def save(self, entry: dict[str, Any]) -> None:
+        """
+        Append a recorded entry to the cassette.
+
+        Args:
+            entry (dict[str, Any]): The entry to save.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        key = request_key(request, self.base_url)
+        if self.settings.mode == "replay":
+            return await self.replay(key)
+
+        start = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+        headers = [
+            (k, v) for k, v in response.headers.items() if k not in DROPPED_HEADERS
+        ]
+        self.save(
+            {
+                "key": key,
+                "method": request.method,
+                "path": request.url.path,
+                "status": response.status_code,
+                "headers": headers,
+                "body": content.decode("utf-8"),
+                "latency": time.monotonic() - start,
+            }
+        )
+        return httpx.Response(response.status_code, headers=headers, content=content)
+
+    async def replay(self, key: str) -> httpx.Response:
+        """
+        Serve the recorded response of a request.
+
+        Args:
+            key (str): The key of the request.
+
+        Returns:
+            httpx.Response: The recorded response, or a 404 response if the
+                request was not recorded.
+        """
+        entries = self.entries.get(key)
+        if not entries:
+            get_logger(__name__).error(f"No recorded response for request {key}")
+            error = {
+                "message": f"No recorded response for request {key} in {self.path}",
+                "type": "cassette_miss",
+            }
+            return httpx.Response(404, json={"error": error})
+
+        entry = entries[self.served[key] % len(entries)]
+        self.served[key] += 1
+        if self.settings.latency_scale:
+            await asyncio.sleep(entry["latency"] * self.settings.latency_scale)
+        return httpx.Response(
+            entry["status"], headers=entry["headers"], content=entry["body"].encode()
+        )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+__all__ = ["CassetteTransport", "request_key"]
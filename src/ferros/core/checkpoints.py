@@ -0,0 +1,214 @@
+import json
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+
+from agents import (
+    Agent,
+    ItemHelpers,
+    Model,
+    ModelResponse,
+    Runner,
+    RunResult,
+    RunResultStreaming,
+)
+from agents.models.multi_provider import MultiProvider
+
+from ferros.core.budget import BudgetExceeded, budget_agent, run_agent
+from ferros.core.constants import CHECKPOINT_PREFIX
+from ferros.core.logging import get_logger
+from ferros.core.utils import get_redis_client, get_settings
+
+
+def checkpoint_key(name: str) -> str:
+    """
+    Get the Redis key of the conversation checkpoint of an agent run.
+
+    Args:
+        name (str): The name of the run, e.g. `{plan_id}:{step_id}`.
+
+    Returns:
+        str: The checkpoint key.
+    """
+    return f"{CHECKPOINT_PREFIX}:{name}"
+
+
+def load_checkpoint(name: str) -> list[dict[str, Any]]:
+    """
+    Load the conversation items of the completed turns of an agent run.
+
+    Args:
+        name (str): The name of the run.
+
+    Returns:
+        list[dict[str, Any]]: The conversation items.
+    """
+    redis = get_redis_client(name="blackboard")
+    items: list[str] = redis.lrange(checkpoint_key(name), 0, -1)  # type: ignore
+    return [json.loads(item) for item in items]
+
+
+def save_checkpoint(name: str, items: list[dict[str, Any]]) -> None:
+    """
+    Append the conversation items of completed turns to the checkpoint of an
+    agent run. Checkpoints are best effort and never fail the run.
+
+    Args:
+        name (str): The name of the run.
+        items (list[dict[str, Any]]): The new conversation items.
+    """
+    if not items:
+        return
+    key = checkpoint_key(name)
+    try:
+        pipe = get_redis_client(name="blackboard").pipeline(transaction=False)
+        pipe.rpush(key, *[json.dumps(item, default=str) for item in items])
+        pipe.expire(key, get_settings().checkpoints.ttl)
+        pipe.execute()
+    except Exception as e:
+        get_logger(__name__).warning(f"Failed to save checkpoint {name}: {e}")
+
+
+def clear_checkpoint(name: str) -> None:
+    """
+    Delete the checkpoint of an agent run.
+
+    Args:
+        name (str): The name of the run.
+    """
+    try:
+        get_redis_client(name="blackboard").delete(checkpoint_key(name))
+    except Exception as e:
+        get_logger(__name__).warning(f"Failed to clear checkpoint {name}: {e}")
+
+
+class CheckpointModel(Model):
+    """
+    A model that saves the conversation of an agent run before every model
+    call. The input of each call holds the items of all completed turns, so
+    the new items since the last call are appended to the checkpoint.
+    """
+
+    def __init__(self, model: str | Model, name: str, offset: int) -> None:
+        self.wrapped = model
+        self.model = model if isinstance(model, str) else getattr(model, "model", None)
+        self.name = name
+        self.offset = offset
+
+    def get_wrapped(self) -> Model:
+        if isinstance(self.wrapped, str):
+            self.wrapped = MultiProvider().get_model(self.wrapped)
+        return self.wrapped
+
+    def save(self, args: tuple[Any, ...], kwargs: dict[str, Any]) -> None:
+        input = kwargs["input"] if "input" in kwargs else args[1]
+        if isinstance(input, list) and len(input) > self.offset:
+            save_checkpoint(self.name, input[self.offset :])
+            self.offset = len(input)
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.save(args, kwargs)
+        return await self.get_wrapped().get_response(*args, **kwargs)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        self.save(args, kwargs)
+        async for event in self.get_wrapped().stream_response(*args, **kwargs):
+            yield event
+
+
+async def run_streamed(
+    agent: Agent[Any],
+    input: str | list[Any],
+    on_event: Callable[[Any], None],
+    **kwargs: Any,
+) -> RunResultStreaming:
+    """
+    Run an agent in streamed mode and pass the raw response events, such as
+    output and tool call argument deltas, to a callback. The agent is
+    expected to be checked against the budget already.
+
+    Args:
+        agent (Agent): The agent to run.
+        input (str | list[Any]): The input of the agent.
+        on_event (Callable[[Any], None]): The callback of the raw events.
+        **kwargs (Any): The other arguments of `Runner.run_streamed`.
+
+    Returns:
+        RunResultStreaming: The completed result of the run.
+    """
+    result = Runner.run_streamed(agent, input=input, **kwargs)
+    async for event in result.stream_events():
+        if event.type == "raw_response_event":
+            on_event(event.data)
+    return result
+
+
+async def run_checkpointed(
+    agent: Agent[Any],
+    input: str,
+    name: str,
+    attempts: int | None = None,
+    on_event: Callable[[Any], None] | None = None,
+    **kwargs: Any,
+) -> RunResult | RunResultStreaming:
+    """
+    Run an agent and retry it on failure from the last completed turn instead
+    of the original input. The conversation items of every completed turn are
+    saved to a checkpoint in Redis, keyed by the name of the run. With
+    checkpoints disabled, failed runs are retried from the original input.
+
+    Args:
+        agent (Agent): The agent to run.
+        input (str): The input of the agent.
+        name (str): The name of the run, unique per plan and step.
+        attempts (int | None): The maximum number of attempts. Defaults to the
+            configured number of attempts.
+        on_event (Callable[[Any], None] | None): If set, the agent runs in
+            streamed mode and the raw response events are passed to it.
+        **kwargs (Any): The other arguments of `Runner.run`.
+
+    Returns:
+        RunResult | RunResultStreaming: The result of the run.
+    """
+    logger = get_logger(__name__)
+    settings = get_settings().checkpoints
+    attempts = attempts or settings.attempts
+    input_items = ItemHelpers.input_to_new_input_list(input)
+    if settings.enabled:
+        clear_checkpoint(name)  # a new run starts from the original input
+
+    attempt = 0
+    while True:
+        try:
+            if not settings.enabled or agent.model is None:
+                if on_event is None:
+                    return await run_agent(agent, input=input, **kwargs)
+                run = budget_agent(agent)
+                return await run_streamed(run, input, on_event, **kwargs)
+            items = input_items + (load_checkpoint(name) if attempt else [])
+            run = budget_agent(agent)
+            run = run.clone(model=CheckpointModel(run.model, name, len(items)))
+            if on_event is None:
+                result = await Runner.run(run, input=items, **kwargs)
+            else:
+                result = await run_streamed(run, items, on_event, **kwargs)
+            clear_checkpoint(name)
+            return result
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            attempt += 1
+            logger.error(f"Run {name} of {agent.name} failed on attempt {attempt}: {e}")
+            if attempt == attempts:
+                if settings.enabled:
+                    clear_checkpoint(name)
+                raise
+
+
+__all__ = [
+    "CheckpointModel",
+    "clear_checkpoint",
+    "load_checkpoint",
+    "run_checkpointed",
+    "run_streamed",
+    "save_checkpoint",
+]
@@ -0,0 +1,152 @@
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from agents import Model, ModelResponse, custom_span
+from agents.models.multi_provider import MultiProvider
+
+from ferros.core.logging import get_logger
+from ferros.core.metrics import incr
+from ferros.models.settings import CompactionSettings
+
+CHARS_PER_TOKEN = 4
+OUTPUT_TYPES = ("function_call_output", "computer_call_output")
+
+
+def estimate_tokens(items: list[Any]) -> int:
+    """
+    Estimate the number of tokens of conversation items.
+
+    Args:
+        items (list[Any]): The conversation items.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return len(json.dumps(items, default=str)) // CHARS_PER_TOKEN
+
+
+def compact_history(
+    items: list[Any], settings: CompactionSettings
+) -> tuple[list[Any], int]:
+    """
+    Elide the older tool outputs of a conversation until it fits the token
+    threshold. The original input and the most recent tool outputs are kept
+    verbatim, and tool calls keep their (elided) outputs.
+
+    Args:
+        items (list[Any]): The conversation items.
+        settings (CompactionSettings): The compaction settings.
+
+    Returns:
+        tuple[list[Any], int]: The compacted items and the number of elided
+            tool outputs.
+    """
+    tokens = estimate_tokens(items)
+    if tokens <= settings.max_tokens:
+        return items, 0
+
+    outputs = [
+        i
+        for i, item in enumerate(items)
+        if isinstance(item, dict)
+        and item.get("type") in OUTPUT_TYPES
+        and isinstance(item.get("output"), str)
+        and len(item["output"]) > settings.preview_chars
+    ]
+    older = outputs[: max(0, len(outputs) - settings.keep_recent)]
+    compacted = list(items)
+    elided = 0
+    for i in older:
+        output = compacted[i]["output"]
+        preview = output[: settings.preview_chars]
+        marker = f"... [{len(output) - len(preview)} characters elided]"
+        compacted[i] = {**compacted[i], "output": preview + marker}
+        tokens -= (len(output) - len(preview) - len(marker)) // CHARS_PER_TOKEN
+        elided += 1
+        if tokens <= settings.max_tokens:
+            break
+    return compacted, elided
+
+
+class CompactingModel(Model):
+    """
+    A model that compacts the conversation history before every model call,
+    so long-running steps do not re-send every tool output on every turn.
+    The system instructions are passed separately and never compacted.
+    """
+
+    def __init__(self, model: str | Model, settings: CompactionSettings) -> None:
+        self.wrapped = model
+        self.model = model if isinstance(model, str) else getattr(model, "model", None)
+        self.settings = settings
+
+    def get_wrapped(self) -> Model:
+        if isinstance(self.wrapped, str):
+            self.wrapped = MultiProvider().get_model(self.wrapped)
+        return self.wrapped
+
+    def with_model(self, model: str) -> "CompactingModel":
+        """
+        Get a compacting model that calls another model, keeping the wrappers
+        of the current model such as hedging.
+
+        Args:
+            model (str): The name of the other model.
+
+        Returns:
+            CompactingModel: The compacting model.
+        """
+        with_model = getattr(self.wrapped, "with_model", None)
+        wrapped = with_model(model) if with_model else model
+        return CompactingModel(wrapped, self.settings)
+
+    def compact(
+        self, args: tuple[Any, ...], kwargs: dict[str, Any]
+    ) -> tuple[tuple[Any, ...], dict[str, Any]]:
+        positional = "input" not in kwargs
+        input = args[1] if positional else kwargs["input"]
+        if not isinstance(input, list):
+            return args, kwargs
+
+        compacted, elided = compact_history(input, self.settings)
+        if not elided:
+            return args, kwargs
+        before, after = estimate_tokens(input), estimate_tokens(compacted)
+        data = {"Model": self.model, "Elided": elided, "Before": before, "After": after}
+        with custom_span(name="History Compaction", data=data):
+            get_logger(__name__).info(
+                f"Compacted history for {self.model}: elided {elided} tool "
+                f"outputs, ~{before} to ~{after} tokens"
+            )
+            incr("compaction.elided", elided)
+        if positional:
+            return (args[0], compacted, *args[2:]), kwargs
+        return args, {**kwargs, "input": compacted}
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        args, kwargs = self.compact(args, kwargs)
+        return await self.get_wrapped().get_response(*args, **kwargs)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        args, kwargs = self.compact(args, kwargs)
+        async for event in self.get_wrapped().stream_response(*args, **kwargs):
+            yield event
+
+
+def compact_model(model: str | Model, settings: CompactionSettings) -> str | Model:
+    """
+    Get the model to give an agent, compacting its history if enabled.
+
+    Args:
+        model (str | Model): The model or model name.
+        settings (CompactionSettings): The compaction settings of the agent.
+
+    Returns:
+        str | Model: The compacting model, or the model if compaction is
+            disabled.
+    """
+    return CompactingModel(model, settings) if settings.enabled else model
+
+
+__all__ = ["CompactingModel", "compact_history", "compact_model"]
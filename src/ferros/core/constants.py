@@ -0,0 +1,3 @@
+SNAPSHOT_PREFIX = "task-snapshot"
+SNAPSHOT_TTL = 86400
+CHECKPOINT_PREFIX = "task-checkpoint"
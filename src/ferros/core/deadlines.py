@@ -0,0 +1,67 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+
+from ferros.core.logging import get_logger
+
+current_deadline: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a task, phase or step runs past its deadline."""
+
+    def __init__(self, name: str, seconds: float) -> None:
+        super().__init__(f"{name} exceeded its deadline after {seconds:0.1f}s")
+        self.name = name
+        self.seconds = seconds
+
+
+def remaining() -> float | None:
+    """
+    Get the time left before the deadline of the current context.
+
+    Returns:
+        float | None: The seconds left, or None if there is no deadline.
+    """
+    when = current_deadline.get()
+    return None if when is None else when - asyncio.get_running_loop().time()
+
+
+@asynccontextmanager
+async def deadline(name: str, seconds: float | None) -> AsyncIterator[None]:
+    """
+    Bound the wrapped work to a number of seconds. The deadline propagates to
+    nested deadlines, so inner work never outlives the enclosing deadline, and
+    overdue work is cancelled.
+
+    Args:
+        name (str): The name of the bounded work, used in errors and logs.
+        seconds (float | None): The time allowed, or None to only apply the
+            enclosing deadline.
+
+    Raises:
+        DeadlineExceeded: If the work did not finish before the deadline.
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    when = current_deadline.get()
+    if seconds is not None:
+        when = start + seconds if when is None else min(when, start + seconds)
+
+    token = current_deadline.set(when)
+    timeout = asyncio.timeout_at(when)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError as e:
+        if not timeout.expired() or isinstance(e, DeadlineExceeded):
+            raise
+        elapsed = loop.time() - start
+        get_logger(__name__).warning(f"{name} timed out after {elapsed:0.1f}s")
+        raise DeadlineExceeded(name, elapsed) from e
+    finally:
+        current_deadline.reset(token)
+
+
+__all__ = ["DeadlineExceeded", "current_deadline", "deadline", "remaining"]
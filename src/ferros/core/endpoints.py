@@ -0,0 +1,219 @@
+import time
+
+import httpx
+
+from ferros.core.cassette import CassetteTransport
+from ferros.core.logging import get_logger
+from ferros.core.metrics import incr, set_gauge
+from ferros.models.settings import (
+    CassetteSettings,
+    EndpointSettings,
+    ProviderSettings,
+)
+
+OPENAI_BASE_URL = "https://api.openai.com/v1"
+RETRY_STATUSES = (408, 429, 500, 502, 503, 504)
+
+
+class Endpoint:
+    """
+    A deployment of the model provider, with its own connection pool, the
+    smoothed latency of its recent calls and a circuit breaker. An ejected
+    endpoint is half-open after its cooldown, and only takes a single trial
+    call until that call succeeds.
+    """
+
+    def __init__(self, settings: EndpointSettings, api_key: str) -> None:
+        self.base_url = settings.base_url.rstrip("/") + "/"
+        self.api_key = settings.api_key or api_key
+        self.name = httpx.URL(self.base_url).host
+        self.transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_keepalive_connections,
+            )
+        )
+        self.latency: float | None = None
+        self.in_flight = 0
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.probing = False
+
+    def score(self) -> float:
+        """
+        Get the expected latency of a new call, spreading the load across
+        deployments with the calls already in flight.
+
+        Returns:
+            float: The score of the endpoint, lower is better.
+        """
+        return (self.latency or 0.0) * (self.in_flight + 1)
+
+    def is_available(self, now: float) -> bool:
+        """
+        Check if the circuit breaker lets calls through.
+
+        Args:
+            now (float): The current monotonic time.
+
+        Returns:
+            bool: True if the endpoint is not ejected and no trial call is in
+                flight.
+        """
+        return now >= self.ejected_until and not self.probing
+
+
+class EndpointPool:
+    """
+    A pool of deployments that routes every call to the deployment with the
+    lowest expected latency. Deployments that fail repeatedly are ejected for
+    a cooldown, after which a single trial call decides if they rejoin.
+    """
+
+    def __init__(self, settings: ProviderSettings) -> None:
+        endpoints = settings.endpoints or [
+            EndpointSettings(base_url=settings.base_url or OPENAI_BASE_URL)
+        ]
+        self.settings = settings
+        self.endpoints = [Endpoint(e, settings.api_key) for e in endpoints]
+
+    def select(self) -> Endpoint:
+        """
+        Select the endpoint of the next call.
+
+        Returns:
+            Endpoint: The available endpoint with the lowest score, or the one
+                that is readmitted first if all endpoints are ejected.
+        """
+        now = time.monotonic()
+        available = [e for e in self.endpoints if e.is_available(now)]
+        if not available:
+            return min(self.endpoints, key=lambda e: e.ejected_until)
+        endpoint = min(available, key=lambda e: e.score())
+        if endpoint.ejected_until:
+            # the cooldown is over, let a single trial call through
+            endpoint.probing = True
+        return endpoint
+
+    def record(self, endpoint: Endpoint, latency: float, failed: bool) -> None:
+        """
+        Record the outcome of a call to an endpoint.
+
+        Args:
+            endpoint (Endpoint): The endpoint of the call.
+            latency (float): The seconds until the response headers arrived.
+            failed (bool): Whether the call failed.
+        """
+        if failed:
+            endpoint.failures += 1
+            incr(f"endpoint.{endpoint.name}.failed")
+            if endpoint.failures >= self.settings.breaker_failures:
+                endpoint.ejected_until = (
+                    time.monotonic() + self.settings.breaker_cooldown
+                )
+                incr(f"endpoint.{endpoint.name}.ejected")
+                get_logger(__name__).warning(
+                    f"Ejected endpoint {endpoint.name} for "
+                    f"{self.settings.breaker_cooldown:0.0f}s after "
+                    f"{endpoint.failures} consecutive failures"
+                )
+            return
+
+        if endpoint.ejected_until:
+            get_logger(__name__).info(f"Endpoint {endpoint.name} rejoined the pool")
+        endpoint.failures = 0
+        endpoint.ejected_until = 0.0
+        alpha = self.settings.latency_alpha
+        endpoint.latency = (
+            latency
+            if endpoint.latency is None
+            else alpha * latency + (1 - alpha) * endpoint.latency
+        )
+        set_gauge(f"endpoint.{endpoint.name}.latency", endpoint.latency)
+
+    async def aclose(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.transport.aclose()
+
+
+class PoolTransport(httpx.AsyncBaseTransport):
+    """
+    An httpx transport that sends the requests of the model client to the
+    endpoints of a pool. The client is created with the base URL of the first
+    endpoint, and each request is rewritten to the base URL and API key of the
+    endpoint it is routed to.
+    """
+
+    def __init__(self, pool: EndpointPool) -> None:
+        self.pool = pool
+        self.base_url = pool.endpoints[0].base_url
+
+    def route(self, request: httpx.Request, endpoint: Endpoint) -> httpx.Request:
+        url = str(request.url)
+        if url.startswith(self.base_url):
+            url = endpoint.base_url + url[len(self.base_url) :]
+        headers = httpx.Headers(request.headers)
+        headers.pop("host", None)
+        if "authorization" in headers:
+            headers["authorization"] = f"Bearer {endpoint.api_key}"
+        if "api-key" in headers:
+            headers["api-key"] = endpoint.api_key
+        return httpx.Request(
+            request.method,
+            url,
+            headers=headers,
+            stream=request.stream,
+            extensions=request.extensions,
+        )
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = self.pool.select()
+        start = time.monotonic()
+        endpoint.in_flight += 1
+        try:
+            response = await endpoint.transport.handle_async_request(
+                self.route(request, endpoint)
+            )
+        except httpx.TransportError:
+            self.pool.record(endpoint, time.monotonic() - start, failed=True)
+            raise
+        finally:
+            endpoint.in_flight -= 1
+            # the outcome of a trial call is recorded, and a cancelled trial
+            # call lets the next call try again
+            endpoint.probing = False
+        failed = response.status_code in RETRY_STATUSES
+        self.pool.record(endpoint, time.monotonic() - start, failed)
+        return response
+
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+
+
+def create_http_client(
+    settings: ProviderSettings, cassette: CassetteSettings | None = None
+) -> tuple[str, httpx.AsyncClient]:
+    """
+    Create the HTTP client of the model client, routing calls across the
+    configured endpoints.
+
+    Args:
+        settings (ProviderSettings): The provider settings.
+        cassette (CassetteSettings | None): The settings to record or replay
+            the calls of the client.
+
+    Returns:
+        tuple[str, httpx.AsyncClient]: The base URL to give the model client
+            and the HTTP client.
+    """
+    pool = PoolTransport(EndpointPool(settings))
+    transport: httpx.AsyncBaseTransport = pool
+    if cassette is not None and cassette.mode != "disabled":
+        transport = CassetteTransport(pool, cassette, pool.base_url)
+    client = httpx.AsyncClient(
+        transport=transport, timeout=settings.timeout, follow_redirects=True
+    )
+    return pool.base_url, client
+
+
+__all__ = ["Endpoint", "EndpointPool", "PoolTransport", "create_http_client"]
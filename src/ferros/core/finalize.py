@@ -5,26 +5,26 @@ from agents.mcp import MCPServer
 
 from ferros.agents.utils import get_step
 from ferros.core.logging import get_logger
+from ferros.core.snapshot import update_snapshot
 from ferros.core.utils import get_settings
-from ferros.models.plan import Plan
+from ferros.models.plan import Plan, PlanStep
 from ferros.tools.mcps import get_result
 
 
-async def fetch_output(plan: Plan, server: MCPServer) -> str:
+def get_output_step(plan: Plan) -> PlanStep:
     """
-    Fetch the output from the last editor step in the plan.
+    Get the last editor step in the plan, or the last writer step if there is
+    no editor step.
 
     Args:
         plan (Plan): The plan object with the steps for the task.
-        server (MCPServerSse): The MCP server to fetch the output from.
 
     Returns:
-        str: The output from the last editor step in the plan.
+        PlanStep: The step that produced the output of the plan.
 
     Raises:
         ValueError: If no result is found in memory.
     """
-
     step = get_step("Editor", plan.steps, is_last=True)
     if not step:
         step = get_step("Writer", plan.steps, is_last=True)
@@ -33,7 +33,25 @@ async def fetch_output(plan: Plan, server: MCPServer) -> str:
         raise ValueError(
             "No result found in memory. Please run the plan first to generate results."
         )
+    return step
+
+
+async def fetch_output(plan: Plan, server: MCPServer) -> str:
+    """
+    Fetch the output from the last editor step in the plan.
+
+    Args:
+        plan (Plan): The plan object with the steps for the task.
+        server (MCPServerSse): The MCP server to fetch the output from.
+
+    Returns:
+        str: The output from the last editor step in the plan.
+
+    Raises:
+        ValueError: If no result is found in memory.
+    """
 
+    step = get_output_step(plan)
     value = await get_result(plan.id, str(step.id), step.agent_name, server)
     return value if isinstance(value, str) else json.dumps(value, indent=2)
 
@@ -71,6 +89,16 @@ async def save_result(plan: Plan, server: MCPServer) -> None:
             f"{settings.files.max_size} bytes."
         )
 
+    step = get_output_step(plan)
+    update_snapshot(
+        plan.id,
+        result={
+            "file": file_path.name,
+            "step_id": step.id,
+            "agent_name": step.agent_name,
+            "revision": step.revision,
+        },
+    )
     logger.info(f"Result saved to {file_path.name} in tmp folder")
     # layout = Layout()
     # layout.split_column(Layout(name="Goal", size=3), Layout(name="Result", size=10))
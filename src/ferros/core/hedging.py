@@ -0,0 +1,222 @@
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from typing import Any
+
+from agents import Model, ModelResponse
+from agents.models.multi_provider import MultiProvider
+
+from ferros.core.budget import get_budget
+from ferros.core.logging import get_logger
+from ferros.core.metrics import incr
+from ferros.models.settings import HedgeSettings
+
+trackers: dict[str, "LatencyTracker"] = {}
+
+
+class LatencyTracker:
+    """
+    The latencies of the recent calls to a model and whether they were hedged.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.hedged: deque[bool] = deque(maxlen=window)
+
+    def record(self, latency: float, hedged: bool) -> None:
+        """
+        Record a completed call.
+
+        Args:
+            latency (float): The seconds the call took.
+            hedged (bool): Whether a duplicate call was issued.
+        """
+        self.latencies.append(latency)
+        self.hedged.append(hedged)
+
+    def threshold(self, settings: HedgeSettings) -> float | None:
+        """
+        Get the delay after which a call is hedged.
+
+        Args:
+            settings (HedgeSettings): The hedging settings.
+
+        Returns:
+            float | None: The latency percentile in seconds, or None if too few
+                calls were observed.
+        """
+        if len(self.latencies) < settings.min_samples:
+            return None
+        latencies = sorted(self.latencies)
+        index = math.ceil(settings.percentile * len(latencies)) - 1
+        return max(settings.min_delay, latencies[index])
+
+    def can_hedge(self, settings: HedgeSettings) -> bool:
+        """
+        Check if another call can be hedged without exceeding the hedge rate.
+
+        Args:
+            settings (HedgeSettings): The hedging settings.
+
+        Returns:
+            bool: True if the hedge rate is below the maximum.
+        """
+        if not self.hedged:
+            return True
+        return sum(self.hedged) / len(self.hedged) < settings.max_rate
+
+
+def get_tracker(model: str, window: int) -> LatencyTracker:
+    """
+    Get the latency tracker of a model, shared by all agents using it.
+
+    Args:
+        model (str): The name of the model.
+        window (int): The number of recent calls to track.
+
+    Returns:
+        LatencyTracker: The latency tracker.
+    """
+    if model not in trackers:
+        trackers[model] = LatencyTracker(window)
+    return trackers[model]
+
+
+class HedgedModel(Model):
+    """
+    A model that issues a duplicate call when a call is slower than the usual
+    latency of the model. The first call to finish wins and the other one is
+    cancelled, or charged to the task budget if it finished too. Streamed calls
+    are not hedged.
+    """
+
+    def __init__(self, model: str, settings: HedgeSettings) -> None:
+        self.model = model
+        self.settings = settings
+        self.wrapped: Model | None = None
+
+    def get_wrapped(self) -> Model:
+        if self.wrapped is None:
+            self.wrapped = MultiProvider().get_model(self.model)
+        return self.wrapped
+
+    def with_model(self, model: str) -> "HedgedModel":
+        """
+        Get a hedged model that calls another model with the same settings.
+
+        Args:
+            model (str): The name of the other model.
+
+        Returns:
+            HedgedModel: The hedged model.
+        """
+        return HedgedModel(model, self.settings)
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        """
+        Get a response from the model, hedging the call if it is slow.
+
+        Returns:
+            ModelResponse: The response of the first call to finish.
+        """
+        model = self.get_wrapped()
+        tracker = get_tracker(self.model, self.settings.window)
+        threshold = tracker.threshold(self.settings)
+        start = time.monotonic()
+        calls = [asyncio.create_task(model.get_response(*args, **kwargs))]
+        winner: asyncio.Task[ModelResponse] | None = None
+        try:
+            if threshold is not None:
+                await asyncio.wait(calls, timeout=threshold)
+                if not calls[0].done() and tracker.can_hedge(self.settings):
+                    get_logger(__name__).info(
+                        f"Hedging call to {self.model} after {threshold:0.1f}s"
+                    )
+                    incr(f"hedge.{self.model}.issued")
+                    calls.append(
+                        asyncio.create_task(model.get_response(*args, **kwargs))
+                    )
+            winner = await self.first_call(calls)
+        finally:
+            self.settle(calls, winner)
+        tracker.record(time.monotonic() - start, len(calls) > 1)
+        return winner.result()
+
+    async def first_call(
+        self, calls: list[asyncio.Task[ModelResponse]]
+    ) -> asyncio.Task[ModelResponse]:
+        """
+        Wait for the first call that succeeds.
+
+        Args:
+            calls (list[asyncio.Task[ModelResponse]]): The calls.
+
+        Returns:
+            asyncio.Task[ModelResponse]: The first successful call.
+
+        Raises:
+            Exception: The error of the first call if all calls failed.
+        """
+        pending = set(calls)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for call in done:
+                if call.exception() is None:
+                    if call is not calls[0]:
+                        incr(f"hedge.{self.model}.won")
+                    return call
+        calls[0].result()
+        return calls[0]
+
+    def settle(
+        self,
+        calls: list[asyncio.Task[ModelResponse]],
+        winner: asyncio.Task[ModelResponse] | None,
+    ) -> None:
+        """
+        Cancel the calls that lost, charging the usage of the ones that
+        finished anyway to the budget of the current task. The usage of a
+        cancelled call is not returned by the provider, so it is only counted.
+
+        Args:
+            calls (list[asyncio.Task[ModelResponse]]): The calls.
+            winner (asyncio.Task[ModelResponse] | None): The winning call, or
+                None if no call succeeded.
+        """
+        budget = get_budget()
+        for call in calls:
+            if call is winner:
+                continue
+            if not call.done():
+                call.cancel()
+                if len(calls) > 1:
+                    incr(f"hedge.{self.model}.cancelled")
+            elif not call.cancelled() and call.exception() is None:
+                incr(f"hedge.{self.model}.charged")
+                if budget is not None:
+                    budget.charge(self.model, call.result().usage)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        async for event in self.get_wrapped().stream_response(*args, **kwargs):
+            yield event
+
+
+def get_model(model: str, settings: HedgeSettings) -> str | Model:
+    """
+    Get the model to give an agent, hedged if hedging is enabled.
+
+    Args:
+        model (str): The name of the model.
+        settings (HedgeSettings): The hedging settings of the agent.
+
+    Returns:
+        str | Model: The hedged model, or the model name if hedging is disabled.
+    """
+    return HedgedModel(model, settings) if settings.enabled else model
+
+
+__all__ = ["HedgedModel", "LatencyTracker", "get_model"]
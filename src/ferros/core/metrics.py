@@ -0,0 +1,44 @@
+import threading
+from collections import defaultdict
+
+counters: dict[str, float] = defaultdict(float)
+gauges: dict[str, float] = {}
+lock = threading.Lock()
+
+
+def incr(name: str, value: float = 1.0) -> None:
+    """
+    Increment a process-wide counter.
+
+    Args:
+        name (str): The name of the counter.
+        value (float): The amount to increment the counter by.
+    """
+    with lock:
+        counters[name] += value
+
+
+def set_gauge(name: str, value: float) -> None:
+    """
+    Set a process-wide gauge to the given value.
+
+    Args:
+        name (str): The name of the gauge.
+        value (float): The value of the gauge.
+    """
+    with lock:
+        gauges[name] = value
+
+
+def get_metrics() -> dict[str, float]:
+    """
+    Get a snapshot of all counters and gauges.
+
+    Returns:
+        dict[str, float]: The current metric values keyed by name.
+    """
+    with lock:
+        return {**counters, **gauges}
+
+
+__all__ = ["get_metrics", "incr", "set_gauge"]
@@ -0,0 +1,176 @@
+import json
+import time
+from typing import Any
+
+from ferros.core.constants import SNAPSHOT_PREFIX, SNAPSHOT_TTL
+from ferros.core.logging import get_logger
+from ferros.core.utils import get_redis_client
+from ferros.models.snapshot import StepSnapshot, TaskSnapshot, TaskStatus
+
+STEP_PREFIX = "step:"
+
+
+def snapshot_key(task_id: str) -> str:
+    """
+    Get the Redis key of the snapshot hash of a task.
+
+    Args:
+        task_id (str): The ID of the task.
+
+    Returns:
+        str: The snapshot key.
+    """
+    return f"{SNAPSHOT_PREFIX}:{task_id}"
+
+
+def write_snapshots(updates: dict[str, dict[str, Any]]) -> None:
+    """
+    Write fields to the snapshot hashes of one or more tasks in one round trip.
+    Snapshot writes are best effort and never fail the task.
+
+    Args:
+        updates (dict[str, dict[str, Any]]): The fields to write by task id,
+            encoded as JSON.
+    """
+    now = json.dumps(time.time())
+    try:
+        pipe = get_redis_client(name="blackboard").pipeline(transaction=False)
+        for task_id, fields in updates.items():
+            mapping = {name: json.dumps(value) for name, value in fields.items()}
+            mapping["updated_at"] = now
+            pipe.hset(snapshot_key(task_id), mapping=mapping)
+            pipe.expire(snapshot_key(task_id), SNAPSHOT_TTL)
+        pipe.execute()
+    except Exception as e:
+        task_ids = ", ".join(list(updates)[:3])
+        get_logger(__name__).warning(f"Failed to update snapshot of {task_ids}: {e}")
+
+
+def write_snapshot(task_id: str, fields: dict[str, Any]) -> None:
+    """
+    Write fields to the snapshot hash of a task.
+
+    Args:
+        task_id (str): The ID of the task.
+        fields (dict[str, Any]): The fields to write, encoded as JSON.
+    """
+    write_snapshots({task_id: fields})
+
+
+def status_fields(status: TaskStatus | None, fields: dict[str, Any]) -> dict[str, Any]:
+    """
+    Add the status and its timing to the snapshot fields of a task.
+
+    Args:
+        status (TaskStatus | None): The new status of the task, if it changed.
+        fields (dict[str, Any]): The snapshot fields to update.
+
+    Returns:
+        dict[str, Any]: The snapshot fields including the status.
+    """
+    if status:
+        fields.update({"status": status, f"{status}_at": time.time()})
+    return fields
+
+
+def update_snapshot(
+    task_id: str, status: TaskStatus | None = None, **fields: Any
+) -> None:
+    """
+    Update the snapshot of a task.
+
+    Args:
+        task_id (str): The ID of the task.
+        status (TaskStatus | None): The new status of the task, if it changed.
+        **fields (Any): The snapshot fields to update, e.g. `plan` or `score`.
+    """
+    write_snapshot(task_id, status_fields(status, fields))
+
+
+def update_snapshots(
+    updates: dict[str, dict[str, Any]], status: TaskStatus | None = None
+) -> None:
+    """
+    Update the snapshots of many tasks in one round trip.
+
+    Args:
+        updates (dict[str, dict[str, Any]]): The snapshot fields by task id.
+        status (TaskStatus | None): The new status of the tasks, if it changed.
+    """
+    write_snapshots(
+        {task_id: status_fields(status, fields) for task_id, fields in updates.items()}
+    )
+
+
+def record_step(
+    task_id: str,
+    step_id: int,
+    agent_name: str,
+    status: str,
+    message: str | None = None,
+) -> None:
+    """
+    Record the status of a step in the snapshot of a task.
+
+    Args:
+        task_id (str): The ID of the task.
+        step_id (int): The ID of the step.
+        agent_name (str): The name of the agent running the step.
+        status (str): The status of the step.
+        message (str | None): The status message, if any.
+    """
+    prefix = f"{STEP_PREFIX}{step_id}"
+    state = {"agent_name": agent_name, "status": status, "message": message}
+    write_snapshot(task_id, {prefix: state, f"{prefix}:{status}_at": time.time()})
+
+
+def parse_snapshot(task_id: str, data: dict[str, str]) -> TaskSnapshot:
+    """
+    Build a task snapshot from the fields of its snapshot hash.
+
+    Args:
+        task_id (str): The ID of the task.
+        data (dict[str, str]): The JSON encoded fields of the snapshot hash.
+
+    Returns:
+        TaskSnapshot: The task snapshot.
+    """
+    task: dict[str, Any] = {"task_id": task_id, "status": "queued", "timings": {}}
+    steps: dict[int, dict[str, Any]] = {}
+    for name, raw in data.items():
+        value = json.loads(raw)
+        if name.startswith(STEP_PREFIX):
+            step_id, _, timing = name.removeprefix(STEP_PREFIX).partition(":")
+            step = steps.setdefault(int(step_id), {"id": int(step_id), "timings": {}})
+            if timing:
+                step["timings"][timing.removesuffix("_at")] = value
+            else:
+                step.update(value)
+        elif name.endswith("_at"):
+            task["timings"][name.removesuffix("_at")] = value
+        else:
+            task[name] = value
+    task["steps"] = [
+        StepSnapshot.model_validate(step)
+        for _, step in sorted(steps.items())
+        if "status" in step
+    ]
+    return TaskSnapshot.model_validate(task)
+
+
+def get_snapshot(task_id: str) -> TaskSnapshot | None:
+    """
+    Get the snapshot of a task with a single read.
+
+    Args:
+        task_id (str): The ID of the task.
+
+    Returns:
+        TaskSnapshot | None: The task snapshot or None if the task is unknown.
+    """
+    redis = get_redis_client(name="blackboard")
+    data: dict[str, str] = redis.hgetall(snapshot_key(task_id))  # type: ignore
+    return parse_snapshot(task_id, data) if data else None
+
+
+__all__ = ["get_snapshot", "record_step", "update_snapshot", "update_snapshots"]
@@ -6,6 +6,7 @@ import httpx
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 from ferros.core.logging import get_logger
+from ferros.core.snapshot import record_step
 from ferros.core.utils import get_settings
 
 
@@ -68,7 +69,7 @@ async def send_update(
     message: str | None = None,
 ) -> dict[str, str]:
     """
-    Send an action update to the blackboard.
+    Send an action update to the blackboard and record it in the task snapshot.
 
     Args:
         plan_id (str): The ID of the plan.
@@ -96,5 +97,6 @@ async def send_update(
     headers = {"Content-Type": "application/json"}
     response = httpx.post(url, headers=headers, json=payload)
     response.raise_for_status()  # Raise an error for bad responses
+    record_step(plan_id, step_id, agent_name, status, message)
     logger.info(f"Action update sent successfully for plan ID {plan_id}.")
     return response.json()  # Return the JSON response if needed
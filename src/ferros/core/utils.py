@@ -59,7 +59,9 @@ def get_settings() -> Settings:
 
 def configure_model_client() -> None:
     """
-    Configure the OpenAI client based on the settings.
+    Configure the OpenAI client based on the settings. With several endpoints
+    configured, the calls of the client are routed across them, and with a
+    cassette they are recorded or replayed offline.
 
     Returns:
         None
@@ -69,25 +71,34 @@ def configure_model_client() -> None:
     settings = get_settings()
 
     # Check if we're using the OpenAI API
-    using_openai_api = settings.provider.base_url is None or (
-        settings.provider.base_url
-        and settings.provider.base_url.startswith("https://api.openai.com")
+    using_openai_api = not settings.provider.endpoints and (
+        settings.provider.base_url is None
+        or settings.provider.base_url.startswith("https://api.openai.com")
     )
+    cassette = settings.cassette
 
-    if using_openai_api:
+    if using_openai_api and cassette.mode == "disabled":
         import os
 
         os.environ["OPENAI_API_KEY"] = settings.provider.api_key
         return
 
+    from ferros.core.endpoints import create_http_client
+
+    base_url, http_client = create_http_client(settings.provider, cassette)
     client = AsyncOpenAI(
-        base_url=settings.provider.base_url,
+        base_url=base_url,
         api_key=settings.provider.api_key,
-        timeout=Timeout(300),
+        timeout=Timeout(settings.provider.timeout),
+        http_client=http_client,
     )
     set_default_openai_client(client, use_for_tracing=True)
-    set_default_openai_api("chat_completions")
-    configure_tracing(True, use_langfuse=True)
+    if cassette.mode == "replay":
+        configure_tracing(False)  # replayed runs are offline
+    elif not using_openai_api:
+        configure_tracing(True, use_langfuse=True)
+    if not using_openai_api:
+        set_default_openai_api("chat_completions")
 
 
 def load_settings(env_file: str) -> None:
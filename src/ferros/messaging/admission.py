@@ -0,0 +1,224 @@
+import math
+import time
+from typing import Any
+
+from redis import ResponseError
+
+from ferros.core.logging import get_logger
+from ferros.core.metrics import set_gauge
+from ferros.core.utils import get_redis_client, get_settings
+from ferros.messaging.constants import (
+    ACK_BUCKET_SECONDS,
+    ACK_COUNTER_PREFIX,
+    GROUP_NAME,
+)
+from ferros.messaging.scheduler import PRIORITIES, stream_name
+from ferros.messaging.tenants import (
+    DEFAULT_TENANT,
+    get_tenants,
+    running_count,
+    tokens_used,
+)
+from ferros.models.task import Priority
+
+
+def get_stream_backlog(stream: str) -> tuple[int, int]:
+    """
+    Get the backlog of a task stream for the worker group.
+
+    Args:
+        stream (str): The name of the task stream.
+
+    Returns:
+        tuple[int, int]: The number of tasks not yet read by a worker (lag)
+            and the number of tasks read but not yet acked (pending).
+    """
+    redis = get_redis_client()
+    try:
+        groups: list[dict[str, Any]] = redis.xinfo_groups(stream)  # type: ignore
+    except ResponseError:
+        return 0, 0  # the stream does not exist yet
+    for group in groups:
+        if group["name"] == GROUP_NAME:
+            lag = group.get("lag")
+            if lag is None:
+                # older Redis versions do not report the lag, count the unread
+                # entries up to the limit that matters for admission
+                limit = (get_settings().queue.max_lag or 0) + 1
+                last_id = group["last-delivered-id"]
+                unread = redis.xrange(stream, min=f"({last_id}", count=limit)
+                lag = len(unread)  # type: ignore
+            return int(lag), int(group["pending"])
+    # no worker has created the group yet, so every task is waiting
+    return int(redis.xlen(stream)), 0  # type: ignore
+
+
+def get_backlog(
+    priority: Priority = "low", tenants: list[str] | None = None
+) -> tuple[int, int]:
+    """
+    Get the backlog of the task streams served before or with a priority.
+
+    Args:
+        priority (Priority): The lowest priority to include.
+        tenants (list[str] | None): The tenants to include. Defaults to all
+            registered tenants.
+
+    Returns:
+        tuple[int, int]: The number of tasks not yet read by a worker (lag)
+            and the number of tasks read but not yet acked (pending), summed
+            over the streams.
+    """
+    tenants = get_tenants() if tenants is None else tenants
+    lag = pending = 0
+    for p in PRIORITIES[: PRIORITIES.index(priority) + 1]:
+        for tenant in tenants:
+            stream_lag, stream_pending = get_stream_backlog(stream_name(p, tenant))
+            lag += stream_lag
+            pending += stream_pending
+    return lag, pending
+
+
+def ack_key(bucket: int, tenant: str | None = None) -> str:
+    """
+    Get the Redis key of an ack counter.
+
+    Args:
+        bucket (int): The time bucket of the counter.
+        tenant (str | None): The tenant of the counter, or None for all tasks.
+
+    Returns:
+        str: The key of the counter.
+    """
+    if tenant is None:
+        return f"{ACK_COUNTER_PREFIX}:{bucket}"
+    return f"{ACK_COUNTER_PREFIX}:tenant:{tenant}:{bucket}"
+
+
+def record_ack(tenant: str = DEFAULT_TENANT) -> None:
+    """
+    Count an acked task in the current time bucket for the drain rate.
+
+    Args:
+        tenant (str): The tenant of the task.
+    """
+    redis = get_redis_client()
+    settings = get_settings().queue
+    bucket = int(time.time() // ACK_BUCKET_SECONDS)
+    pipe = redis.pipeline(transaction=False)
+    for key in (ack_key(bucket), ack_key(bucket, tenant)):
+        pipe.incr(key)
+        pipe.expire(key, settings.drain_window + ACK_BUCKET_SECONDS)
+    pipe.execute()
+
+
+def get_drain_rate(tenant: str | None = None) -> float:
+    """
+    Get the rate at which workers acked tasks over the drain window.
+
+    Args:
+        tenant (str | None): Only count the tasks of this tenant.
+
+    Returns:
+        float: The number of acked tasks per second.
+    """
+    redis = get_redis_client()
+    window = get_settings().queue.drain_window
+    now = time.time()
+    current = int(now // ACK_BUCKET_SECONDS)
+    buckets = range(current - window // ACK_BUCKET_SECONDS, current + 1)
+    counts = redis.mget([ack_key(b, tenant) for b in buckets])
+    acks = sum(int(count) for count in counts if count)  # type: ignore
+    elapsed = now - buckets[0] * ACK_BUCKET_SECONDS
+    return acks / elapsed
+
+
+def check_admission(count: int = 1, priority: Priority = "normal") -> int | None:
+    """
+    Check if new tasks can be admitted to the task streams without exceeding
+    the maximum lag, pending count or length. Only the tasks that are served
+    before or with the new tasks count towards the lag, so a backlog of low
+    priority tasks does not reject high priority ones. The length counts the
+    tasks of every stream, since the streams are only trimmed of acked tasks.
+
+    Args:
+        count (int): The number of tasks to admit.
+        priority (Priority): The priority of the tasks.
+
+    Returns:
+        int | None: The seconds after which the client should retry, or None
+            if the tasks are admitted.
+    """
+    settings = get_settings().queue
+    lag, pending = get_backlog(priority)
+    set_gauge(f"task_stream.{priority}.lag", lag)
+    set_gauge("task_stream.pending", pending)
+
+    excess = 0
+    if settings.max_lag is not None:
+        excess = max(excess, lag + count - settings.max_lag)
+    if settings.max_pending is not None:
+        excess = max(excess, pending - settings.max_pending)
+    if settings.max_length is not None:
+        total_lag, total_pending = (
+            (lag, pending) if priority == PRIORITIES[-1] else get_backlog()
+        )
+        set_gauge("task_stream.length", total_lag + total_pending)
+        excess = max(excess, total_lag + total_pending + count - settings.max_length)
+    if excess <= 0:
+        return None
+
+    rate = get_drain_rate()
+    set_gauge("task_stream.drain_rate", rate)
+    retry_after = math.ceil(excess / rate) if rate else settings.max_retry_after
+    retry_after = max(settings.min_retry_after, retry_after)
+    retry_after = min(settings.max_retry_after, retry_after)
+    get_logger(__name__).warning(
+        f"Rejecting {count} task(s): lag {lag}, pending {pending}, "
+        f"drain rate {rate:0.3f}/s, retry after {retry_after}s"
+    )
+    return retry_after
+
+
+def update_tenant_metrics() -> None:
+    """
+    Update the queue depth, running tasks, throughput and token usage gauges
+    of every tenant.
+    """
+    for tenant in get_tenants():
+        lag, pending = get_backlog(tenants=[tenant])
+        set_gauge(f"tenant.{tenant}.depth", lag + pending)
+        set_gauge(f"tenant.{tenant}.running", running_count(tenant))
+        set_gauge(f"tenant.{tenant}.throughput", get_drain_rate(tenant))
+        set_gauge(f"tenant.{tenant}.tokens", tokens_used(tenant))
+
+
+def trim_stream(stream: str) -> None:
+    """
+    Trim the task stream entries that every worker has read and acked, i.e.
+    the entries before the oldest pending task or the last delivered task.
+
+    Args:
+        stream (str): The name of the task stream.
+    """
+    redis = get_redis_client()
+    try:
+        summary = redis.xpending(stream, GROUP_NAME)
+        if summary["pending"]:
+            min_id = summary["min"]
+        else:
+            groups = redis.xinfo_groups(stream)  # type: ignore
+            group = next(g for g in groups if g["name"] == GROUP_NAME)
+            min_id = group["last-delivered-id"]
+        redis.xtrim(stream, minid=min_id, approximate=True)
+    except Exception as e:
+        get_logger(__name__).warning(f"Failed to trim stream {stream}: {e}")
+
+
+__all__ = [
+    "check_admission",
+    "get_backlog",
+    "record_ack",
+    "trim_stream",
+    "update_tenant_metrics",
+]
@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any
+
+from ferros.core.logging import get_logger
+from ferros.core.snapshot import get_snapshot, update_snapshot
+from ferros.core.utils import get_redis_client
+from ferros.messaging.constants import CANCEL_CHANNEL, CANCEL_PREFIX, CANCEL_TTL
+from ferros.models.snapshot import TaskSnapshot
+
+FINAL_STATUSES = ("completed", "failed", "cancelled", "expired")
+
+
+def cancel_task(task_id: str) -> TaskSnapshot | None:
+    """
+    Request the cancellation of a task. The request is kept as a key so that
+    queued tasks are skipped when picked up, and published to the workers so
+    that a running task is cancelled immediately.
+
+    Args:
+        task_id (str): The ID of the task.
+
+    Returns:
+        TaskSnapshot | None: The snapshot of the task before the cancellation,
+            or None if the task is unknown.
+    """
+    logger = get_logger(__name__)
+    snapshot = get_snapshot(task_id)
+    if snapshot is None or snapshot.status in FINAL_STATUSES:
+        return snapshot
+
+    redis = get_redis_client()
+    redis.set(f"{CANCEL_PREFIX}:{task_id}", "1", ex=CANCEL_TTL)
+    if snapshot.status == "queued":
+        update_snapshot(task_id, "cancelled")
+    workers = redis.publish(CANCEL_CHANNEL, task_id)
+    logger.info(f"Cancellation of task {task_id} sent to {workers} worker(s).")
+    return snapshot
+
+
+def is_cancelled(task_id: str) -> bool:
+    """
+    Check if the cancellation of a task was requested.
+
+    Args:
+        task_id (str): The ID of the task.
+
+    Returns:
+        bool: True if the task was cancelled.
+    """
+    return bool(get_redis_client().exists(f"{CANCEL_PREFIX}:{task_id}"))
+
+
+async def watch_cancellations(running: dict[str, asyncio.Task[Any]]) -> None:
+    """
+    Listen for cancellation requests and cancel the matching running tasks,
+    including all the steps, evaluation checks and context builds they await.
+
+    Args:
+        running (dict[str, asyncio.Task[Any]]): The running tasks by task id.
+    """
+    logger = get_logger(__name__)
+    pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(CANCEL_CHANNEL)
+    try:
+        while True:
+            try:
+                message = await asyncio.to_thread(pubsub.get_message, timeout=1.0)
+            except Exception as e:
+                logger.error(f"Error while listening for cancellations: {e}")
+                await asyncio.sleep(1)
+                continue
+            if not message:
+                continue
+            task = running.get(message["data"])
+            if task and not task.done():
+                logger.info(f"Cancelling task with ID: {message['data']}")
+                task.cancel()
+    finally:
+        pubsub.close()
+
+
+__all__ = ["FINAL_STATUSES", "cancel_task", "is_cancelled", "watch_cancellations"]
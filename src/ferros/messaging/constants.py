@@ -2,3 +2,14 @@ STREAM_NAME = "agent-task-stream"
 GROUP_NAME = "agent-task-workers"
 STREAM_LAST_ID = "0"
 TASK_UPDATE_STREAM = "task-updates"
+IDEMPOTENCY_PREFIX = "task-claim"
+IDEMPOTENCY_TTL = 86400
+CANCEL_CHANNEL = "task-cancel"
+CANCEL_PREFIX = "task-cancel"
+CANCEL_TTL = 86400
+BATCH_CHUNK_SIZE = 1000
+ACK_COUNTER_PREFIX = "task-acks"
+ACK_BUCKET_SECONDS = 60
+TENANTS_KEY = "task-tenants"
+TENANT_RUNNING_PREFIX = "tenant-running"
+TENANT_TOKENS_PREFIX = "tenant-tokens"
@@ -1,15 +1,44 @@
 from __future__ import annotations
 
+import asyncio
 import http.server
+import json
 import socketserver
+import time
+from typing import Any
 
 from codename import codename  # type: ignore
-from redis import ResponseError
 
+from ferros.agents.runner import AGENT_NAME as RUNNER_AGENT_NAME
+from ferros.agents.runner import STEP_ID as RUNNER_STEP_ID
 from ferros.agents.runner import run_agent
+from ferros.core.budget import Budget
 from ferros.core.logging import get_logger
-from ferros.core.utils import get_redis_client
-from ferros.messaging.constants import GROUP_NAME, STREAM_NAME
+from ferros.core.metrics import get_metrics
+from ferros.core.snapshot import get_snapshot, update_snapshot
+from ferros.core.store import send_update
+from ferros.core.utils import get_redis_client, get_settings
+from ferros.messaging.admission import (
+    record_ack,
+    trim_stream,
+    update_tenant_metrics,
+)
+from ferros.messaging.cancellation import is_cancelled, watch_cancellations
+from ferros.messaging.constants import GROUP_NAME
+from ferros.messaging.idempotency import (
+    is_duplicate,
+    release_task,
+    update_task_state,
+)
+from ferros.messaging.scheduler import Scheduler, demote_task, is_expired
+from ferros.messaging.tenants import (
+    acquire_slot,
+    charge_tokens,
+    hold_slot,
+    release_slot,
+    tenant_of,
+)
+from ferros.models.snapshot import TaskStatus
 from ferros.models.task import TaskConfig
 
 HEALTH_PORT = 5050
@@ -19,6 +48,7 @@ class HealthCheckHandler(http.server.SimpleHTTPRequestHandler):
     """
     A simple HTTP request handler for health checks.
     Responds with a 200 OK status and a message indicating the service is healthy.
+    The worker metrics are served as JSON at /metrics.
     """
 
     def do_GET(self) -> None:
@@ -26,6 +56,11 @@ class HealthCheckHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(200)
             self.end_headers()
             self.wfile.write(b"OK\n")
+        elif self.path == "/metrics":
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(json.dumps(get_metrics()).encode())
         else:
             self.send_response(404)
             self.end_headers()
@@ -47,62 +82,171 @@ def start_health_check_server(host: str = "0.0.0.0", port: int = HEALTH_PORT) ->
         httpd.serve_forever()
 
 
-async def consume_tasks() -> None:
+async def run_task(config: TaskConfig, running: dict[str, asyncio.Task[Any]]) -> bool:
+    """
+    Run a task as its own asyncio task so that it can be cancelled while the
+    worker keeps consuming. The task holds a concurrency slot of its tenant
+    while it runs, and the tokens it uses are charged to the tenant.
+
+    Args:
+        config (TaskConfig): The task configuration.
+        running (dict[str, asyncio.Task[Any]]): The running tasks by task id.
+
+    Returns:
+        bool: False if the task was cancelled.
     """
-    Consume tasks from the Redis stream and process them using the agent.
-    This function creates a Redis stream group if it does not exist,
-    then continuously reads messages from the stream and processes them
-    using the `run_agent` function. Each message is expected to be a JSON
+    tenant = tenant_of(config)
+    budget = Budget.create(config.budget)
+    budget.listeners.append(lambda _, tokens: charge_tokens(tenant, tokens))
+    task = asyncio.create_task(
+        run_agent(
+            user_input=config.goal,
+            context_input=config.context_strings,
+            revisions=config.revisions,
+            trace_id=config.trace_id,
+            budget=budget,
+        )
+    )
+    running[config.trace_id] = task
+    # a cancel published before the task was registered missed the watcher
+    if is_cancelled(config.trace_id):
+        task.cancel()
+    acquire_slot(config)
+    heartbeat = asyncio.create_task(hold_slot(config))
+    try:
+        await asyncio.wait({task})
+    finally:
+        running.pop(config.trace_id, None)
+        task.cancel()
+        heartbeat.cancel()
+        release_slot(config)
+    if task.cancelled():
+        return False
+    task.result()
+    return True
+
+
+async def finish_early(config: TaskConfig, status: TaskStatus, message: str) -> None:
     """
+    Mark a task that was cancelled or expired in its snapshot and complete its
+    update stream.
 
+    Args:
+        config (TaskConfig): The task configuration.
+        status (TaskStatus): The final status of the task.
+        message (str): The reason the task did not run to completion.
+    """
     logger = get_logger(__name__)
-
-    redis = get_redis_client()
+    release_task(config)
+    update_snapshot(config.trace_id, status)
     try:
-        redis.xgroup_create(
-            name=STREAM_NAME, groupname=GROUP_NAME, id="0", mkstream=True
+        await send_update(
+            config.trace_id,
+            RUNNER_STEP_ID,
+            RUNNER_AGENT_NAME,
+            "completed",
+            message=message,
         )
-    except ResponseError:
-        logger.info(f"Group `{GROUP_NAME}` already exists.")
+    except Exception as e:
+        logger.warning(f"Failed to send {status} task {config.trace_id}: {e}")
+    logger.info(f"Task with ID {config.trace_id} was {status}.")
+
+
+async def consume_tasks() -> None:
+    """
+    Consume tasks from the Redis streams and process them using the agent.
+    This function creates the Redis stream groups if they do not exist,
+    then continuously reads messages from the priority streams through the
+    scheduler and processes them using the `run_agent` function. Each message
+    is expected to be a JSON
+    """
+
+    logger = get_logger(__name__)
+    settings = get_settings()
 
+    redis = get_redis_client()
     consumer_name = codename(separator="-")
+    scheduler = Scheduler(redis, consumer_name)
+    metrics_updated = 0.0
+
     logger.info(f"Starting task consumer with name: {consumer_name}")
+    running: dict[str, asyncio.Task[Any]] = {}
+    watcher = asyncio.create_task(watch_cancellations(running))
 
     try:
         while True:
-            response = redis.xreadgroup(
-                groupname=GROUP_NAME,
-                consumername=consumer_name,
-                streams={STREAM_NAME: ">"},
-                count=1,
-                block=5000,
-            )
-            if response:
-                _, messages = response[0]  # type: ignore
-                for message_id, message in messages:  # type: ignore
-                    config = TaskConfig.model_validate_json(message["data"])  # type: ignore
+            # the read blocks while no task is available, so keep it off the
+            # event loop that runs the cancellation watcher
+            messages = await asyncio.to_thread(scheduler.read, 5000)
+            if time.monotonic() - metrics_updated >= settings.tenants.metrics_interval:
+                update_tenant_metrics()
+                metrics_updated = time.monotonic()
+            if messages:
+                for stream, message_id, message in messages:
+                    config = TaskConfig.model_validate_json(message["data"])
                     try:
-                        logger.info(f"Processing task with ID: {config.trace_id}")
-                        await run_agent(
-                            user_input=config.goal,
-                            context_input=config.context_strings,
-                            revisions=config.revisions,
-                            trace_id=config.trace_id,
+                        if is_duplicate(config):
+                            logger.info(f"Skipping duplicate task: {config.trace_id}")
+                            continue
+                        if is_cancelled(config.trace_id):
+                            await finish_early(
+                                config, "cancelled", "Task was cancelled."
+                            )
+                            continue
+                        if is_expired(config):
+                            if (
+                                settings.queue.expired_policy == "demote"
+                                and config.priority != "low"
+                            ):
+                                demote_task(redis, config)
+                                update_snapshot(
+                                    config.trace_id, priority="low", deadline=None
+                                )
+                                logger.info(f"Demoted expired task {config.trace_id}")
+                            else:
+                                await finish_early(
+                                    config, "expired", "Task deadline has passed."
+                                )
+                            continue
+                        logger.info(
+                            f"Processing {config.priority} priority task with ID: "
+                            f"{config.trace_id} for tenant {tenant_of(config)}"
                         )
+                        update_task_state(config, "running")
+                        if not await run_task(config, running):
+                            await finish_early(
+                                config, "cancelled", "Task was cancelled."
+                            )
+                            continue
 
                     except Exception as e:
+                        release_task(config)
+                        update_snapshot(config.trace_id, "failed", error=str(e))
                         logger.error(
                             f"Error processing task with ID {config.trace_id}: {e}"
                         )
                     else:
+                        snapshot = get_snapshot(config.trace_id)
+                        if snapshot and snapshot.passed is False:
+                            # duplicates of a task that did not pass run again
+                            release_task(config)
+                        else:
+                            update_task_state(config, "completed")
                         logger.info(
                             f"Task with ID {config.trace_id} processed successfully."
                         )
                     finally:
-                        redis.xack(STREAM_NAME, GROUP_NAME, message_id)  # type: ignore
+                        # the scheduler gave the task a slot when it was read,
+                        # free it for tasks that were skipped or failed
+                        release_slot(config)
+                        redis.xack(stream, GROUP_NAME, message_id)
+                        record_ack(tenant_of(config))
+                        trim_stream(stream)
                     logger.info(f"Processed task with ID: {config.trace_id}")
                     # Process the task data here
     except Exception as e:
         logger.error(f"Error processing task: {e}")
     except KeyboardInterrupt:
         logger.info("Task consumer stopped by user.")
+    finally:
+        watcher.cancel()
@@ -0,0 +1,206 @@
+import json
+from typing import Literal
+
+from ferros.core.utils import get_redis_client
+from ferros.messaging.constants import IDEMPOTENCY_PREFIX, IDEMPOTENCY_TTL
+from ferros.models.task import TaskConfig
+
+TaskState = Literal["queued", "running", "completed"]
+
+
+def idempotency_key(task: TaskConfig) -> str:
+    """
+    Get the Redis key used to deduplicate a task.
+
+    Args:
+        task (TaskConfig): The task configuration.
+
+    Returns:
+        str: The idempotency key for the task.
+    """
+    key = task.idempotency_key or task.fingerprint
+    return f"{IDEMPOTENCY_PREFIX}:{key}"
+
+
+def claim_value(task: TaskConfig, state: TaskState) -> str:
+    """
+    Get the value stored against the idempotency key of a task.
+
+    Args:
+        task (TaskConfig): The task configuration.
+        state (TaskState): The state of the task.
+
+    Returns:
+        str: The trace id and state of the task as JSON.
+    """
+    return json.dumps({"trace_id": task.trace_id, "state": state})
+
+
+def parse_claim(value: str | None) -> dict[str, str] | None:
+    """
+    Parse the value stored against an idempotency key.
+
+    Args:
+        value (str | None): The stored value, None if the key is not claimed.
+
+    Returns:
+        dict[str, str] | None: The trace id and state of the task, if any.
+    """
+    return json.loads(value) if value else None
+
+
+def find_task(key: str) -> dict[str, str] | None:
+    """
+    Find the task that already claimed an idempotency key.
+
+    Args:
+        key (str): The client-provided idempotency key or task fingerprint.
+
+    Returns:
+        dict[str, str] | None: The trace id and state of the task, if any.
+    """
+    value: str | None = get_redis_client().get(f"{IDEMPOTENCY_PREFIX}:{key}")  # type: ignore
+    return parse_claim(value)
+
+
+def find_tasks(tasks: list[TaskConfig]) -> list[dict[str, str] | None]:
+    """
+    Find the tasks that already claimed the idempotency keys of many tasks in
+    one round trip, without claiming them.
+
+    Args:
+        tasks (list[TaskConfig]): The task configurations.
+
+    Returns:
+        list[dict[str, str] | None]: For each task, the trace id and state of
+            the task that holds its key, if any.
+    """
+    if not tasks:
+        return []
+    keys = [f"{IDEMPOTENCY_PREFIX}:{t.idempotency_key or t.fingerprint}" for t in tasks]
+    values: list[str | None] = get_redis_client().mget(keys)  # type: ignore
+    return [parse_claim(value) for value in values]
+
+
+def claim_task(task: TaskConfig) -> dict[str, str] | None:
+    """
+    Claim the idempotency key for a task. The task's idempotency key is set to
+    its fingerprint when the client did not provide one, so the worker can
+    update the claim later.
+
+    Args:
+        task (TaskConfig): The task configuration.
+
+    Returns:
+        dict[str, str] | None: The trace id and state of the task that already
+            holds the claim, or None if the claim was made for this task.
+    """
+    task.idempotency_key = task.idempotency_key or task.fingerprint
+    # SET NX GET claims the key and returns the existing claim in one call
+    existing: str | None = get_redis_client().set(  # type: ignore
+        idempotency_key(task),
+        claim_value(task, "queued"),
+        nx=True,
+        ex=IDEMPOTENCY_TTL,
+        get=True,
+    )
+    return parse_claim(existing)
+
+
+def claim_tasks(tasks: list[TaskConfig]) -> list[dict[str, str] | None]:
+    """
+    Claim the idempotency keys for many tasks in one pipelined round trip.
+    Tasks later in the list that repeat an earlier task are duplicates of it.
+
+    Args:
+        tasks (list[TaskConfig]): The task configurations.
+
+    Returns:
+        list[dict[str, str] | None]: For each task, the trace id and state of
+            the task that already holds the claim, or None if the claim was
+            made for the task.
+    """
+    pipe = get_redis_client().pipeline(transaction=False)
+    for task in tasks:
+        task.idempotency_key = task.idempotency_key or task.fingerprint
+        pipe.set(
+            idempotency_key(task),
+            claim_value(task, "queued"),
+            nx=True,
+            ex=IDEMPOTENCY_TTL,
+            get=True,
+        )
+    return [parse_claim(existing) for existing in pipe.execute()]
+
+
+def update_task_state(task: TaskConfig, state: TaskState) -> None:
+    """
+    Record the execution state of a task against its idempotency key.
+
+    Args:
+        task (TaskConfig): The task configuration.
+        state (TaskState): The state of the task.
+    """
+    if not task.idempotency_key:
+        return
+    value = claim_value(task, state)
+    get_redis_client().set(idempotency_key(task), value, ex=IDEMPOTENCY_TTL)
+
+
+def release_task(task: TaskConfig) -> None:
+    """
+    Release the idempotency key of a task so that a retry executes again.
+
+    Args:
+        task (TaskConfig): The task configuration.
+    """
+    if not task.idempotency_key:
+        return
+    redis = get_redis_client()
+    key = idempotency_key(task)
+    existing = parse_claim(redis.get(key))  # type: ignore
+    if existing and existing["trace_id"] == task.trace_id:
+        redis.delete(key)
+
+
+def release_tasks(tasks: list[TaskConfig]) -> None:
+    """
+    Release the idempotency keys of many tasks in one round trip.
+
+    Args:
+        tasks (list[TaskConfig]): The task configurations.
+    """
+    redis = get_redis_client()
+    pipe = redis.pipeline(transaction=False)
+    for task in tasks:
+        if task.idempotency_key:
+            pipe.delete(idempotency_key(task))
+    pipe.execute()
+
+
+def is_duplicate(task: TaskConfig) -> bool:
+    """
+    Check if a task was superseded by another task with the same idempotency key.
+
+    Args:
+        task (TaskConfig): The task configuration.
+
+    Returns:
+        bool: True if another task holds the idempotency key.
+    """
+    if not task.idempotency_key:
+        return False
+    existing = parse_claim(get_redis_client().get(idempotency_key(task)))  # type: ignore
+    return existing is not None and existing["trace_id"] != task.trace_id
+
+
+__all__ = [
+    "claim_task",
+    "claim_tasks",
+    "find_task",
+    "find_tasks",
+    "is_duplicate",
+    "release_task",
+    "release_tasks",
+    "update_task_state",
+]
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import asyncio
+from collections import defaultdict
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from redis import Redis
+
+from ferros.core.logging import get_logger
+from ferros.core.metrics import incr, set_gauge
+from ferros.core.utils import get_redis_client, get_settings
+from ferros.messaging.constants import STREAM_LAST_ID, TASK_UPDATE_STREAM
+from ferros.models.settings import DropPolicy
+
+StreamMessage = tuple[str, dict[str, Any]]
+REPLAY_COUNT = 500
+
+
+def parse_id(message_id: str) -> tuple[int, int]:
+    """
+    Parse a Redis stream id into a comparable tuple.
+
+    Args:
+        message_id (str): The stream id, e.g. `1718000000000-0`.
+
+    Returns:
+        tuple[int, int]: The millisecond time and sequence number of the id.
+    """
+    ms, _, seq = message_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class Subscription:
+    """
+    A subscriber to a task update stream. Live updates are delivered by the
+    multiplexer into a bounded queue; updates older than the multiplexer
+    cursor are replayed from Redis by the subscriber itself.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        stream: str,
+        last_id: str,
+        maxsize: int,
+        policy: DropPolicy,
+    ) -> None:
+        self.redis = redis
+        self.stream = stream
+        self.last_id = last_id
+        self.policy = policy
+        self.queue: asyncio.Queue[StreamMessage | None] = asyncio.Queue(maxsize)
+        self.lagging = False
+        self.closed = False
+
+    def deliver(self, item: StreamMessage) -> bool:
+        """
+        Deliver a live update to the subscriber, applying the drop policy when
+        the buffer is full.
+
+        Args:
+            item (StreamMessage): The stream id and fields of the update.
+
+        Returns:
+            bool: False if the subscriber was disconnected.
+        """
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            incr("stream_multiplexer.dropped")
+
+        match self.policy:
+            case "drop-newest":
+                return True
+            case "drop-oldest":
+                self.queue.get_nowait()
+                self.queue.put_nowait(item)
+                return True
+            case "resync":
+                self.clear()
+                self.lagging = True
+                self.queue.put_nowait(item)
+                return True
+            case _:
+                self.close()
+                return False
+
+    def clear(self) -> None:
+        """
+        Drop all buffered updates.
+        """
+        while not self.queue.empty():
+            self.queue.get_nowait()
+
+    def close(self) -> None:
+        """
+        Close the subscription and wake up the subscriber.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.clear()
+        self.queue.put_nowait(None)
+
+    async def replay(self) -> AsyncGenerator[StreamMessage, None]:
+        """
+        Read the updates after the last delivered id directly from Redis.
+
+        Yields:
+            StreamMessage: The stream id and fields of each update.
+        """
+        while True:
+            response: list[StreamMessage] = await asyncio.to_thread(
+                self.redis.xrange,  # type: ignore
+                self.stream,
+                min=f"({self.last_id}",
+                max="+",
+                count=REPLAY_COUNT,
+            )
+            for message_id, message in response:
+                self.last_id = message_id
+                yield message_id, message
+            if len(response) < REPLAY_COUNT:
+                return
+
+    async def __aiter__(self) -> AsyncIterator[StreamMessage]:
+        async for item in self.replay():
+            yield item
+
+        while not self.closed:
+            item = await self.queue.get()
+            if item is None:
+                return
+            if self.lagging:
+                self.lagging = False
+                async for replayed in self.replay():
+                    yield replayed
+            if parse_id(item[0]) <= parse_id(self.last_id):
+                continue
+            self.last_id = item[0]
+            yield item
+
+
+class StreamMultiplexer:
+    """
+    Fan out task update streams to many subscribers with a single XREAD loop
+    per process.
+    """
+
+    def __init__(self, redis: Redis) -> None:
+        settings = get_settings().streaming
+        self.redis = redis
+        self.buffer_size = settings.buffer_size
+        self.policy: DropPolicy = settings.drop_policy
+        self.block_ms = settings.block_ms
+        self.read_count = settings.read_count
+        self.cursors: dict[str, str] = {}
+        self.subscribers: dict[str, set[Subscription]] = defaultdict(set)
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        self.logger = get_logger(__name__)
+
+    @asynccontextmanager
+    async def subscribe(
+        self, task_id: str, last_id: str = STREAM_LAST_ID
+    ) -> AsyncGenerator[Subscription, None]:
+        """
+        Subscribe to the update stream of a task.
+
+        Args:
+            task_id (str): The ID of the task.
+            last_id (str): Only deliver updates after this stream id.
+
+        Yields:
+            Subscription: The subscription to iterate over.
+        """
+        stream = f"{TASK_UPDATE_STREAM}:{task_id}"
+        sub = Subscription(self.redis, stream, last_id, self.buffer_size, self.policy)
+        if stream not in self.cursors:
+            # live delivery starts after the latest update, older ones are replayed
+            latest = await asyncio.to_thread(
+                self.redis.xrevrange,  # type: ignore
+                stream,
+                count=1,
+            )
+            self.cursors.setdefault(stream, latest[0][0] if latest else "0-0")
+        self.subscribers[stream].add(sub)
+        self.update_gauges()
+        self.start()
+        try:
+            yield sub
+        finally:
+            self.unsubscribe(sub)
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        """
+        Remove a subscriber and stop reading its stream if it was the last one.
+
+        Args:
+            sub (Subscription): The subscription to remove.
+        """
+        sub.close()
+        subscribers = self.subscribers.get(sub.stream)
+        if subscribers is not None:
+            subscribers.discard(sub)
+            if not subscribers:
+                self.subscribers.pop(sub.stream, None)
+                self.cursors.pop(sub.stream, None)
+        self.update_gauges()
+
+    def update_gauges(self) -> None:
+        """
+        Update the subscriber and stream gauges.
+        """
+        set_gauge("stream_multiplexer.streams", len(self.cursors))
+        set_gauge(
+            "stream_multiplexer.subscribers",
+            sum(len(subs) for subs in self.subscribers.values()),
+        )
+
+    def start(self) -> None:
+        """
+        Start the shared read loop if it is not running.
+        """
+        self.wakeup.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def run(self) -> None:
+        """
+        Read all subscribed streams with one XREAD call and dispatch the
+        updates to the subscribers.
+        """
+        self.logger.info("Stream multiplexer started.")
+        while True:
+            if not self.cursors:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            try:
+                response = await asyncio.to_thread(
+                    self.redis.xread,  # type: ignore
+                    dict(self.cursors),
+                    count=self.read_count,
+                    block=self.block_ms,
+                )
+            except Exception as e:
+                self.logger.error(f"Error while reading task update streams: {e}")
+                await asyncio.sleep(1)
+                continue
+
+            for stream, messages in response or []:  # type: ignore
+                if stream not in self.cursors:
+                    continue
+                for message_id, message in messages:
+                    self.cursors[stream] = message_id
+                    for sub in list(self.subscribers.get(stream, ())):
+                        if not sub.deliver((message_id, message)):
+                            self.unsubscribe(sub)
+
+
+multiplexer: None | StreamMultiplexer = None
+
+
+def get_multiplexer() -> StreamMultiplexer:
+    """
+    Get the process-wide stream multiplexer, creating it if it doesn't exist.
+
+    Returns:
+        StreamMultiplexer: The stream multiplexer.
+    """
+    global multiplexer
+    if multiplexer is None:
+        multiplexer = StreamMultiplexer(get_redis_client(name="blackboard"))
+    return multiplexer
+
+
+__all__ = ["StreamMessage", "Subscription", "get_multiplexer"]
@@ -0,0 +1,117 @@
+import json
+import re
+import time
+from typing import Any
+
+from ferros.core.logging import get_logger
+from ferros.core.utils import get_redis_client, get_settings
+from ferros.messaging.constants import TASK_UPDATE_STREAM
+from ferros.tools.mcps import SAVE_RESULT_TOOL_NAME
+
+PARTIAL_RESULT_ACTION = "partial-result"
+RESULT_FIELD = "result"
+
+
+def partial_string(arguments: str, name: str) -> str | None:
+    """
+    Decode the part of a string field received so far from partial JSON tool
+    call arguments.
+
+    Args:
+        arguments (str): The JSON arguments received so far.
+        name (str): The name of the string field.
+
+    Returns:
+        str | None: The decoded prefix of the field, or None if the field has
+            not started yet.
+    """
+    match = re.search(rf'"{name}"\s*:\s*"', arguments)
+    if not match:
+        return None
+    raw = arguments[match.end() :]
+    end = 0
+    while end < len(raw) and raw[end] != '"':
+        if raw[end] == "\\":
+            size = 6 if raw[end + 1 : end + 2] == "u" else 2
+            if end + size > len(raw):
+                break  # the escape sequence is incomplete
+            end += size
+        else:
+            end += 1
+    return json.loads(f'"{raw[:end]}"')
+
+
+class PartialResultPublisher:
+    """
+    Publish the result of a step while the agent is still writing it, as
+    `partial-result` events on the update stream of the task. The result is
+    read from the arguments of the save result tool call as they stream in,
+    and the deltas are coalesced so at most one event is published per
+    interval.
+    """
+
+    def __init__(self, plan_id: str, step_id: int, agent_name: str) -> None:
+        self.plan_id = plan_id
+        self.step_id = step_id
+        self.agent_name = agent_name
+        self.interval = get_settings().streaming.partial_interval
+        self.call = 0
+        self.tracking = False
+        self.arguments = ""
+        self.published = 0
+        self.flushed = 0.0
+
+    def on_event(self, event: Any) -> None:
+        """
+        Handle a raw response event of the streamed run.
+
+        Args:
+            event (Any): The raw response event.
+        """
+        event_type = getattr(event, "type", None)
+        if event_type == "response.output_item.added":
+            item = event.item
+            if getattr(item, "type", None) == "function_call":
+                self.flush()
+                self.call += 1
+                self.tracking = getattr(item, "name", None) == SAVE_RESULT_TOOL_NAME
+                self.arguments = getattr(item, "arguments", "") or ""
+                self.published = 0
+        elif event_type == "response.function_call_arguments.delta" and self.tracking:
+            self.arguments += event.delta
+            if time.monotonic() - self.flushed >= self.interval:
+                self.flush()
+
+    def flush(self) -> None:
+        """
+        Publish the part of the result received since the last event.
+        """
+        if not self.tracking:
+            return
+        self.flushed = time.monotonic()
+        result = partial_string(self.arguments, RESULT_FIELD)
+        if not result or len(result) <= self.published:
+            return
+        data = {
+            "step_id": self.step_id,
+            "agent_name": self.agent_name,
+            "call": self.call,
+            "offset": self.published,
+            "delta": result[self.published :],
+        }
+        fields = {
+            "plan_id": self.plan_id,
+            "action": PARTIAL_RESULT_ACTION,
+            "data": json.dumps(data),
+        }
+        try:
+            stream = f"{TASK_UPDATE_STREAM}:{self.plan_id}"
+            get_redis_client(name="blackboard").xadd(stream, fields)  # type: ignore
+            self.published = len(result)
+        except Exception as e:
+            get_logger(__name__).warning(
+                f"Failed to publish partial result of plan {self.plan_id}: {e}"
+            )
+
+
+__all__ = ["PARTIAL_RESULT_ACTION", "PartialResultPublisher", "partial_string"]
@@ -1,27 +1,130 @@
+from typing import Any
+
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 from ferros.core.logging import get_logger
+from ferros.core.snapshot import update_snapshot, update_snapshots
 from ferros.core.utils import get_redis_client
-from ferros.messaging.constants import STREAM_NAME
+from ferros.messaging.constants import BATCH_CHUNK_SIZE
+from ferros.messaging.idempotency import (
+    claim_task,
+    claim_tasks,
+    release_task,
+    release_tasks,
+)
+from ferros.messaging.scheduler import task_stream
+from ferros.messaging.tenants import register_tenants, tenant_of
 from ferros.models.task import TaskConfig
 
 
+def queued_fields(task: TaskConfig) -> dict[str, Any]:
+    """
+    Get the snapshot fields of a queued task.
+
+    Args:
+        task (TaskConfig): The task configuration.
+
+    Returns:
+        dict[str, Any]: The goal, tenant and scheduling options of the task.
+    """
+    include = {"goal", "tenant_id", "priority", "deadline"}
+    return task.model_dump(mode="json", include=include)
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_random_exponential(multiplier=1, max=15),
     reraise=True,
 )
-async def publish_task(task: TaskConfig) -> None:
+async def publish_task(task: TaskConfig) -> dict[str, str]:
     """
-    Publish a task to the Redis stream for processing by agents.
+    Publish a task to the Redis stream for processing by agents. Duplicate
+    submissions are not published again, instead the trace id of the task
+    that is already queued, running or completed is returned. Tasks that
+    failed or did not pass their evaluation release their claim, so their
+    duplicates run again.
 
     Args:
         task (TaskConfig): The task configuration to be published.
 
     Returns:
-        None
+        dict[str, str]: The task id that serves the request and its status.
     """
     logger = get_logger(__name__)
+    existing = claim_task(task)
+    if existing:
+        trace_id, state = existing["trace_id"], existing.get("state", "queued")
+        logger.info(f"Task {task.trace_id} is a duplicate of {trace_id} ({state}).")
+        return {"task_id": trace_id, "status": f"task {state}"}
+
     redis = get_redis_client()
-    redis.xadd(name=STREAM_NAME, fields={"data": task.model_dump_json()})
-    logger.info(f"Task {task.trace_id} published to stream {STREAM_NAME}.")
+    try:
+        register_tenants({tenant_of(task)})
+        redis.xadd(
+            name=task_stream(task),
+            fields={"data": task.model_dump_json()},
+        )
+    except Exception:
+        release_task(task)
+        raise
+    update_snapshot(task.trace_id, "queued", **queued_fields(task))
+    logger.info(f"Task {task.trace_id} published to stream {task_stream(task)}.")
+    return {"task_id": task.trace_id, "status": "task published"}
+
+
+async def publish_tasks(tasks: list[TaskConfig]) -> list[dict[str, str]]:
+    """
+    Publish many tasks to the Redis stream with pipelined round trips per
+    chunk of tasks instead of one round trip per task. Duplicate submissions
+    are resolved the same way as in `publish_task`.
+
+    Args:
+        tasks (list[TaskConfig]): The task configurations to be published.
+
+    Returns:
+        list[dict[str, str]]: The task id that serves each request and its
+            status, in the order of the tasks.
+    """
+    logger = get_logger(__name__)
+    redis = get_redis_client()
+    responses: list[dict[str, str]] = []
+    for start in range(0, len(tasks), BATCH_CHUNK_SIZE):
+        chunk = tasks[start : start + BATCH_CHUNK_SIZE]
+        claims = claim_tasks(chunk)
+        queued = [t for t, existing in zip(chunk, claims, strict=True) if not existing]
+
+        pipe = redis.pipeline(transaction=False)
+        for task in queued:
+            pipe.xadd(
+                name=task_stream(task),
+                fields={"data": task.model_dump_json()},
+            )
+        try:
+            register_tenants({tenant_of(task) for task in queued})
+            results = pipe.execute(raise_on_error=False)
+        except Exception:
+            release_tasks(queued)
+            raise
+        # the pipeline is not a transaction, so the tasks added before an
+        # error stay queued and keep their claims
+        published: list[TaskConfig] = []
+        failed: list[TaskConfig] = []
+        for task, result in zip(queued, results, strict=True):
+            (failed if isinstance(result, Exception) else published).append(task)
+        update_snapshots({t.trace_id: queued_fields(t) for t in published}, "queued")
+        if failed:
+            release_tasks(failed)
+            raise next(r for r in results if isinstance(r, Exception))
+
+        for task, existing in zip(chunk, claims, strict=True):
+            if existing:
+                state = existing.get("state", "queued")
+                responses.append(
+                    {"task_id": existing["trace_id"], "status": f"task {state}"}
+                )
+            else:
+                responses.append({"task_id": task.trace_id, "status": "task published"})
+        logger.info(
+            f"Published {len(queued)} of {len(chunk)} tasks to the task streams."
+        )
+    return responses
@@ -0,0 +1,285 @@
+import time
+from collections import deque
+from datetime import UTC, datetime
+
+from redis import Redis, ResponseError
+
+from ferros.core.logging import get_logger
+from ferros.core.utils import get_settings
+from ferros.messaging.constants import GROUP_NAME, STREAM_NAME
+from ferros.messaging.tenants import (
+    DEFAULT_TENANT,
+    assign_slot,
+    free_slot,
+    get_limits,
+    get_tenants,
+    is_over_quota,
+    reserve_slot,
+    tenant_of,
+)
+from ferros.models.task import Priority, TaskConfig
+
+PRIORITIES: tuple[Priority, ...] = ("high", "normal", "low")
+
+TaskMessage = tuple[str, str, dict[str, str]]
+
+
+def stream_name(priority: Priority, tenant: str = DEFAULT_TENANT) -> str:
+    """
+    Get the name of the task stream for a priority and tenant. Normal priority
+    tasks of the default tenant use the original task stream.
+
+    Args:
+        priority (Priority): The priority of the task.
+        tenant (str): The tenant of the task.
+
+    Returns:
+        str: The name of the stream.
+    """
+    name = STREAM_NAME if priority == "normal" else f"{STREAM_NAME}:{priority}"
+    return name if tenant == DEFAULT_TENANT else f"{name}:tenant:{tenant}"
+
+
+def task_stream(task: TaskConfig) -> str:
+    """
+    Get the name of the task stream a task is published to.
+
+    Args:
+        task (TaskConfig): The task configuration.
+
+    Returns:
+        str: The name of the stream.
+    """
+    return stream_name(task.priority, tenant_of(task))
+
+
+def task_streams(tenants: list[str] | None = None) -> list[str]:
+    """
+    Get the names of the task streams from the highest to the lowest priority.
+
+    Args:
+        tenants (list[str] | None): The tenants to include. Defaults to all
+            registered tenants.
+
+    Returns:
+        list[str]: The names of the streams.
+    """
+    tenants = get_tenants() if tenants is None else tenants
+    return [stream_name(p, tenant) for p in PRIORITIES for tenant in tenants]
+
+
+def is_expired(task: TaskConfig) -> bool:
+    """
+    Check if the deadline of a task has passed.
+
+    Args:
+        task (TaskConfig): The task configuration.
+
+    Returns:
+        bool: True if the task has a deadline in the past.
+    """
+    return task.deadline is not None and task.deadline <= datetime.now(UTC)
+
+
+def demote_task(redis: Redis, task: TaskConfig) -> TaskConfig:
+    """
+    Move an expired task to the low priority stream without a deadline, so it
+    only runs when there is spare capacity.
+
+    Args:
+        redis (Redis): The Redis client of the task streams.
+        task (TaskConfig): The expired task configuration.
+
+    Returns:
+        TaskConfig: The demoted task configuration.
+    """
+    demoted = task.model_copy(update={"priority": "low", "deadline": None})
+    redis.xadd(
+        name=task_stream(demoted),
+        fields={"data": demoted.model_dump_json()},
+    )
+    return demoted
+
+
+class Scheduler:
+    """
+    Read tasks from the priority streams with smooth weighted round robin, so
+    that high priority tasks are served first without starving lower ones.
+    Within a priority, the tenant sub-streams are served with deficit round
+    robin and tenants over quota are skipped, deferring their tasks. Streams
+    without tasks give their turn to the next stream. A slot of a tenant with
+    a concurrency limit is reserved before its streams are read, so workers
+    reading in parallel cannot start more tasks than the limit.
+    """
+
+    def __init__(self, redis: Redis, consumer_name: str) -> None:
+        weights = get_settings().queue.weights
+        self.redis = redis
+        self.consumer_name = consumer_name
+        self.weights = {p: weights.get(p, 0) for p in PRIORITIES}
+        self.credits = dict.fromkeys(PRIORITIES, 0)
+        self.rotations: dict[Priority, deque[str]] = {p: deque() for p in PRIORITIES}
+        self.deficits: dict[Priority, dict[str, int]] = {p: {} for p in PRIORITIES}
+        self.groups: set[str] = set()
+        self.logger = get_logger(__name__)
+
+    def create_groups(self, streams: list[str]) -> None:
+        """
+        Create the worker group on the task streams if it does not exist.
+
+        Args:
+            streams (list[str]): The names of the streams.
+        """
+        for stream in streams:
+            if stream in self.groups:
+                continue
+            try:
+                self.redis.xgroup_create(
+                    name=stream, groupname=GROUP_NAME, id="0", mkstream=True
+                )
+            except ResponseError:
+                self.logger.info(f"Group `{GROUP_NAME}` already exists on {stream}.")
+            self.groups.add(stream)
+
+    def order(self) -> list[Priority]:
+        """
+        Pick the priority whose turn it is and fall back to the others.
+
+        Returns:
+            list[Priority]: The priorities in the order they should be read.
+        """
+        total = sum(self.weights.values())
+        for priority, weight in self.weights.items():
+            self.credits[priority] += weight
+        chosen = max(PRIORITIES, key=lambda p: self.credits[p])
+        self.credits[chosen] -= total
+        return [chosen] + [p for p in PRIORITIES if p != chosen]
+
+    def tenant_order(self, priority: Priority, tenants: list[str]) -> list[str]:
+        """
+        Get the tenants in deficit round robin order for a priority.
+
+        Args:
+            priority (Priority): The priority.
+            tenants (list[str]): The tenants under quota.
+
+        Returns:
+            list[str]: The tenants in the order their streams should be read.
+        """
+        rotation = self.rotations[priority]
+        deficits = self.deficits[priority]
+        for tenant in tenants:
+            if tenant not in deficits:
+                deficits[tenant] = 0
+                rotation.append(tenant)
+        return [t for t in rotation if t in tenants]
+
+    def served(self, priority: Priority, tenant: str, found: bool) -> None:
+        """
+        Update the deficit of a tenant after reading its stream. A tenant gets
+        its quantum when its turn starts and keeps the turn until the deficit
+        is spent or its stream is empty.
+
+        Args:
+            priority (Priority): The priority of the stream.
+            tenant (str): The tenant of the stream.
+            found (bool): Whether a task was read from the stream.
+        """
+        rotation = self.rotations[priority]
+        deficits = self.deficits[priority]
+        if found:
+            if deficits[tenant] < 1:
+                deficits[tenant] += get_limits(tenant).quantum
+            deficits[tenant] -= 1
+        else:
+            deficits[tenant] = 0
+        if deficits[tenant] < 1:
+            rotation.remove(tenant)
+            rotation.append(tenant)
+
+    def read(self, block_ms: int) -> list[TaskMessage]:
+        """
+        Read the next task, waiting for a new task on all streams when none
+        has tasks.
+
+        Args:
+            block_ms (int): The maximum time to block in milliseconds.
+
+        Returns:
+            list[TaskMessage]: The stream, id and fields of the task read, or
+                an empty list if no task could be read.
+        """
+        tenants = [t for t in get_tenants() if not is_over_quota(t)]
+        if not tenants:
+            # every tenant is over quota, wait for running tasks to finish
+            time.sleep(block_ms / 1000)
+            return []
+        self.create_groups(task_streams(tenants))
+
+        holder = f"{self.consumer_name}:reserved"
+        slots: dict[str, bool] = {}
+        try:
+            for priority in self.order():
+                for tenant in self.tenant_order(priority, tenants):
+                    limited = get_limits(tenant).max_concurrency is not None
+                    if limited and tenant not in slots:
+                        slots[tenant] = reserve_slot(tenant, holder)
+                    if limited and not slots[tenant]:
+                        continue  # another worker took the last slot
+                    stream = stream_name(priority, tenant)
+                    response = self.redis.xreadgroup(
+                        groupname=GROUP_NAME,
+                        consumername=self.consumer_name,
+                        streams={stream: ">"},
+                        count=1,
+                    )
+                    self.served(priority, tenant, bool(response))
+                    if not response:
+                        continue
+                    _, messages = response[0]  # type: ignore
+                    if limited:
+                        task = TaskConfig.model_validate_json(messages[0][1]["data"])  # type: ignore
+                        assign_slot(tenant, holder, task)
+                        del slots[tenant]
+                    return [(stream, mid, msg) for mid, msg in messages]  # type: ignore
+        finally:
+            for tenant, reserved in slots.items():
+                if reserved:
+                    free_slot(tenant, holder)
+
+        tenants = [t for t in tenants if slots.get(t, True)]
+        self.wait(task_streams(tenants), block_ms)
+        return []
+
+    def wait(self, streams: list[str], block_ms: int) -> None:
+        """
+        Block until a task is added to any of the streams without reading it,
+        so the next read picks it with the priority and quota checks.
+
+        Args:
+            streams (list[str]): The names of the streams.
+            block_ms (int): The maximum time to block in milliseconds.
+        """
+        if not streams:
+            time.sleep(block_ms / 1000)
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for stream in streams:
+            pipe.xinfo_groups(stream)
+        last_ids: dict[str, str] = {}
+        for stream, groups in zip(streams, pipe.execute(), strict=True):
+            group = next((g for g in groups if g["name"] == GROUP_NAME), None)
+            last_ids[stream] = group["last-delivered-id"] if group else "0"
+        self.redis.xread(streams=last_ids, count=1, block=block_ms)  # type: ignore
+
+
+__all__ = [
+    "PRIORITIES",
+    "Scheduler",
+    "TaskMessage",
+    "demote_task",
+    "is_expired",
+    "stream_name",
+    "task_stream",
+    "task_streams",
+]
@@ -1,6 +1,8 @@
+import asyncio
 import json
-import time
+import zlib
 from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
@@ -12,52 +14,132 @@ from rich.panel import Panel
 
 from ferros.agents.utils import get_step
 from ferros.core.logging import get_logger
-from ferros.core.utils import get_redis_client
-from ferros.messaging.constants import STREAM_LAST_ID, TASK_UPDATE_STREAM
+from ferros.core.utils import get_settings
+from ferros.messaging.constants import STREAM_LAST_ID
+from ferros.messaging.multiplexer import get_multiplexer
+from ferros.messaging.partials import PARTIAL_RESULT_ACTION
 from ferros.models.plan import Plan
 
+# the statuses of the task updates that end the update stream
+FINAL_UPDATES = ("completed", "failed")
+
 
 @dataclass
 class TaskResult:
     plan: Plan | None = None
     results: dict[int, Any] = field(default_factory=lambda: {})
+    partials: dict[int, str] = field(default_factory=lambda: {})
     is_completed: bool = False
     streams: list[dict[str, Any]] = field(default_factory=lambda: [])
 
 
-async def stream_task_updates(task_id: str) -> AsyncGenerator[dict[str, Any], None]:
+async def stream_task_updates(
+    task_id: str, last_id: str = STREAM_LAST_ID
+) -> AsyncGenerator[dict[str, Any], None]:
     """
-    Poll the stream for updates.
+    Stream the updates of a task through the shared stream multiplexer.
 
     Args:
         task_id (str): The ID of the task.
+        last_id (str): Only stream updates after this stream id.
 
-    Raises:
-        ValueError: If the stream does not exist.
-        KeyboardInterrupt: If the user interrupts the polling.
+    Yields:
+        dict[str, Any]: The fields of each task update.
     """
 
-    last_id: str = STREAM_LAST_ID
     logger = get_logger(__name__)
+    logger.info(f"Subscribing to updates for task: {task_id} @ {last_id}")
+
+    async with get_multiplexer().subscribe(task_id, last_id) as subscription:
+        async for _, message in subscription:
+            yield message
+
+
+def is_task_completed(stream: dict[str, Any]) -> bool:
+    """
+    Check if a stream update marks the whole task as completed or failed
+    without decoding any other updates.
+
+    Args:
+        stream (dict[str, Any]): The stream data containing the action and data.
+
+    Returns:
+        bool: True if the update ends the task.
+    """
+    if stream.get("action") != "update-status":
+        return False
+    data: dict[str, Any] = json.loads(stream.get("data", "{}"))
+    return (
+        data.get("status", "") in FINAL_UPDATES
+        and data.get("agent_name", "").lower() == "knowledge worker"
+    )
 
-    redis = get_redis_client(name="blackboard")
-    stream_name = f"{TASK_UPDATE_STREAM}:{task_id}"
-    logger.info(f"Starting to poll stream: {stream_name} @ {last_id}")
-
-    try:
-        while True:
-            response = redis.xread({stream_name: last_id}, count=10, block=5000)  # type:ignore
-            for _, messages in response:  # type:ignore
-                for message_id, message in messages:  # type:ignore
-                    try:
-                        yield message
-                        last_id = message_id  # type:ignore
-                    except Exception as e:
-                        logger.error(f"Error processing message {message_id}: {e}")
-    except Exception as e:
-        logger.error(f"Error while polling stream {stream_name}: {e}")
-    except KeyboardInterrupt:
-        logger.error("Stream polling stopped by user.")
+
+def format_event(message_id: str, stream: dict[str, Any]) -> str:
+    """
+    Format a stream update as a Server-Sent Event with the stream id as the
+    event id.
+
+    Args:
+        message_id (str): The stream id of the update.
+        stream (dict[str, Any]): The stream data containing the action and data.
+
+    Returns:
+        str: The Server-Sent Event.
+    """
+    event = stream.get("action", "message")
+    return f"id: {message_id}\nevent: {event}\ndata: {json.dumps(stream)}\n\n"
+
+
+async def stream_task_events(
+    task_id: str, last_id: str = STREAM_LAST_ID, compress: bool = False
+) -> AsyncGenerator[bytes, None]:
+    """
+    Stream the updates of a task as Server-Sent Events, starting after the
+    given stream id. Keep-alive comments are sent while the task is idle, and
+    the events are gzip compressed with a flush per event when requested.
+
+    Args:
+        task_id (str): The ID of the task.
+        last_id (str): Only stream updates after this stream id.
+        compress (bool): Whether to gzip compress the events.
+
+    Yields:
+        bytes: The encoded events.
+    """
+    settings = get_settings().streaming
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode("utf-8")
+        if compressor is None:
+            return data
+        return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    yield encode(f"retry: {settings.retry_ms}\n\n")
+    async with get_multiplexer().subscribe(task_id, last_id) as subscription:
+        updates = aiter(subscription)
+        pending: asyncio.Future[tuple[str, dict[str, Any]]] | None = None
+        try:
+            while True:
+                pending = pending or asyncio.ensure_future(anext(updates))
+                done, _ = await asyncio.wait({pending}, timeout=settings.keepalive)
+                if not done:
+                    yield encode(": keep-alive\n\n")
+                    continue
+                message_id, message = pending.result()
+                pending = None
+                yield encode(format_event(message_id, message))
+                if is_task_completed(message):
+                    break
+        except StopAsyncIteration:
+            pass
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    if compressor is not None:
+        yield compressor.flush(zlib.Z_FINISH)
 
 
 def unwrap_stream_data(stream: dict[str, Any], result: TaskResult) -> TaskResult:
@@ -91,11 +173,18 @@ def unwrap_stream_data(stream: dict[str, Any], result: TaskResult) -> TaskResult
     # collect results
     elif action == "save-result" and step_id is not None:
         result.results[int(step_id)] = data.get("result", "")
+        result.partials.pop(int(step_id), None)
+
+    # collect the partial results of steps still writing them
+    elif action == PARTIAL_RESULT_ACTION and step_id is not None:
+        partial = result.partials.get(int(step_id), "")
+        offset = int(data.get("offset", 0))
+        result.partials[int(step_id)] = partial[:offset] + data.get("delta", "")
 
-    # task completed
+    # task completed or failed
     elif (
         action == "update-status"
-        and status == "completed"
+        and status in FINAL_UPDATES
         and agent == "knowledge worker"
     ):
         result.is_completed = True
@@ -179,13 +268,13 @@ async def stream_updates(task_id: str) -> None:
     logger = get_logger(__name__)
     result = TaskResult()
 
-    async for update in stream_task_updates(task_id):
-        time.sleep(1)
-        logger.info(f"Update for task {task_id}: {update}")
-        unwrap_stream_data(update, result)
-        if result.is_completed:
-            logger.info(f"Task {task_id} completed.")
-            break
+    async with aclosing(stream_task_updates(task_id)) as updates:
+        async for update in updates:
+            logger.info(f"Update for task {task_id}: {update}")
+            unwrap_stream_data(update, result)
+            if result.is_completed:
+                logger.info(f"Task {task_id} completed.")
+                break
 
     display_task_result(result)
     write_streams_to_file(task_id, result.streams)
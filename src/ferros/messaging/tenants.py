@@ -0,0 +1,282 @@
+import asyncio
+import time
+
+from redis.client import Pipeline
+
+from ferros.core.logging import get_logger
+from ferros.core.utils import get_redis_client, get_settings
+from ferros.messaging.constants import (
+    TENANT_RUNNING_PREFIX,
+    TENANT_TOKENS_PREFIX,
+    TENANTS_KEY,
+)
+from ferros.models.settings import TenantLimits
+from ferros.models.task import TaskConfig
+
+DEFAULT_TENANT = "default"
+
+
+def tenant_of(task: TaskConfig) -> str:
+    """
+    Get the tenant of a task.
+
+    Args:
+        task (TaskConfig): The task configuration.
+
+    Returns:
+        str: The tenant id, or the default tenant if the task has none.
+    """
+    return task.tenant_id or DEFAULT_TENANT
+
+
+def get_limits(tenant: str) -> TenantLimits:
+    """
+    Get the quota limits of a tenant.
+
+    Args:
+        tenant (str): The tenant id.
+
+    Returns:
+        TenantLimits: The limits of the tenant.
+    """
+    settings = get_settings().tenants
+    return settings.overrides.get(tenant, settings.default)
+
+
+def get_tenants() -> list[str]:
+    """
+    Get all tenants that submitted tasks, starting with the default tenant.
+
+    Returns:
+        list[str]: The sorted tenant ids.
+    """
+    members: set[str] = get_redis_client().smembers(TENANTS_KEY)  # type: ignore
+    return [DEFAULT_TENANT] + sorted(members - {DEFAULT_TENANT})
+
+
+def register_tenants(tenants: set[str]) -> None:
+    """
+    Register the tenants of submitted tasks so that workers read their streams.
+
+    Args:
+        tenants (set[str]): The tenant ids.
+    """
+    tenants = tenants - {DEFAULT_TENANT}
+    if tenants:
+        get_redis_client().sadd(TENANTS_KEY, *tenants)
+
+
+def running_key(tenant: str) -> str:
+    """
+    Get the Redis key of the running task slots of a tenant.
+
+    Args:
+        tenant (str): The tenant id.
+
+    Returns:
+        str: The key of the sorted set of running tasks.
+    """
+    return f"{TENANT_RUNNING_PREFIX}:{tenant}"
+
+
+def tokens_key(tenant: str) -> str:
+    """
+    Get the Redis key of the token counter of a tenant for the current window.
+
+    Args:
+        tenant (str): The tenant id.
+
+    Returns:
+        str: The key of the token counter.
+    """
+    window = get_settings().tenants.budget_window
+    return f"{TENANT_TOKENS_PREFIX}:{tenant}:{int(time.time() // window)}"
+
+
+def acquire_slot(task: TaskConfig) -> None:
+    """
+    Count a task against the concurrency of its tenant, or renew the lease of
+    its slot. Slots are leased, so the slots of lost workers are freed after
+    the lease expires.
+
+    Args:
+        task (TaskConfig): The task configuration.
+    """
+    lease = get_settings().tenants.lease
+    get_redis_client().zadd(
+        running_key(tenant_of(task)), {task.trace_id: time.time() + lease}
+    )
+
+
+def reserve_slot(tenant: str, holder: str) -> bool:
+    """
+    Take a concurrency slot of a tenant if it is under its limit. The check
+    and the take are one optimistic transaction, so workers reading tasks in
+    parallel cannot exceed the limit together.
+
+    Args:
+        tenant (str): The tenant id.
+        holder (str): The member holding the slot until it is given to a task.
+
+    Returns:
+        bool: True if the slot was taken.
+    """
+    limit = get_limits(tenant).max_concurrency
+    lease = get_settings().tenants.lease
+    key = running_key(tenant)
+    taken = False
+
+    def take(pipe: Pipeline) -> None:
+        nonlocal taken
+        now = time.time()
+        taken = limit is None or int(pipe.zcount(key, f"({now}", "+inf")) < limit
+        pipe.multi()
+        if taken:
+            pipe.zadd(key, {holder: now + lease})
+
+    get_redis_client().transaction(take, key)
+    return taken
+
+
+def assign_slot(tenant: str, holder: str, task: TaskConfig) -> None:
+    """
+    Give a reserved slot of a tenant to the task read with it.
+
+    Args:
+        tenant (str): The tenant id.
+        holder (str): The member holding the reserved slot.
+        task (TaskConfig): The task configuration.
+    """
+    key = running_key(tenant)
+    lease = get_settings().tenants.lease
+    pipe = get_redis_client().pipeline(transaction=True)
+    pipe.zrem(key, holder)
+    pipe.zadd(key, {task.trace_id: time.time() + lease})
+    pipe.execute()
+
+
+def free_slot(tenant: str, holder: str) -> None:
+    """
+    Free a reserved slot of a tenant that was not given to a task.
+
+    Args:
+        tenant (str): The tenant id.
+        holder (str): The member holding the reserved slot.
+    """
+    get_redis_client().zrem(running_key(tenant), holder)
+
+
+async def hold_slot(task: TaskConfig) -> None:
+    """
+    Renew the lease of the concurrency slot of a running task until cancelled,
+    so tasks that run longer than the lease keep counting against their tenant.
+
+    Args:
+        task (TaskConfig): The task configuration.
+    """
+    interval = get_settings().tenants.lease / 3
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            acquire_slot(task)
+        except Exception as e:
+            get_logger(__name__).warning(
+                f"Failed to renew the slot of task {task.trace_id}: {e}"
+            )
+
+
+def release_slot(task: TaskConfig) -> None:
+    """
+    Release the concurrency slot of a task.
+
+    Args:
+        task (TaskConfig): The task configuration.
+    """
+    get_redis_client().zrem(running_key(tenant_of(task)), task.trace_id)
+
+
+def running_count(tenant: str) -> int:
+    """
+    Get the number of running tasks of a tenant across all workers.
+
+    Args:
+        tenant (str): The tenant id.
+
+    Returns:
+        int: The number of tasks with an unexpired slot.
+    """
+    redis = get_redis_client()
+    key = running_key(tenant)
+    redis.zremrangebyscore(key, "-inf", time.time())
+    return int(redis.zcard(key))  # type: ignore
+
+
+def charge_tokens(tenant: str, tokens: int) -> None:
+    """
+    Charge tokens used by a task against the budget of its tenant.
+
+    Args:
+        tenant (str): The tenant id.
+        tokens (int): The number of tokens used.
+    """
+    if tokens <= 0:
+        return
+    key = tokens_key(tenant)
+    pipe = get_redis_client().pipeline(transaction=False)
+    pipe.incrby(key, tokens)
+    pipe.expire(key, get_settings().tenants.budget_window)
+    pipe.execute()
+
+
+def tokens_used(tenant: str) -> int:
+    """
+    Get the tokens used by a tenant in the current budget window.
+
+    Args:
+        tenant (str): The tenant id.
+
+    Returns:
+        int: The number of tokens used.
+    """
+    used = get_redis_client().get(tokens_key(tenant))
+    return int(used) if used else 0  # type: ignore
+
+
+def is_over_quota(tenant: str) -> bool:
+    """
+    Check if a tenant reached its concurrency or token budget limit. Tasks of
+    tenants over quota stay in their streams until the tenant is under quota.
+
+    Args:
+        tenant (str): The tenant id.
+
+    Returns:
+        bool: True if no more tasks of the tenant should start.
+    """
+    limits = get_limits(tenant)
+    if limits.max_concurrency is not None:
+        if running_count(tenant) >= limits.max_concurrency:
+            return True
+    if limits.token_budget is not None:
+        if tokens_used(tenant) >= limits.token_budget:
+            return True
+    return False
+
+
+__all__ = [
+    "DEFAULT_TENANT",
+    "acquire_slot",
+    "assign_slot",
+    "charge_tokens",
+    "free_slot",
+    "get_limits",
+    "get_tenants",
+    "hold_slot",
+    "is_over_quota",
+    "register_tenants",
+    "release_slot",
+    "reserve_slot",
+    "running_count",
+    "tenant_of",
+    "tokens_used",
+]
@@ -5,12 +5,12 @@ from enum import StrEnum
 from pathlib import Path
 from typing import Any
 
-from agents import Agent, AgentOutputSchemaBase, ModelSettings, Runner
+from agents import Agent, AgentOutputSchemaBase, ModelSettings
 from agents.mcp import MCPServer
 from pydantic import BaseModel, ConfigDict, Field
 
-from ferros.core.logging import get_logger
 from ferros.core.parsers import load_config_file
+from ferros.models.settings import CompactionSettings, HedgeSettings
 
 REGISTRY_PREFIX = "agents:config"
 
@@ -155,6 +155,14 @@ class OpenAISDKConfig(AgentSDKConfig):
         default=ModelSettings(),
         description="Settings for the model.",
     )
+    hedging: HedgeSettings = Field(
+        default=HedgeSettings(),
+        description="Hedging of slow model calls of the agent.",
+    )
+    compaction: CompactionSettings = Field(
+        default=CompactionSettings(),
+        description="Compaction of the conversation history of long runs.",
+    )
 
     def create_agent(
         self,
@@ -185,34 +193,6 @@ class OpenAISDKConfig(AgentSDKConfig):
             output_type=output_type,
         )
 
-    async def run_agent(
-        self, agent: Agent, input: str, max_turns: int = 60, retry: int = 3
-    ) -> None:
-        """
-        Run the agent using the provided runner.
-
-        Args:
-            agent (Agent): The agent to be run.
-            input (str): The input to be provided to the agent.
-            max_turns (int): The maximum number of turns to run the agent.
-        """
-        logger = get_logger(__name__)
-        for attempt in range(retry):
-            try:
-                logger.info(f"Running agent: {agent.name}, Attempt: {attempt + 1}")
-                # Use the Runner to execute the agent with the provided input
-                result = await Runner.run(agent, input=input, max_turns=max_turns)
-                if result:
-                    break  # Exit loop if successful
-            except Exception as e:
-                logger.error(f"Error occurred while running agent: {e}")
-                if attempt == retry - 1:
-                    raise
-            else:
-                raise RuntimeError(
-                    f"Failed to run agent {agent.name} after {retry} attempts."
-                )
-
 
 class GoogleADKConfig(AgentSDKConfig):
     pass
@@ -156,3 +156,13 @@ class EvaluationResults(BaseModel):
             if result.planning_feedback
         ]
         return "\n".join(feedback_lines)
+
+    @property
+    def steps_evaluated(self) -> list[int]:
+        """
+        Get the steps that were evaluated.
+
+        Returns:
+            list[int]: The sorted step numbers evaluated across all results.
+        """
+        return sorted({result.step_evaluated for result in self.results})
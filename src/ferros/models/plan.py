@@ -18,8 +18,12 @@ class PlanStep(BaseModel):
     )
     prompt: str = Field(..., description="The prompt to be sent to the agent.")
     revision: int = Field(..., description="The revision number of the step.")
-    status: Literal["pending", "completed"] = Field(
-        ..., description="The status of the step."
+    status: Literal["pending", "completed", "reused"] = Field(
+        ...,
+        description=(
+            "The status of the step. Completed steps whose results are reused by "
+            "a later revision are marked as reused."
+        ),
     )
     depends_on: list[int] = Field(
         ..., description="A list of step IDs that this step depends on."
@@ -1,12 +1,15 @@
 from typing import Literal
 
 from agents import ModelSettings
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from ferros.core.parsers import load_config_file
+from ferros.models.task import Priority, TaskBudget
 
 MB_100 = 104857600  # 100 MB
 
+DropPolicy = Literal["resync", "drop-oldest", "drop-newest", "disconnect"]
+
 
 class BaseSettings(BaseModel):
     @classmethod
@@ -24,11 +27,47 @@ class BaseSettings(BaseModel):
         return cls.model_validate(config_dict)
 
 
+class EndpointSettings(BaseSettings):
+    base_url: str = Field(..., description="Base URL of the deployment.")
+    api_key: str | None = Field(
+        default=None,
+        description="API key of the deployment. Defaults to the provider key.",
+    )
+    max_connections: int = Field(
+        default=100, ge=1, description="Maximum open connections to the deployment."
+    )
+    max_keepalive_connections: int = Field(
+        default=20, ge=0, description="Maximum idle connections kept alive."
+    )
+
+
 class ProviderSettings(BaseSettings):
     api_key: str = Field(..., description="API key for the model provider.")
     base_url: str | None = Field(
         default=None, description="Base URL for the model provider."
     )
+    endpoints: list[EndpointSettings] = Field(
+        default=[],
+        description="Deployments model calls are routed across. Defaults to the "
+        "base URL.",
+    )
+    timeout: float = Field(
+        default=300, gt=0, description="Timeout of model calls in seconds."
+    )
+    latency_alpha: float = Field(
+        default=0.2,
+        gt=0,
+        le=1,
+        description="Weight of the latest call in the latency of a deployment.",
+    )
+    breaker_failures: int = Field(
+        default=5,
+        ge=1,
+        description="Consecutive failures after which a deployment is ejected.",
+    )
+    breaker_cooldown: float = Field(
+        default=30, ge=0, description="Seconds before an ejected deployment is tried."
+    )
 
 
 class FilesSettings(BaseSettings):
@@ -75,6 +114,48 @@ class RegistrySettings(RedisSettings):
     pass
 
 
+class HedgeSettings(BaseSettings):
+    enabled: bool = Field(
+        default=False, description="Whether slow model calls are hedged."
+    )
+    percentile: float = Field(
+        default=0.9,
+        gt=0,
+        lt=1,
+        description="Latency percentile after which a duplicate call is issued.",
+    )
+    min_delay: float = Field(
+        default=1.0, ge=0, description="Minimum seconds to wait before hedging."
+    )
+    min_samples: int = Field(
+        default=20, ge=1, description="Latencies observed before hedging starts."
+    )
+    window: int = Field(
+        default=200, ge=1, description="Number of recent calls tracked per model."
+    )
+    max_rate: float = Field(
+        default=0.1,
+        ge=0,
+        le=1,
+        description="Maximum fraction of recent calls that were hedged.",
+    )
+
+
+class CompactionSettings(BaseSettings):
+    enabled: bool = Field(
+        default=False, description="Whether the conversation history is compacted."
+    )
+    max_tokens: int = Field(
+        default=32000, ge=1, description="Estimated tokens that trigger compaction."
+    )
+    keep_recent: int = Field(
+        default=4, ge=0, description="Most recent tool outputs kept verbatim."
+    )
+    preview_chars: int = Field(
+        default=500, ge=0, description="Characters kept of an elided tool output."
+    )
+
+
 class AgentSettings(BaseSettings):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -87,6 +168,331 @@ class AgentSettings(BaseSettings):
         ),
         description="Settings for the model.",
     )
+    hedging: HedgeSettings = Field(
+        default=HedgeSettings(), description="Hedging of slow model calls."
+    )
+
+
+class PlanningSettings(BaseSettings):
+    cache_enabled: bool = Field(
+        default=False, description="Reuse cached plans for repeated goals."
+    )
+    cache_max_size: int = Field(
+        default=256, ge=1, description="Maximum number of cached plans."
+    )
+    cache_ttl: int = Field(
+        default=3600, ge=1, description="Time to live for cached plans in seconds."
+    )
+    templates_enabled: bool = Field(
+        default=False, description="Retrieve similar successful plans as templates."
+    )
+    templates_path: str = Field(
+        default="files/plan-templates.json",
+        description="Path to the on-disk plan template index.",
+    )
+    templates_max_entries: int = Field(
+        default=1000, ge=1, description="Maximum number of indexed plan templates."
+    )
+    templates_top_k: int = Field(
+        default=3, ge=1, description="Number of similar plans given to the planner."
+    )
+    templates_min_similarity: float = Field(
+        default=0.3,
+        ge=0,
+        le=1,
+        description="Minimum goal similarity for a plan to be used as a template.",
+    )
+    templates_reuse_threshold: float = Field(
+        default=0.95,
+        ge=0,
+        le=1,
+        description="Goal similarity above which a template plan is reused directly.",
+    )
+    replan_mode: Literal["full", "incremental"] = Field(
+        default="full",
+        description=(
+            "Re-plan the whole task or only the failing sub-graph of the plan "
+            "after a failed evaluation."
+        ),
+    )
+
+
+class StreamingSettings(BaseSettings):
+    buffer_size: int = Field(
+        default=1000, ge=1, description="Maximum buffered updates per subscriber."
+    )
+    drop_policy: DropPolicy = Field(
+        default="resync",
+        description=(
+            "What to do when a subscriber buffer is full. 'resync' drops the "
+            "buffer and re-reads the missed updates from Redis when the "
+            "subscriber catches up."
+        ),
+    )
+    block_ms: int = Field(
+        default=1000, ge=1, description="Blocking time for each shared stream read."
+    )
+    read_count: int = Field(
+        default=100, ge=1, description="Maximum updates read per stream and call."
+    )
+    keepalive: float = Field(
+        default=15, gt=0, description="Seconds between keep-alive events when idle."
+    )
+    retry_ms: int = Field(
+        default=3000, ge=0, description="Reconnection delay advertised to clients."
+    )
+    partial_results: bool = Field(
+        default=True,
+        description="Stream the output step result as partial-result events.",
+    )
+    partial_interval: float = Field(
+        default=0.25, gt=0, description="Minimum seconds between partial results."
+    )
+
+
+class QueueSettings(BaseSettings):
+    max_lag: int | None = Field(
+        default=5000,
+        ge=0,
+        description="Maximum tasks waiting to be read by a worker before rejecting.",
+    )
+    max_pending: int | None = Field(
+        default=None,
+        ge=0,
+        description="Maximum tasks read but not yet acked before rejecting.",
+    )
+    max_length: int | None = Field(
+        default=50000,
+        ge=1,
+        description="Maximum tasks queued or pending in all streams before rejecting.",
+    )
+    drain_window: int = Field(
+        default=300, ge=60, description="Seconds of acks used for the drain rate."
+    )
+    min_retry_after: int = Field(
+        default=1, ge=1, description="Minimum Retry-After in seconds."
+    )
+    max_retry_after: int = Field(
+        default=600, ge=1, description="Maximum Retry-After in seconds."
+    )
+    weights: dict[Priority, int] = Field(
+        default={"high": 6, "normal": 3, "low": 1},
+        description="Share of reads given to each priority stream.",
+    )
+    expired_policy: Literal["drop", "demote"] = Field(
+        default="drop",
+        description=(
+            "What to do with tasks picked up after their deadline. 'demote' "
+            "moves them to the low priority stream without a deadline."
+        ),
+    )
+
+
+class TenantLimits(BaseSettings):
+    max_concurrency: int | None = Field(
+        default=None, ge=1, description="Maximum tasks running at the same time."
+    )
+    token_budget: int | None = Field(
+        default=None, ge=0, description="Maximum tokens used per budget window."
+    )
+    quantum: int = Field(
+        default=1, ge=1, description="Tasks served per deficit round robin turn."
+    )
+
+
+class TenantSettings(BaseSettings):
+    default: TenantLimits = Field(
+        default=TenantLimits(), description="Limits for tenants without overrides."
+    )
+    overrides: dict[str, TenantLimits] = Field(
+        default={}, description="Limits for specific tenants."
+    )
+    budget_window: int = Field(
+        default=86400, ge=60, description="Seconds after which token budgets reset."
+    )
+    lease: int = Field(
+        default=3600,
+        ge=1,
+        description="Seconds after which a running slot of a lost worker is freed.",
+    )
+    metrics_interval: float = Field(
+        default=15, gt=0, description="Seconds between tenant metric updates."
+    )
+
+
+class ModelPrice(BaseSettings):
+    input: float = Field(default=0.0, ge=0, description="USD per 1M input tokens.")
+    output: float = Field(default=0.0, ge=0, description="USD per 1M output tokens.")
+
+
+class BudgetSettings(TaskBudget):
+    fallback_model: str | None = Field(
+        default=None,
+        description="Cheaper model used once a task spent most of its budget.",
+    )
+    fallback_at: float = Field(
+        default=0.8,
+        gt=0,
+        le=1,
+        description="Fraction of the budget after which the fallback model is used.",
+    )
+    prices: dict[str, ModelPrice] = Field(
+        default={}, description="Prices of the models used to compute the cost."
+    )
+
+
+class EvaluationSettings(BaseSettings):
+    mode: Literal["fixed", "adaptive"] = Field(
+        default="fixed",
+        description=(
+            "Run a fixed number of checks, or run checks in batches until the "
+            "score is confidently above or below the threshold."
+        ),
+    )
+    checks: int = Field(
+        default=3, ge=1, description="Number of checks in the fixed mode."
+    )
+    min_checks: int = Field(
+        default=2, ge=2, description="Minimum successful checks in adaptive mode."
+    )
+    max_checks: int = Field(
+        default=6, ge=2, description="Maximum checks in the adaptive mode."
+    )
+    batch_size: int = Field(
+        default=2, ge=1, description="Checks run at a time in the adaptive mode."
+    )
+    confidence: float = Field(
+        default=1.96,
+        gt=0,
+        description=(
+            "Standard errors between the mean score and the threshold needed to "
+            "stop the adaptive mode."
+        ),
+    )
+    check_retries: int = Field(
+        default=2, ge=0, description="Retries of each failed evaluation check."
+    )
+    cascade_model: str | None = Field(
+        default=None,
+        description=(
+            "Cheap model that runs the evaluation checks first. The evaluator "
+            "model only runs when the cheap checks are not decisive."
+        ),
+    )
+    cascade_margin: float = Field(
+        default=10.0,
+        ge=0,
+        description="Score points around the threshold that are not decisive.",
+    )
+    cascade_spread: float = Field(
+        default=15.0,
+        ge=0,
+        description="Maximum score difference between decisive cheap checks.",
+    )
+
+    @model_validator(mode="after")
+    def check_adaptive_bounds(self) -> "EvaluationSettings":
+        """
+        Check that the adaptive mode can reach its minimum successful checks.
+
+        Returns:
+            EvaluationSettings: The validated settings.
+        """
+        if self.min_checks > self.max_checks:
+            raise ValueError(
+                f"min_checks ({self.min_checks}) must not exceed "
+                f"max_checks ({self.max_checks})"
+            )
+        return self
+
+
+class CheckpointSettings(BaseSettings):
+    enabled: bool = Field(
+        default=True,
+        description="Whether failed agent runs resume from the last completed turn.",
+    )
+    attempts: int = Field(
+        default=3, ge=1, description="Maximum attempts of an agent run."
+    )
+    ttl: int = Field(
+        default=3600, ge=1, description="Seconds a checkpoint is kept in Redis."
+    )
+
+
+class CassetteSettings(BaseSettings):
+    mode: Literal["disabled", "record", "replay"] = Field(
+        default="disabled",
+        description="Record the model calls to the cassette or replay them from it.",
+    )
+    path: str = Field(
+        default="cassettes/models.jsonl", description="Path of the cassette file."
+    )
+    latency_scale: float = Field(
+        default=0,
+        ge=0,
+        description="Scale of the recorded latency when replaying, 0 to respond "
+        "immediately.",
+    )
+
+
+class SimulationSettings(BaseSettings):
+    host: str = Field(default="127.0.0.1", description="Host of the stand-ins.")
+    model_port: int = Field(default=8100, description="Port of the model stand-in.")
+    latency: float = Field(
+        default=1.0, ge=0, description="Mean seconds of a simulated model call."
+    )
+    latency_distribution: Literal["constant", "uniform", "exponential", "lognormal"] = (
+        Field(default="lognormal", description="Distribution of the call latency.")
+    )
+    latency_spread: float = Field(
+        default=0.5,
+        ge=0,
+        description="Spread of the latency, the relative range of the uniform "
+        "distribution or the sigma of the lognormal distribution.",
+    )
+    error_rate: float = Field(
+        default=0.0, ge=0, le=1, description="Fraction of model calls that fail."
+    )
+    chunk_interval: float = Field(
+        default=0.02, ge=0, description="Seconds between streamed chunks."
+    )
+    result_chars: int = Field(
+        default=2000, ge=1, description="Length of the simulated step results."
+    )
+    pass_rate: float = Field(
+        default=1.0,
+        ge=0,
+        le=1,
+        description="Probability an evaluation question is answered yes.",
+    )
+
+
+class TimeoutSettings(BaseSettings):
+    task: float | None = Field(
+        default=None, gt=0, description="Seconds allowed for a whole task."
+    )
+    context: float | None = Field(
+        default=900, gt=0, description="Seconds allowed for building the context."
+    )
+    planning: float | None = Field(
+        default=600, gt=0, description="Seconds allowed for planning a revision."
+    )
+    execution: float | None = Field(
+        default=None, gt=0, description="Seconds allowed for the steps of a revision."
+    )
+    evaluation: float | None = Field(
+        default=900, gt=0, description="Seconds allowed for evaluating a revision."
+    )
+    step: float | None = Field(
+        default=900, gt=0, description="Seconds allowed for a single plan step."
+    )
+    step_retries: int = Field(
+        default=1, ge=0, description="Retries of a plan step that timed out."
+    )
+    on_timeout: Literal["replan", "fail"] = Field(
+        default="replan",
+        description="Whether a revision that timed out is re-planned or fails.",
+    )
 
 
 class LoggingSettings(BaseSettings):
@@ -131,3 +537,43 @@ class Settings(BaseSettings):
     evaluator: AgentSettings = Field(
         ..., description="Configuration for the evaluator agent."
     )
+    planning: PlanningSettings = Field(
+        default=PlanningSettings(),
+        description="Configuration for plan caching and reuse.",
+    )
+    streaming: StreamingSettings = Field(
+        default=StreamingSettings(),
+        description="Configuration for task update streaming.",
+    )
+    queue: QueueSettings = Field(
+        default=QueueSettings(),
+        description="Configuration for task admission control.",
+    )
+    tenants: TenantSettings = Field(
+        default=TenantSettings(),
+        description="Configuration for per-tenant quotas.",
+    )
+    budget: BudgetSettings = Field(
+        default=BudgetSettings(),
+        description="Default per-task budget and model prices.",
+    )
+    timeouts: TimeoutSettings = Field(
+        default=TimeoutSettings(),
+        description="Deadlines of tasks, phases and steps.",
+    )
+    evaluation: EvaluationSettings = Field(
+        default=EvaluationSettings(),
+        description="Settings for running the evaluation checks.",
+    )
+    checkpoints: CheckpointSettings = Field(
+        default=CheckpointSettings(),
+        description="Turn-level checkpoints of agent runs.",
+    )
+    cassette: CassetteSettings = Field(
+        default=CassetteSettings(),
+        description="Offline record and replay of model calls.",
+    )
+    simulation: SimulationSettings = Field(
+        default=SimulationSettings(),
+        description="Local stand-ins of the model provider and blackboard.",
+    )
@@ -0,0 +1,51 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+from ferros.models.plan import Plan
+
+TaskStatus = Literal["queued", "running", "completed", "failed", "cancelled", "expired"]
+
+
+class StepSnapshot(BaseModel):
+    id: int = Field(..., description="The ID of the step.")
+    agent_name: str = Field(..., description="The name of the agent.")
+    status: str = Field(..., description="The latest status of the step.")
+    message: str | None = Field(
+        default=None, description="The latest status message of the step."
+    )
+    timings: dict[str, float] = Field(
+        default_factory=dict,
+        description="The epoch time at which the step entered each status.",
+    )
+
+
+class TaskSnapshot(BaseModel):
+    task_id: str = Field(..., description="The ID of the task.")
+    status: TaskStatus = Field(..., description="The status of the task.")
+    goal: str | None = Field(default=None, description="The goal of the task.")
+    revision: int | None = Field(
+        default=None, description="The revision of the current plan."
+    )
+    plan: Plan | None = Field(default=None, description="The current plan.")
+    steps: list[StepSnapshot] = Field(
+        default_factory=list, description="The latest status of each step."
+    )
+    result: dict[str, Any] | None = Field(
+        default=None, description="A pointer to the latest saved result."
+    )
+    score: float | None = Field(default=None, description="The evaluation score.")
+    threshold: float | None = Field(
+        default=None, description="The evaluation threshold."
+    )
+    passed: bool | None = Field(
+        default=None, description="Whether the evaluation passed."
+    )
+    usage: dict[str, Any] | None = Field(
+        default=None, description="The tokens, cost and time used so far."
+    )
+    error: str | None = Field(default=None, description="The error, if any.")
+    timings: dict[str, float] = Field(
+        default_factory=dict,
+        description="The epoch time at which the task entered each status.",
+    )
@@ -1,6 +1,36 @@
+import hashlib
 import uuid
+from typing import Literal
 
-from pydantic import AnyUrl, BaseModel, Field
+from pydantic import AnyUrl, AwareDatetime, BaseModel, Field, field_validator
+
+Priority = Literal["high", "normal", "low"]
+
+
+def task_id(trace_id: str) -> str:
+    """
+    Get the task id of a trace id, i.e. the trace id without its `trace_`
+    prefix. The task id keys the plan, snapshot and update stream of a task.
+
+    Args:
+        trace_id (str): The trace id.
+
+    Returns:
+        str: The task id.
+    """
+    return trace_id.split("_")[-1]
+
+
+class TaskBudget(BaseModel):
+    max_tokens: int | None = Field(
+        default=None, ge=1, description="Maximum tokens used by the task."
+    )
+    max_usd: float | None = Field(
+        default=None, gt=0, description="Maximum cost of the task in USD."
+    )
+    max_seconds: float | None = Field(
+        default=None, gt=0, description="Maximum wall-clock time of the task."
+    )
 
 
 class TaskConfig(BaseModel):
@@ -18,6 +48,54 @@ class TaskConfig(BaseModel):
         default_factory=lambda: f"{uuid.uuid4().hex}",
         description="Unique identifier for tracing the task execution.",
     )
+    idempotency_key: str | None = Field(
+        default=None,
+        description=(
+            "Key used to detect duplicate submissions. Defaults to a hash of the "
+            "task configuration without the trace id."
+        ),
+    )
+
+    tenant_id: str | None = Field(
+        default=None,
+        pattern=r"^[A-Za-z0-9_.-]+$",
+        description="The tenant submitting the task, used for fair-share quotas.",
+    )
+    priority: Priority = Field(
+        default="normal",
+        description=(
+            "Scheduling priority of the task. Interactive requests should use "
+            "'high' and batch jobs 'low'."
+        ),
+    )
+    deadline: AwareDatetime | None = Field(
+        default=None,
+        description="Time with timezone after which the result is no longer useful.",
+    )
+
+    budget: TaskBudget | None = Field(
+        default=None,
+        description="Limits of the task. Unset limits use the configured defaults.",
+    )
+
+    @field_validator("trace_id")
+    @classmethod
+    def strip_trace_prefix(cls, value: str) -> str:
+        """
+        Store the trace id as the task id, so the producer, the worker and the
+        runner key the task the same way.
+        """
+        return task_id(value)
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        Returns a hash of the task configuration without the trace id,
+        idempotency key, scheduling options and budget.
+        """
+        exclude = {"trace_id", "idempotency_key", "priority", "deadline", "budget"}
+        data = self.model_dump_json(exclude=exclude)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
 
     @property
     def context_strings(self) -> list[str]:
@@ -1,18 +1,29 @@
 from agents.mcp import MCPServer
 
 from ferros.agents.factory import get_agent_config
+from ferros.core.checkpoints import run_checkpointed
+from ferros.core.compaction import compact_model
+from ferros.core.hedging import get_model
 from ferros.core.logging import get_logger
+from ferros.messaging.partials import PartialResultPublisher
+from ferros.models.agents import OpenAISDKConfig
 from ferros.models.plan import PlanStep
 
 
-async def run(plan_id: str, step: PlanStep, mcp_servers: list[MCPServer]) -> None:
+async def run(
+    plan_id: str, step: PlanStep, mcp_servers: list[MCPServer], stream: bool = False
+) -> None:
     """
-    Run an OpenAI agent for a given plan step.
+    Run an OpenAI agent for a given plan step. The model of the agent is
+    hedged and compacts its history as configured, and failed attempts resume
+    from the last completed turn.
 
     Args:
         plan_id (str): The ID of the plan.
         step (PlanStep): The step to run.
         mcp_servers (list[MCPServer]): List of MCP servers to use.
+        stream (bool): Whether to run the agent in streamed mode and publish its
+            result as partial results while it is written.
 
     Returns:
         None
@@ -21,6 +32,19 @@ async def run(plan_id: str, step: PlanStep, mcp_servers: list[MCPServer]) -> Non
     logger.info(f"Running OpenAI agent for step: {step.agent_name}")
     config = get_agent_config(step.agent_name, step.agent_sdk, step.agent_version)
     agent = config.create_agent(tools=[], mcp_servers=mcp_servers)
+    if isinstance(config, OpenAISDKConfig):
+        model = get_model(config.model, config.hedging)
+        agent = agent.clone(model=compact_model(model, config.compaction))
     input = f"{step.prompt} \n\n The plan id is '{plan_id}'"
-    await config.run_agent(agent, input=input, max_turns=60)
+    publisher = PartialResultPublisher(plan_id, step.id, step.agent_name)
+    try:
+        await run_checkpointed(
+            agent,
+            input,
+            f"{plan_id}:{step.id}",
+            on_event=publisher.on_event if stream else None,
+            max_turns=60,
+        )
+    finally:
+        publisher.flush()
     logger.info(f"Completed running OpenAI agent for step: {step.agent_name}")
@@ -0,0 +1,190 @@
+import base64
+import json
+from pathlib import Path
+from typing import Any
+from urllib.parse import urlparse
+
+from mcp.server.fastmcp import FastMCP
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from ferros.core.logging import get_logger
+from ferros.core.metrics import incr
+from ferros.core.utils import get_redis_client, get_settings
+from ferros.messaging.constants import TASK_UPDATE_STREAM
+
+BLACKBOARD_PREFIX = "blackboard"
+
+mcp = FastMCP("Ferros Blackboard Stand-In")
+
+
+def key(plan_id: str, name: str) -> str:
+    """
+    Get the Redis key of a blackboard entry of a plan.
+
+    Args:
+        plan_id (str): The ID of the plan.
+        name (str): The name of the entry, e.g. `plan` or `results`.
+
+    Returns:
+        str: The key of the entry.
+    """
+    return f"{BLACKBOARD_PREFIX}:{plan_id}:{name}"
+
+
+def publish(plan_id: str, action: str, data: Any) -> None:
+    """
+    Publish an update to the update stream of a task.
+
+    Args:
+        plan_id (str): The ID of the plan.
+        action (str): The action of the update, e.g. `save-result`.
+        data (Any): The data of the update.
+    """
+    fields = {"plan_id": plan_id, "action": action, "data": json.dumps(data)}
+    stream = f"{TASK_UPDATE_STREAM}:{plan_id}"
+    get_redis_client(name="blackboard").xadd(stream, fields)  # type: ignore
+    incr(f"simulation.blackboard.{action}")
+
+
+def update_status(plan_id: str, step_id: str, agent_name: str, status: str) -> str:
+    data = {"step_id": int(step_id), "agent_name": agent_name, "status": status}
+    publish(plan_id, "update-status", data)
+    return f"Step {step_id} of plan {plan_id} marked as {status}."
+
+
+@mcp.tool(name="SavePlan", description="Save the plan of a task.")
+def save_plan(plan_id: str, plan: str) -> str:
+    get_redis_client(name="blackboard").set(key(plan_id, "plan"), plan)
+    publish(plan_id, "save-plan", json.loads(plan))
+    return f"Plan {plan_id} saved."
+
+
+@mcp.tool(name="GetPlan", description="Get the plan of a task.")
+def get_plan(plan_id: str) -> str:
+    plan: str | None = get_redis_client(name="blackboard").get(key(plan_id, "plan"))  # type: ignore
+    return plan or "{}"
+
+
+@mcp.tool(name="GetBlackboard", description="Get the contexts and results of a task.")
+def get_blackboard(plan_id: str) -> str:
+    redis = get_redis_client(name="blackboard")
+    contexts: dict[str, str] = redis.hgetall(key(plan_id, "contexts"))  # type: ignore
+    results: list[str] = redis.hkeys(key(plan_id, "results"))  # type: ignore
+    data = {
+        "contexts": [
+            {"file_path_or_url": k, "description": v} for k, v in contexts.items()
+        ],
+        "results": [
+            {"step_id": r.split(":", 1)[0], "agent_name": r.split(":", 1)[1]}
+            for r in results
+        ],
+    }
+    return json.dumps(data)
+
+
+@mcp.tool(name="GetContext", description="Get the contents of a context item.")
+def get_context(file_path_or_url: str) -> str:
+    path = Path(urlparse(file_path_or_url).path)
+    if file_path_or_url.startswith("file://") and path.is_file():
+        return path.read_text(encoding="utf-8", errors="replace")
+    return f"Simulated contents of {file_path_or_url}."
+
+
+@mcp.tool(
+    name="SaveContextDescription", description="Save the description of a context."
+)
+def save_context_description(
+    plan_id: str, file_path_or_url: str, description: str
+) -> str:
+    redis = get_redis_client(name="blackboard")
+    redis.hset(key(plan_id, "contexts"), file_path_or_url, description)
+    return f"Description of {file_path_or_url} saved."
+
+
+@mcp.tool(name="GetResult", description="Get the result of a step.")
+def get_result(plan_id: str, step_id: str, agent_name: str) -> str:
+    field = f"{step_id}:{agent_name.lower()}"
+    result: str | None = get_redis_client(name="blackboard").hget(  # type: ignore
+        key(plan_id, "results"), field
+    )
+    if result is None:
+        raise ValueError(f"No result of step {step_id} of plan {plan_id}")
+    return result
+
+
+@mcp.tool(name="SaveResult", description="Save the result of a step.")
+def save_result(plan_id: str, step_id: str, agent_name: str, result: str) -> str:
+    field = f"{step_id}:{agent_name.lower()}"
+    redis = get_redis_client(name="blackboard")
+    redis.hset(key(plan_id, "results"), field, json.dumps(result))
+    data = {"step_id": int(step_id), "agent_name": agent_name, "result": result}
+    publish(plan_id, "save-result", data)
+    return f"Result of step {step_id} saved."
+
+
+@mcp.tool(name="SaveEvaluation", description="Save the evaluation of a revision.")
+def save_evaluation(plan_id: str, revision: int, evaluation: str) -> str:
+    redis = get_redis_client(name="blackboard")
+    redis.hset(key(plan_id, "evaluations"), str(revision), evaluation)
+    return f"Evaluation of revision {revision} saved."
+
+
+@mcp.tool(name="GetEvaluation", description="Get the evaluation of a revision.")
+def get_evaluation(plan_id: str, revision: int) -> str:
+    evaluation: str | None = get_redis_client(name="blackboard").hget(  # type: ignore
+        key(plan_id, "evaluations"), str(revision)
+    )
+    return evaluation or "{}"
+
+
+@mcp.tool(name="MarkStepAsRunning", description="Mark a step as running.")
+def mark_running(plan_id: str, step_id: str, agent_name: str) -> str:
+    return update_status(plan_id, step_id, agent_name, "running")
+
+
+@mcp.tool(name="MarkStepAsCompleted", description="Mark a step as completed.")
+def mark_completed(plan_id: str, step_id: str, agent_name: str) -> str:
+    return update_status(plan_id, step_id, agent_name, "completed")
+
+
+@mcp.tool(name="MarkStepAsFailed", description="Mark a step as failed.")
+def mark_failed(plan_id: str, step_id: str, agent_name: str) -> str:
+    return update_status(plan_id, step_id, agent_name, "failed")
+
+
+@mcp.custom_route("/send-update", methods=["POST"])
+async def send_update(request: Request) -> JSONResponse:
+    payload: dict[str, Any] = await request.json()
+    publish(payload["plan_id"], payload["action"], payload.get("data", {}))
+    return JSONResponse({"status": "ok"})
+
+
+@mcp.custom_route("/save-file", methods=["PUT"])
+async def save_file(request: Request) -> JSONResponse:
+    payload: dict[str, Any] = await request.json()
+    data: str = payload["data"]
+    root = (Path(get_settings().files.base_dir) / "uploads").resolve()
+    path = (root / payload["file_path"]).resolve()
+    if not path.is_relative_to(root):
+        message = f"File path {payload['file_path']} is outside the uploads folder"
+        return JSONResponse({"error": message}, status_code=400)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(base64.b64decode(data.split(",", 1)[-1]))
+    get_logger(__name__).info(f"Saved file {path}")
+    return JSONResponse({"file_url": path.as_uri()})
+
+
+def create_app() -> Any:
+    """
+    Create the blackboard stand-in app for the configured MCP transport.
+
+    Returns:
+        Starlette: The app serving the MCP tools and the HTTP endpoints.
+    """
+    if get_settings().blackboard.mcp_transport == "streamable-http":
+        return mcp.streamable_http_app()
+    return mcp.sse_app()
+
+
+__all__ = ["create_app", "mcp"]
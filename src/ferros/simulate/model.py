@@ -0,0 +1,312 @@
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from collections.abc import AsyncGenerator
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from ferros.core.logging import get_logger
+from ferros.core.metrics import incr
+from ferros.core.utils import get_settings
+from ferros.simulate.outputs import (
+    ID_PATTERN,
+    dump,
+    fake_context,
+    fake_evaluation,
+    fake_plan,
+    fake_text,
+    fake_value,
+    sample_latency,
+)
+
+# the tools called by the simulated agents, one group per turn
+TOOL_TURNS = (
+    ("MarkStepAsRunning", "GetPlan", "GetBlackboard"),
+    ("SaveResult", "SaveContextDescription", "SaveEvaluation", "evaluation_check"),
+    ("MarkStepAsCompleted",),
+)
+CHARS_PER_TOKEN = 4
+
+app = FastAPI(title="Ferros Model Stand-In")
+
+
+def message_text(message: dict[str, Any]) -> str:
+    """
+    Get the text of a chat message.
+
+    Args:
+        message (dict[str, Any]): The chat message.
+
+    Returns:
+        str: The text content of the message.
+    """
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "\n".join(p.get("text", "") for p in content if isinstance(p, dict))
+    return str(content)
+
+
+class Conversation:
+    """
+    The facts of a chat completion request the simulated answers are built
+    from: the ids in the prompts, the tools offered and the tools called.
+    """
+
+    def __init__(self, body: dict[str, Any]) -> None:
+        messages: list[dict[str, Any]] = body.get("messages", [])
+        self.system = "\n".join(
+            message_text(m)
+            for m in messages
+            if m.get("role") in ("system", "developer")
+        )
+        self.user = "\n".join(
+            message_text(m) for m in messages if m.get("role") == "user"
+        )
+        self.tools = {
+            t["function"]["name"]: t["function"].get("parameters", {})
+            for t in body.get("tools", [])
+            if t.get("type") == "function"
+        }
+        self.called = {
+            call["function"]["name"]
+            for m in messages
+            for call in m.get("tool_calls") or []
+        }
+        ids = ID_PATTERN.findall(self.user)
+        self.plan_id = ids[0] if ids else uuid.uuid4().hex
+        self.step_id = self.find(r"step id is (\d+)", 1)
+        self.revision = self.find(r"revision:? (\d+)", 1)
+        self.check = self.find(r"check number:? (\d+)", 1)
+        agent = re.search(r"^# (.+?) Agent\b", self.system, re.MULTILINE)
+        self.agent_name = agent.group(1) if agent else "Agent"
+        goal = self.user.split("\n\nUse the UUID")[0].strip()
+        self.goal = goal
+        self.items = [i.strip() for i in goal.split(",") if i.strip()]
+
+    def find(self, pattern: str, default: int) -> int:
+        match = re.search(pattern, self.user, re.IGNORECASE)
+        return int(match.group(1)) if match else default
+
+    def next_calls(self) -> list[str]:
+        """
+        Get the tools to call in the next turn.
+
+        Returns:
+            list[str]: The names of the tools, empty once all were called.
+        """
+        for turn in TOOL_TURNS:
+            calls = [t for t in turn if t in self.tools and t not in self.called]
+            if calls:
+                return calls
+        return []
+
+    def arguments(self, tool: str) -> list[dict[str, Any]]:
+        """
+        Get the arguments of the calls to a tool.
+
+        Args:
+            tool (str): The name of the tool.
+
+        Returns:
+            list[dict[str, Any]]: The arguments of each call.
+        """
+        settings = get_settings().simulation
+        schema = self.tools[tool]
+        evaluation = dump(
+            fake_evaluation(self.revision, self.step_id, self.check, settings)
+        )
+        known: dict[str, Any] = {
+            "plan_id": self.plan_id,
+            "step_id": self.step_id,
+            "agent_name": self.agent_name,
+            "revision": self.revision,
+            "result": fake_text(settings.result_chars),
+            "evaluation_result": evaluation,
+            "evaluation": evaluation,
+            "description": "Simulated description of the context item.",
+        }
+        args = fake_value(schema)
+        if not isinstance(args, dict):
+            args = {}
+        for name, value in known.items():
+            if name in args:
+                prop = schema.get("properties", {}).get(name, {})
+                args[name] = str(value) if prop.get("type") == "string" else value
+        if tool == "SaveContextDescription" and "file_path_or_url" in args:
+            return [{**args, "file_path_or_url": item} for item in self.items]
+        return [args]
+
+    def final_output(self, response_format: dict[str, Any] | None) -> str:
+        """
+        Get the final answer of the agent.
+
+        Args:
+            response_format (dict[str, Any] | None): The response format of the
+                request.
+
+        Returns:
+            str: The structured output as JSON, or a text answer.
+        """
+        if not response_format or response_format.get("type") != "json_schema":
+            return "The step has been completed and the result was saved."
+        schema = response_format.get("json_schema", {}).get("schema", {})
+        settings = get_settings().simulation
+        match schema.get("title"):
+            case "Plan":
+                return dump(fake_plan(self.plan_id, self.goal, self.system))
+            case "Context":
+                return dump(fake_context(self.items))
+            case "EvaluationResult":
+                return dump(
+                    fake_evaluation(self.revision, self.step_id, self.check, settings)
+                )
+            case _:
+                return dump(fake_value(schema))
+
+
+def completion_message(body: dict[str, Any]) -> dict[str, Any]:
+    """
+    Build the assistant message of a simulated chat completion.
+
+    Args:
+        body (dict[str, Any]): The chat completion request.
+
+    Returns:
+        dict[str, Any]: The assistant message.
+    """
+    conversation = Conversation(body)
+    calls = conversation.next_calls()
+    if not calls:
+        content = conversation.final_output(body.get("response_format"))
+        return {"role": "assistant", "content": content}
+    tool_calls = [
+        {
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": tool, "arguments": json.dumps(args)},
+        }
+        for tool in calls
+        for args in conversation.arguments(tool)
+    ]
+    return {"role": "assistant", "content": None, "tool_calls": tool_calls}
+
+
+def usage(body: dict[str, Any], message: dict[str, Any]) -> dict[str, int]:
+    prompt = len(json.dumps(body.get("messages", []))) // CHARS_PER_TOKEN
+    completion = len(json.dumps(message)) // CHARS_PER_TOKEN
+    return {
+        "prompt_tokens": prompt,
+        "completion_tokens": completion,
+        "total_tokens": prompt + completion,
+    }
+
+
+async def stream_chunks(
+    body: dict[str, Any], message: dict[str, Any], completion_id: str
+) -> AsyncGenerator[str, None]:
+    """
+    Stream a simulated chat completion as server-sent event chunks.
+
+    Args:
+        body (dict[str, Any]): The chat completion request.
+        message (dict[str, Any]): The assistant message to stream.
+        completion_id (str): The ID of the completion.
+
+    Yields:
+        str: The server-sent events.
+    """
+    settings = get_settings().simulation
+    size = 64
+
+    def chunk(delta: dict[str, Any], finish: str | None = None) -> str:
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "simulated"),
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+        }
+        return f"data: {json.dumps(data)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    content = message.get("content") or ""
+    for i in range(0, len(content), size):
+        await asyncio.sleep(settings.chunk_interval)
+        yield chunk({"content": content[i : i + size]})
+    for index, call in enumerate(message.get("tool_calls", [])):
+        function = call["function"]
+        head = {"index": index, "id": call["id"], "type": "function"}
+        yield chunk({"tool_calls": [{**head, "function": {"name": function["name"]}}]})
+        arguments = function["arguments"]
+        for i in range(0, len(arguments), size):
+            await asyncio.sleep(settings.chunk_interval)
+            delta = {"index": index, "function": {"arguments": arguments[i : i + size]}}
+            yield chunk({"tool_calls": [delta]})
+    yield chunk({}, "tool_calls" if message.get("tool_calls") else "stop")
+    if (body.get("stream_options") or {}).get("include_usage"):
+        data = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "simulated"),
+            "choices": [],
+            "usage": usage(body, message),
+        }
+        yield f"data: {json.dumps(data)}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+@app.get("/v1/models")
+async def list_models() -> dict[str, Any]:
+    return {"object": "list", "data": []}
+
+
+@app.post("/v1/chat/completions", response_model=None)
+async def chat_completions(request: Request) -> JSONResponse | StreamingResponse:
+    """
+    Answer a chat completion request with simulated latency, errors, tool
+    calls and schema-valid structured outputs.
+
+    Args:
+        request (Request): The chat completion request.
+
+    Returns:
+        JSONResponse | StreamingResponse: The completion, streamed if requested.
+    """
+    settings = get_settings().simulation
+    body: dict[str, Any] = await request.json()
+    await asyncio.sleep(sample_latency(settings))
+    if random.random() < settings.error_rate:
+        incr("simulation.model.errors")
+        status = random.choice((429, 500, 503))
+        get_logger(__name__).info(f"Simulated model error {status}")
+        error = {"message": "Simulated error", "type": "server_error"}
+        return JSONResponse({"error": error}, status_code=status)
+
+    incr("simulation.model.calls")
+    message = completion_message(body)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    if body.get("stream"):
+        return StreamingResponse(
+            stream_chunks(body, message, completion_id),
+            media_type="text/event-stream",
+        )
+    finish = "tool_calls" if message.get("tool_calls") else "stop"
+    return JSONResponse(
+        {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "simulated"),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish}],
+            "usage": usage(body, message),
+        }
+    )
+
+
+__all__ = ["Conversation", "app"]
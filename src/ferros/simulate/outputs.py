@@ -0,0 +1,242 @@
+import json
+import math
+import random
+import re
+from typing import Any
+
+from ferros.models.context import Context, ContextItem
+from ferros.models.evaluation import EvaluationQuestion, EvaluationResult
+from ferros.models.plan import Plan, PlanStep
+from ferros.models.settings import SimulationSettings
+
+ID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{32}"
+)
+AGENT_PATTERN = re.compile(
+    r">\*\*Agent Name\*\*: (.+)\n"
+    r">\*\*Agent SDK\*\*: (.+)\n"
+    r">\*\*Agent Version\*\*: (.+)"
+)
+OUTPUT_AGENTS = ("writer", "editor")
+WORDS = (
+    "the analysis shows that revenue growth was driven by strong demand across "
+    "all regions while costs remained stable and margins improved compared to "
+    "the previous period with further gains expected next year"
+).split()
+
+
+def sample_latency(settings: SimulationSettings) -> float:
+    """
+    Sample the latency of a simulated model call.
+
+    Args:
+        settings (SimulationSettings): The simulation settings.
+
+    Returns:
+        float: The latency in seconds.
+    """
+    mean, spread = settings.latency, settings.latency_spread
+    if mean <= 0:
+        return 0.0
+    match settings.latency_distribution:
+        case "uniform":
+            return max(0.0, random.uniform(mean * (1 - spread), mean * (1 + spread)))
+        case "exponential":
+            return random.expovariate(1 / mean)
+        case "lognormal":
+            # keep the mean of the distribution at the configured latency
+            return random.lognormvariate(math.log(mean) - spread**2 / 2, spread)
+        case _:
+            return mean
+
+
+def fake_text(chars: int) -> str:
+    """
+    Generate a markdown text of about the given length.
+
+    Args:
+        chars (int): The length of the text.
+
+    Returns:
+        str: The text.
+    """
+    words: list[str] = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(random.choice(WORDS))
+    sentences = [
+        " ".join(words[i : i + 12]).capitalize() for i in range(0, len(words), 12)
+    ]
+    return "# Result\n\n" + ". ".join(sentences) + "."
+
+
+def fake_value(schema: dict[str, Any], defs: dict[str, Any] | None = None) -> Any:
+    """
+    Generate a value that is valid for a JSON schema.
+
+    Args:
+        schema (dict[str, Any]): The JSON schema.
+        defs (dict[str, Any] | None): The definitions referenced by the schema.
+
+    Returns:
+        Any: The generated value.
+    """
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return fake_value(defs[schema["$ref"].split("/")[-1]], defs)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "default" in schema:
+        return schema["default"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"]
+            return fake_value((options or schema[key])[0], defs)
+
+    match schema.get("type"):
+        case "object":
+            properties = schema.get("properties", {})
+            return {name: fake_value(s, defs) for name, s in properties.items()}
+        case "array":
+            return [fake_value(schema.get("items", {}), defs)]
+        case "integer":
+            return 1
+        case "number":
+            return 1.0
+        case "boolean":
+            return True
+        case "null":
+            return None
+        case _:
+            return "simulated"
+
+
+def fake_plan(plan_id: str, goal: str, catalog: str) -> Plan:
+    """
+    Generate a plan that uses the agents of the catalog. The other agents run
+    in parallel, the writer depends on all of them and the editor runs last.
+
+    Args:
+        plan_id (str): The ID of the plan.
+        goal (str): The goal of the plan.
+        catalog (str): The agent catalog of the planner prompt.
+
+    Returns:
+        Plan: The plan.
+    """
+    agents = [
+        (name.strip(), sdk.strip(), version.strip())
+        for name, sdk, version in AGENT_PATTERN.findall(catalog)
+    ]
+    workers = [a for a in agents if a[0].lower() not in OUTPUT_AGENTS]
+    outputs = sorted(
+        (a for a in agents if a[0].lower() in OUTPUT_AGENTS),
+        key=lambda a: OUTPUT_AGENTS.index(a[0].lower()),
+    )
+
+    steps: list[PlanStep] = []
+    for name, sdk, version in workers + outputs:
+        step_id = len(steps) + 1
+        if name.lower() in OUTPUT_AGENTS:
+            depends_on = [s.id for s in steps if s.agent_name.lower() != "editor"]
+            depends_on = depends_on[-1:] if name.lower() == "editor" else depends_on
+        else:
+            depends_on = []
+        steps.append(
+            PlanStep(
+                id=step_id,
+                agent_name=name,
+                agent_sdk=sdk,  # type: ignore[arg-type]
+                agent_version=version,
+                prompt=f"{goal}\n\nThe step id is {step_id}.",
+                revision=1,
+                status="pending",
+                depends_on=depends_on,
+            )
+        )
+    return Plan(id=plan_id, goal=goal, steps=steps)
+
+
+def fake_context(items: list[str]) -> Context:
+    """
+    Generate the descriptions of the context items.
+
+    Args:
+        items (list[str]): The file paths or URLs of the context items.
+
+    Returns:
+        Context: The context.
+    """
+    return Context(
+        contexts=[
+            ContextItem(file_path_or_url=item, description=f"Simulated data of {item}")
+            for item in items
+        ]
+    )
+
+
+def fake_evaluation(
+    revision: int, step: int, check: int, settings: SimulationSettings
+) -> EvaluationResult:
+    """
+    Generate an evaluation result whose score, pass and re-plan flags are
+    consistent with its answers.
+
+    Args:
+        revision (int): The revision of the plan.
+        step (int): The step evaluated.
+        check (int): The check number.
+        settings (SimulationSettings): The simulation settings.
+
+    Returns:
+        EvaluationResult: The evaluation result.
+    """
+    questions = [
+        EvaluationQuestion(
+            question=f"Does the result satisfy requirement {i + 1} of the goal?",
+            answer="yes" if random.random() < settings.pass_rate else "no",
+        )
+        for i in range(5)
+    ]
+    yes = sum(q.answer == "yes" for q in questions)
+    score = round(100 * yes / len(questions), 2)
+    passed = score >= 80.0
+    return EvaluationResult(
+        questions=questions,
+        revision=revision,
+        step_evaluated=step,
+        check_number=check,
+        score=score,
+        threshold=80.0,
+        threshold_source="default",
+        passed=passed,
+        replan=not passed,
+        planning_feedback="" if passed else "Address the unmet requirements.",
+    )
+
+
+def dump(value: Any) -> str:
+    """
+    Serialize a generated output to JSON.
+
+    Args:
+        value (Any): The output, a pydantic model or JSON data.
+
+    Returns:
+        str: The JSON output.
+    """
+    if hasattr(value, "model_dump_json"):
+        return value.model_dump_json()
+    return json.dumps(value)
+
+
+__all__ = [
+    "dump",
+    "fake_context",
+    "fake_evaluation",
+    "fake_plan",
+    "fake_text",
+    "fake_value",
+    "sample_latency",
+]
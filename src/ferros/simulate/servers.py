@@ -0,0 +1,54 @@
+import asyncio
+from urllib.parse import urlparse
+
+import uvicorn
+
+from ferros.core.logging import get_logger
+from ferros.core.utils import get_settings
+
+
+async def serve(host: str, model_port: int, blackboard_port: int) -> None:
+    """
+    Serve the model and blackboard stand-ins until interrupted.
+
+    Args:
+        host (str): The host of the stand-ins.
+        model_port (int): The port of the model stand-in.
+        blackboard_port (int): The port of the blackboard stand-in.
+    """
+    from ferros.simulate.blackboard import create_app
+    from ferros.simulate.model import app
+
+    servers = [
+        uvicorn.Server(uvicorn.Config(app, host=host, port=model_port)),
+        uvicorn.Server(uvicorn.Config(create_app(), host=host, port=blackboard_port)),
+    ]
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def run_simulation(host: str | None = None, model_port: int | None = None) -> None:
+    """
+    Run the local stand-ins of the model provider and the blackboard service.
+    The blackboard stand-in listens on the port of the configured MCP server,
+    and the workers and API reach the model stand-in once `MODEL_BASE_URL`
+    points to it.
+
+    Args:
+        host (str | None): The host of the stand-ins. Defaults to the
+            configured host.
+        model_port (int | None): The port of the model stand-in. Defaults to
+            the configured port.
+    """
+    settings = get_settings()
+    host = host or settings.simulation.host
+    model_port = model_port or settings.simulation.model_port
+    blackboard_port = urlparse(settings.blackboard.mcp_server).port or 8000
+    get_logger(__name__).info(
+        f"Simulating the model provider at http://{host}:{model_port}/v1 and the "
+        f"blackboard at http://{host}:{blackboard_port} "
+        f"({settings.blackboard.mcp_transport}), set MODEL_BASE_URL to use them."
+    )
+    asyncio.run(serve(host, model_port, blackboard_port))
+
+
+__all__ = ["run_simulation", "serve"]
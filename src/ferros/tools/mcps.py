@@ -14,8 +14,11 @@ from agents.mcp import (
 from tenacity import retry, stop_after_attempt, wait_random_exponential
 
 from ferros.core.utils import get_settings
+from ferros.models.plan import Plan
 
 RESULT_TOOL_NAME = "GetResult"
+SAVE_RESULT_TOOL_NAME = "SaveResult"
+PLAN_TOOL_NAME = "SavePlan"
 
 
 def get_params() -> MCPServerStreamableHttpParams | MCPServerSseParams:
@@ -89,3 +92,20 @@ async def get_result(
     if not data:
         raise ValueError("No result found in memory")
     return json.loads(data.content[0].text)  # type: ignore
+
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_random_exponential(multiplier=1, max=15),
+    reraise=True,
+)
+async def save_plan(plan: Plan, server: MCPServer) -> None:
+    """
+    Save a plan to the blackboard memory using the plan id as the key.
+
+    Args:
+        plan (Plan): The plan to save.
+        server (MCPServer): The MCP server to save the plan to.
+    """
+    args = {"plan_id": plan.id, "plan": plan.model_dump_json()}
+    await server.call_tool(tool_name=PLAN_TOOL_NAME, arguments=args)
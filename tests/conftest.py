@@ -0,0 +1,42 @@
+from collections.abc import Iterator
+
+import fakeredis
+import pytest
+
+import ferros.core.utils as utils
+from ferros.models.settings import Settings
+
+
+@pytest.fixture
+def settings(
+    monkeypatch: pytest.MonkeyPatch, tmp_path_factory: pytest.TempPathFactory
+) -> Settings:
+    """
+    Load minimal application settings for the duration of a test.
+    """
+    settings = Settings.model_validate(
+        {
+            "provider": {"api_key": "test"},
+            "context": {"model": "test"},
+            "planner": {"model": "test"},
+            "evaluator": {"model": "test"},
+            "logging": {"root_dir": str(tmp_path_factory.mktemp("logs"))},
+        }
+    )
+    monkeypatch.setattr(utils, "settings", settings)
+    return settings
+
+
+@pytest.fixture
+def redis(
+    monkeypatch: pytest.MonkeyPatch, settings: Settings
+) -> Iterator[fakeredis.FakeRedis]:
+    """
+    Serve both Redis clients of the application from one fake Redis server.
+    """
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(
+        utils, "redis_clients", {"registry": client, "blackboard": client}
+    )
+    yield client
+    client.flushall()
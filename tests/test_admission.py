@@ -0,0 +1,66 @@
+import asyncio
+
+import fakeredis
+
+from ferros.messaging.admission import check_admission, trim_stream
+from ferros.messaging.constants import GROUP_NAME
+from ferros.messaging.producer import publish_tasks
+from ferros.messaging.scheduler import stream_name
+from ferros.models.settings import Settings
+from ferros.models.task import TaskConfig
+
+
+def make_tasks(count: int, priority: str = "normal") -> list[TaskConfig]:
+    return [
+        TaskConfig(goal=f"goal {i}", contexts=[], priority=priority)  # type: ignore[arg-type]
+        for i in range(count)
+    ]
+
+
+def test_unacked_tasks_are_never_trimmed(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    # the length limit rejects new tasks instead of trimming queued ones
+    settings.queue.max_length = 2
+    stream = stream_name("normal")
+    redis.xgroup_create(stream, GROUP_NAME, id="0", mkstream=True)
+    asyncio.run(publish_tasks(make_tasks(5)))
+    assert redis.xlen(stream) == 5
+
+    # one task is acked, one is pending and three are not read yet
+    unacked = [mid for mid, _ in redis.xrange(stream)][1:]
+    [(_, messages)] = redis.xreadgroup(GROUP_NAME, "worker", {stream: ">"}, count=2)
+    redis.xack(stream, GROUP_NAME, messages[0][0])
+    trim_stream(stream)
+
+    # the trim is approximate, so only the unacked tasks are certain to remain
+    remaining = [mid for mid, _ in redis.xrange(stream)]
+    assert remaining[-4:] == unacked
+
+
+def test_admission_rejects_when_streams_are_full(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.queue.max_lag = None
+    settings.queue.max_pending = None
+    settings.queue.max_length = 3
+    asyncio.run(publish_tasks(make_tasks(3, priority="low")))
+
+    # the low priority backlog does not count towards the lag of high priority
+    # tasks, but it does count towards the length of the streams
+    retry_after = check_admission(1, "high")
+    assert retry_after is not None
+    assert settings.queue.min_retry_after <= retry_after
+    assert retry_after <= settings.queue.max_retry_after
+
+
+def test_admission_accepts_within_length(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.queue.max_lag = None
+    settings.queue.max_pending = None
+    settings.queue.max_length = 5
+    asyncio.run(publish_tasks(make_tasks(3, priority="low")))
+
+    assert check_admission(2, "high") is None
+    assert check_admission(3, "high") is not None
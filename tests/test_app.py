@@ -0,0 +1,42 @@
+import fakeredis
+from fastapi.testclient import TestClient
+
+from ferros.app import app
+from ferros.models.settings import Settings
+
+
+def test_duplicates_bypass_admission(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.queue.max_lag = 1
+    client = TestClient(app)
+    task = {"goal": "goal", "contexts": []}
+
+    first = client.post("/run-task/json", json=task)
+    assert first.json()["status"] == "task published"
+    # the queue is full, but a duplicate is served by the queued task
+    duplicate = client.post("/run-task/json", json=task)
+    assert duplicate.status_code == 200
+    assert duplicate.json()["task_id"] == first.json()["task_id"]
+    assert (
+        client.post("/run-task/json", json={**task, "goal": "new"}).status_code == 429
+    )
+
+
+def test_batch_admits_only_new_tasks(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.queue.max_lag = 2
+    client = TestClient(app)
+    task = {"goal": "goal", "contexts": []}
+    assert client.post("/run-task/json", json=task).status_code == 200
+
+    # one duplicate of the queued task and two copies of one new task
+    batch = [task, {**task, "goal": "new"}, {**task, "goal": "new"}]
+    response = client.post("/run-task/batch", json=batch)
+    assert response.status_code == 200
+    assert [r["status"] for r in response.json()] == [
+        "task queued",
+        "task published",
+        "task queued",
+    ]
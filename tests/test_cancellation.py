@@ -0,0 +1,25 @@
+import fakeredis
+
+from ferros.core.snapshot import get_snapshot, update_snapshot
+from ferros.messaging.cancellation import cancel_task, is_cancelled
+
+
+def test_cancel_queued_task(redis: fakeredis.FakeRedis) -> None:
+    update_snapshot("task", "queued")
+
+    assert cancel_task("task").status == "queued"  # type: ignore[union-attr]
+    assert is_cancelled("task")
+    assert get_snapshot("task").status == "cancelled"  # type: ignore[union-attr]
+
+
+def test_cancel_expired_task_is_a_no_op(redis: fakeredis.FakeRedis) -> None:
+    update_snapshot("task", "expired")
+
+    assert cancel_task("task").status == "expired"  # type: ignore[union-attr]
+    assert not is_cancelled("task")
+    assert get_snapshot("task").status == "expired"  # type: ignore[union-attr]
+
+
+def test_cancel_unknown_task(redis: fakeredis.FakeRedis) -> None:
+    assert cancel_task("unknown") is None
+    assert not is_cancelled("unknown")
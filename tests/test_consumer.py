@@ -0,0 +1,77 @@
+import asyncio
+from typing import Any
+
+import fakeredis
+import pytest
+
+from ferros.core.snapshot import update_snapshot
+from ferros.messaging import consumer
+from ferros.messaging.cancellation import cancel_task
+from ferros.messaging.idempotency import find_task
+from ferros.messaging.producer import publish_task
+from ferros.messaging.scheduler import Scheduler
+from ferros.messaging.tenants import running_count
+from ferros.models.settings import Settings
+from ferros.models.task import TaskConfig
+
+
+def consume_one(monkeypatch: pytest.MonkeyPatch, passed: bool) -> TaskConfig:
+    """
+    Publish a task and let the worker run it with an agent whose evaluation
+    passes or not.
+    """
+    read = Scheduler.read
+    monkeypatch.setattr(Scheduler, "read", lambda self, block_ms: read(self, 10))
+
+    async def run_agent(trace_id: str, **kwargs: Any) -> None:
+        update_snapshot(trace_id, "completed", passed=passed)
+
+    monkeypatch.setattr(consumer, "run_agent", run_agent)
+    task = TaskConfig(goal="goal", contexts=[])
+
+    async def run() -> None:
+        await publish_task(task)
+        worker = asyncio.create_task(consumer.consume_tasks())
+        # the claim is completed or released once the worker finished the task
+        while (find_task(task.fingerprint) or {}).get("state") in ("queued", "running"):
+            await asyncio.sleep(0.05)
+        worker.cancel()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=10))
+    return task
+
+
+def test_passed_task_keeps_its_claim(
+    redis: fakeredis.FakeRedis, settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    task = consume_one(monkeypatch, passed=True)
+    assert find_task(task.fingerprint) == {
+        "trace_id": task.trace_id,
+        "state": "completed",
+    }
+
+
+def test_failed_evaluation_releases_the_claim(
+    redis: fakeredis.FakeRedis, settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    task = consume_one(monkeypatch, passed=False)
+    assert find_task(task.fingerprint) is None
+
+
+def test_cancel_before_registering_stops_the_task(
+    redis: fakeredis.FakeRedis, settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    started: list[str] = []
+
+    async def run_agent(trace_id: str, **kwargs: Any) -> None:
+        started.append(trace_id)
+
+    monkeypatch.setattr(consumer, "run_agent", run_agent)
+    task = TaskConfig(goal="goal", contexts=[])
+    # the cancel arrives after the worker checked it but before the task runs
+    update_snapshot(task.trace_id, "running")
+    cancel_task(task.trace_id)
+
+    assert asyncio.run(consumer.run_task(task, {})) is False
+    assert started == []
+    assert running_count("default") == 0
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import httpx
+
+from ferros.core.endpoints import EndpointPool, PoolTransport
+from ferros.models.settings import EndpointSettings, ProviderSettings, Settings
+
+
+def make_pool() -> EndpointPool:
+    settings = ProviderSettings(
+        api_key="test",
+        endpoints=[
+            EndpointSettings(base_url="http://first/v1"),
+            EndpointSettings(base_url="http://second/v1"),
+        ],
+        breaker_failures=1,
+    )
+    pool = EndpointPool(settings)
+    first, second = pool.endpoints
+    # the first endpoint is the faster one once it rejoins
+    first.latency, second.latency = 0.1, 1.0
+    pool.record(first, 0.1, failed=True)
+    first.ejected_until = time.monotonic() - 1  # the cooldown is over
+    return pool
+
+
+def test_half_open_endpoint_takes_a_single_trial_call(settings: Settings) -> None:
+    pool = make_pool()
+    first, second = pool.endpoints
+
+    assert pool.select() is first
+    assert pool.select() is second  # the trial call is still in flight
+
+    first.probing = False
+    pool.record(first, 0.1, failed=False)
+    assert pool.select() is first
+    assert pool.select() is first
+
+
+def test_failed_trial_call_ejects_the_endpoint_again(settings: Settings) -> None:
+    pool = make_pool()
+    first, second = pool.endpoints
+
+    assert pool.select() is first
+    first.probing = False
+    pool.record(first, 0.1, failed=True)
+    assert first.ejected_until > time.monotonic()
+    assert pool.select() is second
+
+
+def test_transport_ends_the_trial_call(settings: Settings) -> None:
+    pool = make_pool()
+    first, _ = pool.endpoints
+    first.transport = httpx.MockTransport(lambda request: httpx.Response(200))  # type: ignore[assignment]
+
+    async def call() -> int:
+        async with httpx.AsyncClient(transport=PoolTransport(pool)) as client:
+            response = await client.get("http://first/v1/models")
+            return response.status_code
+
+    assert asyncio.run(call()) == 200
+    assert not first.probing
+    assert first.ejected_until == 0.0
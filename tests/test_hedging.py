@@ -0,0 +1,69 @@
+import asyncio
+from collections.abc import AsyncIterator
+from typing import Any
+
+from agents import Model, ModelResponse, Usage
+
+from ferros.core.budget import Budget, current_budget
+from ferros.core.hedging import HedgedModel, get_tracker
+from ferros.core.metrics import get_metrics
+from ferros.models.settings import HedgeSettings, Settings
+
+
+class DelayedModel(Model):
+    def __init__(self, delays: list[float]) -> None:
+        self.delays = delays
+        self.calls = 0
+        self.release: asyncio.Event | None = None
+
+    async def get_response(self, *args: Any, **kwargs: Any) -> ModelResponse:
+        self.calls += 1
+        await asyncio.sleep(self.delays.pop(0))
+        if self.release is not None:
+            # the calls wait for each other so that they finish together
+            if self.calls == 2:
+                self.release.set()
+            await self.release.wait()
+        usage = Usage(requests=1, input_tokens=10, output_tokens=5, total_tokens=15)
+        return ModelResponse(output=[], usage=usage, response_id=None)
+
+    async def stream_response(self, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        yield None
+
+
+def hedged_model(name: str, model: DelayedModel) -> HedgedModel:
+    settings = HedgeSettings(enabled=True, min_delay=0.05, min_samples=1)
+    get_tracker(name, settings.window).record(0.05, False)
+    hedged = HedgedModel(name, settings)
+    hedged.wrapped = model
+    return hedged
+
+
+def call(model: HedgedModel, budget: Budget, together: bool = False) -> None:
+    async def run() -> None:
+        current_budget.set(budget)
+        if together:
+            assert isinstance(model.wrapped, DelayedModel)
+            model.wrapped.release = asyncio.Event()
+        await model.get_response()
+
+    asyncio.run(run())
+
+
+def test_cancelled_hedge_is_counted(settings: Settings) -> None:
+    budget = Budget()
+    call(hedged_model("slow-first", DelayedModel([1.0, 0.0])), budget)
+
+    metrics = get_metrics()
+    assert metrics["hedge.slow-first.won"] == 1
+    assert metrics["hedge.slow-first.cancelled"] == 1
+    # the winning call is charged by the budget model, not by the hedge
+    assert budget.tokens == 0
+
+
+def test_hedge_that_finishes_too_is_charged(settings: Settings) -> None:
+    budget = Budget()
+    call(hedged_model("tie", DelayedModel([0.0, 0.0])), budget, together=True)
+
+    assert get_metrics()["hedge.tie.charged"] == 1
+    assert budget.tokens == 15
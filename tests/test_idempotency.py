@@ -0,0 +1,104 @@
+import asyncio
+
+import fakeredis
+import pytest
+from redis import ResponseError
+
+from ferros.messaging.idempotency import (
+    claim_task,
+    claim_tasks,
+    find_tasks,
+    is_duplicate,
+    release_task,
+    update_task_state,
+)
+from ferros.messaging.producer import publish_task, publish_tasks
+from ferros.messaging.scheduler import stream_name
+from ferros.models.task import TaskConfig
+
+
+def test_claim_is_held_by_the_first_task(redis: fakeredis.FakeRedis) -> None:
+    first = TaskConfig(goal="goal", contexts=[])
+    second = TaskConfig(goal="goal", contexts=[])
+
+    assert claim_task(first) is None
+    assert claim_task(second) == {"trace_id": first.trace_id, "state": "queued"}
+    assert not is_duplicate(first)
+    assert is_duplicate(second)
+
+    update_task_state(first, "running")
+    assert claim_task(second) == {"trace_id": first.trace_id, "state": "running"}
+
+
+def test_release_only_frees_the_own_claim(redis: fakeredis.FakeRedis) -> None:
+    first = TaskConfig(goal="goal", contexts=[])
+    second = TaskConfig(goal="goal", contexts=[])
+    claim_task(first)
+    claim_task(second)
+
+    release_task(second)
+    assert is_duplicate(second)
+    release_task(first)
+    assert claim_task(second) is None
+    assert is_duplicate(first)
+
+
+def test_batch_claims_resolve_repeats_within_the_batch(
+    redis: fakeredis.FakeRedis,
+) -> None:
+    tasks = [
+        TaskConfig(goal="one", contexts=[]),
+        TaskConfig(goal="two", contexts=[], idempotency_key="key"),
+        TaskConfig(goal="one", contexts=[]),
+        TaskConfig(goal="three", contexts=[], idempotency_key="key"),
+    ]
+    assert find_tasks(tasks) == [None] * 4
+
+    claims = claim_tasks(tasks)
+    assert claims[:2] == [None, None]
+    assert claims[2] == {"trace_id": tasks[0].trace_id, "state": "queued"}
+    assert claims[3] == {"trace_id": tasks[1].trace_id, "state": "queued"}
+    assert [c and c["trace_id"] for c in find_tasks(tasks)] == [
+        tasks[0].trace_id,
+        tasks[1].trace_id,
+        tasks[0].trace_id,
+        tasks[1].trace_id,
+    ]
+
+
+def test_duplicates_are_published_once(redis: fakeredis.FakeRedis) -> None:
+    first = TaskConfig(goal="goal", contexts=[])
+    second = TaskConfig(goal="goal", contexts=[])
+
+    assert asyncio.run(publish_task(first))["status"] == "task published"
+    assert asyncio.run(publish_task(second)) == {
+        "task_id": first.trace_id,
+        "status": "task queued",
+    }
+    responses = asyncio.run(
+        publish_tasks(
+            [TaskConfig(goal="goal", contexts=[]), TaskConfig(goal="new", contexts=[])]
+        )
+    )
+    assert responses[0] == {"task_id": first.trace_id, "status": "task queued"}
+    assert responses[1]["status"] == "task published"
+    assert redis.xlen(stream_name("normal")) == 2
+
+
+def test_failed_batch_releases_only_the_failed_claims(
+    redis: fakeredis.FakeRedis,
+) -> None:
+    # the stream of the second tenant is not a stream, so its XADD fails
+    redis.set(stream_name("normal", "broken"), "value")
+    tasks = [
+        TaskConfig(goal="one", contexts=[]),
+        TaskConfig(goal="two", contexts=[], tenant_id="broken"),
+    ]
+    with pytest.raises(ResponseError):
+        asyncio.run(publish_tasks(tasks))
+
+    assert find_tasks(tasks) == [
+        {"trace_id": tasks[0].trace_id, "state": "queued"},
+        None,
+    ]
+    assert redis.xlen(stream_name("normal")) == 1
@@ -0,0 +1,40 @@
+import asyncio
+
+import fakeredis
+
+from ferros.messaging.constants import TASK_UPDATE_STREAM
+from ferros.messaging.multiplexer import StreamMessage, StreamMultiplexer
+from ferros.models.settings import Settings
+
+
+def test_every_subscriber_gets_every_update(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.streaming.block_ms = 50
+    stream = f"{TASK_UPDATE_STREAM}:task"
+    redis.xadd(stream, {"n": "0"})
+
+    async def read(multiplexer: StreamMultiplexer, ready: asyncio.Event) -> list[str]:
+        received: list[StreamMessage] = []
+        async with multiplexer.subscribe("task") as subscription:
+            async for item in subscription:
+                received.append(item)
+                ready.set()
+                if len(received) == 4:
+                    break
+        return [message["n"] for _, message in received]
+
+    async def run() -> list[list[str]]:
+        multiplexer = StreamMultiplexer(redis)
+        ready = [asyncio.Event(), asyncio.Event()]
+        readers = [asyncio.create_task(read(multiplexer, event)) for event in ready]
+        for event in ready:
+            await event.wait()
+        for n in range(1, 4):
+            await asyncio.to_thread(redis.xadd, stream, {"n": str(n)})
+        results = await asyncio.wait_for(asyncio.gather(*readers), timeout=5)
+        assert multiplexer.subscribers == {}
+        return results
+
+    # the first update is replayed, the others are only delivered by the read loop
+    assert asyncio.run(run()) == [["0", "1", "2", "3"]] * 2
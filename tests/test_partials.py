@@ -0,0 +1,56 @@
+import json
+from types import SimpleNamespace
+from typing import Any
+
+import fakeredis
+
+from ferros.messaging.constants import TASK_UPDATE_STREAM
+from ferros.messaging.partials import PARTIAL_RESULT_ACTION, PartialResultPublisher
+from ferros.messaging.streamer import TaskResult, unwrap_stream_data
+from ferros.models.settings import Settings
+from ferros.tools.mcps import SAVE_RESULT_TOOL_NAME
+
+
+def call_added(name: str) -> Any:
+    item = SimpleNamespace(type="function_call", name=name, arguments="")
+    return SimpleNamespace(type="response.output_item.added", item=item)
+
+
+def arguments_delta(delta: str) -> Any:
+    return SimpleNamespace(type="response.function_call_arguments.delta", delta=delta)
+
+
+def test_result_deltas_become_ordered_partial_updates(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.streaming.partial_interval = 0
+    publisher = PartialResultPublisher("plan", 2, "writer")
+    text = 'The "café" report\nis done.'
+    arguments = json.dumps({"plan_id": "plan", "result": text}, ensure_ascii=True)
+
+    publisher.on_event(call_added("SearchTool"))
+    publisher.on_event(arguments_delta('{"result": "not the result"}'))
+    publisher.on_event(call_added(SAVE_RESULT_TOOL_NAME))
+    # the deltas split the JSON escapes of the result
+    for start in range(0, len(arguments), 4):
+        publisher.on_event(arguments_delta(arguments[start : start + 4]))
+    publisher.flush()
+
+    entries = redis.xrange(f"{TASK_UPDATE_STREAM}:plan")
+    updates = [json.loads(fields["data"]) for _, fields in entries]
+    assert {fields["action"] for _, fields in entries} == {PARTIAL_RESULT_ACTION}
+    assert len(updates) > 1
+    assert {(u["step_id"], u["agent_name"], u["call"]) for u in updates} == {
+        (2, "writer", 2)
+    }
+    published = ""
+    for update in updates:
+        # each delta continues exactly where the previous one ended
+        assert update["offset"] == len(published)
+        published += update["delta"]
+    assert published == text
+
+    result = TaskResult()
+    for _, fields in entries:
+        unwrap_stream_data(fields, result)
+    assert result.partials == {2: text}
@@ -0,0 +1,91 @@
+from ferros.agents.planner import merge_plan
+from ferros.models.plan import Plan, PlanStep
+from ferros.models.settings import Settings
+
+
+def step(
+    step_id: int,
+    agent_name: str,
+    depends_on: list[int] | None = None,
+    status: str = "completed",
+) -> PlanStep:
+    return PlanStep(
+        id=step_id,
+        agent_name=agent_name,
+        agent_sdk="openai",
+        agent_version="1",
+        prompt=f"Run {agent_name}",
+        revision=1,
+        status=status,  # type: ignore[arg-type]
+        depends_on=depends_on or [],
+    )
+
+
+def statuses(plan: Plan) -> dict[int, str]:
+    return {s.id: s.status for s in plan.steps}
+
+
+def test_merge_keeps_unfinished_steps_pending(settings: Settings) -> None:
+    previous = Plan(
+        id="plan",
+        goal="goal",
+        steps=[
+            step(1, "search"),
+            step(2, "analyst", [1], status="pending"),
+            step(3, "writer", [1, 2], status="pending"),
+        ],
+    )
+    revised = Plan(
+        id="plan", goal="goal", steps=previous.steps + [step(4, "editor", [3])]
+    )
+
+    merged = merge_plan(previous, revised, 2)
+    assert statuses(merged) == {
+        1: "reused",
+        2: "pending",
+        3: "pending",
+        4: "pending",
+    }
+    assert merged.steps[-1].revision == 2
+
+
+def test_merge_reuses_dependencies_of_new_steps(settings: Settings) -> None:
+    previous = Plan(
+        id="plan",
+        goal="goal",
+        steps=[step(1, "search"), step(2, "analyst", [1]), step(3, "writer", [2])],
+    )
+    revised = Plan(
+        id="plan", goal="goal", steps=previous.steps + [step(4, "writer", [2])]
+    )
+
+    merged = merge_plan(previous, revised, 2)
+    assert statuses(merged) == {1: "reused", 2: "reused", 3: "completed", 4: "pending"}
+
+
+def test_merge_renumbers_steps_that_reuse_previous_ids(settings: Settings) -> None:
+    previous = Plan(
+        id="plan", goal="goal", steps=[step(1, "search"), step(2, "writer", [1])]
+    )
+    # the re-planner replaced step 2 and added a step 3 that depends on it
+    revised = Plan(
+        id="plan",
+        goal="goal",
+        steps=[step(1, "search"), step(2, "analyst", [1]), step(3, "editor", [2])],
+    )
+
+    merged = merge_plan(previous, revised, 2)
+    assert statuses(merged) == {1: "reused", 2: "completed", 3: "pending", 4: "pending"}
+    new = {s.agent_name: s for s in merged.steps if s.status == "pending"}
+    assert new["analyst"].id == 4
+    assert new["editor"].depends_on == [4]
+
+
+def test_merge_without_new_steps_runs_the_plan_again(settings: Settings) -> None:
+    previous = Plan(
+        id="plan", goal="goal", steps=[step(1, "search"), step(2, "writer", [1])]
+    )
+
+    merged = merge_plan(previous, previous.model_copy(deep=True), 2)
+    assert statuses(merged) == {1: "pending", 2: "pending"}
+    assert {s.revision for s in merged.steps} == {2}
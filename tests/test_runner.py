@@ -0,0 +1,76 @@
+import asyncio
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any
+
+import fakeredis
+import pytest
+
+from ferros.agents import runner
+from ferros.core.budget import Budget
+from ferros.core.deadlines import DeadlineExceeded
+from ferros.core.snapshot import get_snapshot
+from ferros.models.plan import Plan, PlanStep
+from ferros.models.settings import Settings
+
+
+def test_unevaluated_plan_fails_when_the_budget_runs_out(
+    redis: fakeredis.FakeRedis, settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    budget = Budget(max_tokens=10)
+    updates: list[tuple[str, str | None]] = []
+    saved: list[Plan] = []
+
+    @asynccontextmanager
+    async def get_mcp_server(**kwargs: Any) -> Any:
+        yield None
+
+    async def plan_task(plan_id: str, revision: int, *args: Any) -> Plan:
+        step = PlanStep(
+            id=1,
+            agent_name="writer",
+            agent_sdk="openai",
+            agent_version="1",
+            prompt="Write",
+            revision=revision,
+            status="pending",
+            depends_on=[],
+        )
+        return Plan(id=plan_id, goal="goal", steps=[step])
+
+    class TaskManager:
+        def __init__(self, server: Any) -> None:
+            pass
+
+        async def run(self, plan: Plan, revision: int) -> None:
+            # the first revision spends the budget and then times out
+            budget.input_tokens = 100
+            raise DeadlineExceeded("Execution", 1)
+
+    async def evaluate_result(*args: Any) -> None:
+        raise AssertionError("the plan should not be evaluated")
+
+    async def send_update(
+        plan_id: str, step_id: int, agent_name: str, status: str, message: Any = None
+    ) -> None:
+        updates.append((status, message))
+
+    async def save_result(plan: Plan, server: Any) -> None:
+        saved.append(plan)
+
+    monkeypatch.setattr(runner, "get_mcp_server", get_mcp_server)
+    monkeypatch.setattr(runner, "trace", lambda **kwargs: nullcontext())
+    monkeypatch.setattr(runner, "custom_span", lambda **kwargs: nullcontext())
+    monkeypatch.setattr(runner, "plan_task", plan_task)
+    monkeypatch.setattr(runner, "TaskManager", TaskManager)
+    monkeypatch.setattr(runner, "evaluate_result", evaluate_result)
+    monkeypatch.setattr(runner, "send_update", send_update)
+    monkeypatch.setattr(runner, "save_result", save_result)
+
+    asyncio.run(runner.run_agent("goal", None, trace_id="task", budget=budget))
+
+    snapshot = get_snapshot("task")
+    assert snapshot is not None
+    assert snapshot.status == "failed"
+    assert snapshot.passed is False
+    assert updates[-1][0] == "failed"
+    assert saved == []
@@ -0,0 +1,108 @@
+import time
+
+import fakeredis
+
+from ferros.messaging.admission import get_stream_backlog
+from ferros.messaging.constants import GROUP_NAME
+from ferros.messaging.scheduler import Scheduler, stream_name, task_stream
+from ferros.messaging.tenants import (
+    acquire_slot,
+    register_tenants,
+    release_slot,
+    running_count,
+)
+from ferros.models.settings import Settings, TenantLimits
+from ferros.models.task import TaskConfig
+
+
+def publish(redis: fakeredis.FakeRedis, task: TaskConfig) -> None:
+    register_tenants({task.tenant_id or "default"})
+    redis.xadd(task_stream(task), {"data": task.model_dump_json()})
+
+
+def pending(redis: fakeredis.FakeRedis, stream: str) -> int:
+    return int(redis.xpending(stream, GROUP_NAME)["pending"])
+
+
+def test_read_delivers_one_task_at_a_time(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    scheduler = Scheduler(redis, "worker")
+    for i in range(2):
+        publish(redis, TaskConfig(goal=f"goal {i}", contexts=[]))
+
+    messages = scheduler.read(100)
+    assert len(messages) == 1
+    assert pending(redis, stream_name("normal")) == 1
+
+
+def test_read_prefers_high_priority(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    scheduler = Scheduler(redis, "worker")
+    publish(redis, TaskConfig(goal="normal", contexts=[]))
+    publish(redis, TaskConfig(goal="high", contexts=[], priority="high"))
+
+    [(stream, _, _)] = scheduler.read(100)
+    assert stream == stream_name("high")
+
+
+def test_wait_wakes_up_without_delivering(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    scheduler = Scheduler(redis, "worker")
+    assert scheduler.read(10) == []
+    streams = [stream_name("high"), stream_name("normal"), stream_name("low")]
+    publish(redis, TaskConfig(goal="goal", contexts=[]))
+
+    start = time.monotonic()
+    scheduler.wait(streams, 2000)
+    assert time.monotonic() - start < 1
+    assert pending(redis, stream_name("normal")) == 0
+    assert len(scheduler.read(10)) == 1
+
+
+def test_read_defers_tasks_of_tenants_over_quota(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.tenants.overrides = {"acme": TenantLimits(max_concurrency=1)}
+    scheduler = Scheduler(redis, "worker")
+    running = TaskConfig(goal="running", contexts=[], tenant_id="acme")
+    queued = TaskConfig(goal="queued", contexts=[], tenant_id="acme")
+    publish(redis, queued)
+    acquire_slot(running)
+
+    assert scheduler.read(10) == []
+    assert get_stream_backlog(task_stream(queued)) == (1, 0)
+
+    release_slot(running)
+    [(_, _, message)] = scheduler.read(10)
+    assert TaskConfig.model_validate_json(message["data"]).goal == "queued"
+
+
+def test_parallel_workers_respect_the_concurrency_limit(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.tenants.overrides = {"acme": TenantLimits(max_concurrency=1)}
+    workers = [Scheduler(redis, "first"), Scheduler(redis, "second")]
+    for i in range(2):
+        publish(redis, TaskConfig(goal=f"goal {i}", contexts=[], tenant_id="acme"))
+
+    # the first worker takes the only slot as it reads, before the task runs
+    [(_, _, message)] = workers[0].read(10)
+    task = TaskConfig.model_validate_json(message["data"])
+    assert running_count("acme") == 1
+    assert workers[1].read(10) == []
+
+    release_slot(task)
+    assert len(workers[1].read(10)) == 1
+
+
+def test_reserved_slot_is_freed_when_no_task_is_read(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.tenants.overrides = {"acme": TenantLimits(max_concurrency=1)}
+    register_tenants({"acme"})
+
+    assert Scheduler(redis, "worker").read(10) == []
+    assert running_count("acme") == 0
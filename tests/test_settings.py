@@ -0,0 +1,17 @@
+import pytest
+
+from ferros.core.parsers import load_config_file
+from ferros.core.utils import TEMPLATES_DIR
+from ferros.models.settings import PlanningSettings
+
+
+def test_rendered_planning_defaults_match_the_settings(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    for name in ("PLAN_CACHE_TTL", "PLAN_CACHE_MAX_SIZE", "PLAN_CACHE_ENABLED"):
+        monkeypatch.delenv(name, raising=False)
+    config = load_config_file((TEMPLATES_DIR / "config.yaml.j2").as_posix())
+
+    defaults = PlanningSettings().model_dump()
+    for name in ("cache_enabled", "cache_max_size", "cache_ttl"):
+        assert config["planning"][name] == defaults[name]
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Any
+
+import fakeredis
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from ferros.app import app
+from ferros.core import store
+from ferros.core.snapshot import update_snapshot
+from ferros.core.store import send_update
+from ferros.models.settings import Settings
+
+
+def post(url: str, **kwargs: Any) -> httpx.Response:
+    return httpx.Response(200, json={}, request=httpx.Request("POST", url))
+
+
+def test_step_updates_show_in_the_task_status(
+    redis: fakeredis.FakeRedis, settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(store.httpx, "post", post)
+    client = TestClient(app)
+    assert client.get("/tasks/task").status_code == 404
+
+    update_snapshot("task", "running", goal="goal")
+    asyncio.run(send_update("task", 1, "search", "running"))
+    asyncio.run(send_update("task", 1, "search", "completed"))
+    asyncio.run(send_update("task", 2, "writer", "running"))
+    asyncio.run(send_update("task", 2, "writer", "failed", "timed out"))
+    asyncio.run(send_update("task", 3, "editor", "running"))
+
+    snapshot = client.get("/tasks/task").json()
+    assert snapshot["status"] == "running"
+    assert snapshot["goal"] == "goal"
+    assert [(s["id"], s["status"]) for s in snapshot["steps"]] == [
+        (1, "completed"),
+        (2, "failed"),
+        (3, "running"),
+    ]
+    assert snapshot["steps"][1]["message"] == "timed out"
+    assert set(snapshot["steps"][0]["timings"]) == {"running", "completed"}
+
+    update_snapshot("task", "completed", passed=True)
+    snapshot = client.get("/tasks/task").json()
+    assert snapshot["status"] == "completed"
+    assert snapshot["passed"] is True
+    assert len(snapshot["steps"]) == 3
+    assert set(snapshot["timings"]) == {"running", "completed", "updated"}
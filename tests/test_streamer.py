@@ -0,0 +1,63 @@
+import json
+from typing import Any
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from ferros.app import app
+from ferros.messaging import multiplexer
+from ferros.messaging.constants import TASK_UPDATE_STREAM
+from ferros.models.settings import Settings
+
+
+def update(agent_name: str, status: str) -> dict[str, str]:
+    data = {"step": 1, "agent_name": agent_name, "status": status}
+    return {"action": "update-status", "data": json.dumps(data)}
+
+
+def read_events(client: TestClient, headers: dict[str, str]) -> list[dict[str, Any]]:
+    events: list[dict[str, Any]] = []
+    with client.stream("GET", "/tasks/task/events", headers=headers) as response:
+        assert response.status_code == 200
+        event: dict[str, Any] = {}
+        for line in response.iter_lines():
+            if line.startswith("id: "):
+                event["id"] = line.removeprefix("id: ")
+            elif line.startswith("data: "):
+                event["data"] = json.loads(line.removeprefix("data: "))
+            elif not line and "id" in event:
+                events.append(event)
+                event = {}
+    return events
+
+
+def test_events_resume_after_the_last_event_id(
+    redis: fakeredis.FakeRedis, settings: Settings, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    settings.streaming.block_ms = 50
+    monkeypatch.setattr(multiplexer, "multiplexer", None)
+    stream = f"{TASK_UPDATE_STREAM}:task"
+    ids = [
+        redis.xadd(stream, update("search", "running")),
+        redis.xadd(stream, update("search", "completed")),
+        redis.xadd(stream, update("knowledge worker", "failed")),
+        redis.xadd(stream, update("search", "running")),
+    ]
+    # one event loop serves both connections, as it does in the server
+    with TestClient(app) as client:
+        # the stream ends on the final status of the task
+        events = read_events(client, {})
+        assert [e["id"] for e in events] == ids[:3]
+        assert json.loads(events[-1]["data"]["data"])["status"] == "failed"
+
+        resumed = read_events(client, {"Last-Event-ID": ids[0]})
+        assert [e["id"] for e in resumed] == ids[1:3]
+
+
+def test_invalid_last_event_id_is_rejected(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    client = TestClient(app)
+    response = client.get("/tasks/task/events", headers={"Last-Event-ID": "latest"})
+    assert response.status_code == 400
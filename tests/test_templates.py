@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from ferros.agents.templates import PlanTemplateIndex
+from ferros.models.plan import Plan, PlanStep
+from ferros.models.settings import Settings
+
+
+def make_plan(plan_id: str) -> Plan:
+    step = PlanStep(
+        id=1,
+        agent_name="writer",
+        agent_sdk="openai",
+        agent_version="1",
+        prompt="Write the summary",
+        revision=1,
+        status="completed",
+        depends_on=[],
+    )
+    return Plan(id=plan_id, goal="goal", steps=[step])
+
+
+def test_plan_of_the_same_goal_replaces_the_entry(
+    settings: Settings, tmp_path: Path
+) -> None:
+    index = PlanTemplateIndex(str(tmp_path / "templates.json"), max_entries=10)
+    index.add("Summarize the report", make_plan("a"), 1, "catalog", "none")
+    index.add("summarize  the REPORT", make_plan("b"), 2, "catalog", "none")
+    index.add("Summarize the report", make_plan("c"), 1, "other", "none")
+    index.add("Translate the report", make_plan("d"), 1, "catalog", "none")
+
+    matches = index.search("summarize the report", top_k=10)
+    assert len(matches) == 3
+    assert [m.plan.id for m in matches[:2]] == ["b", "c"]
+    assert index.df["summarize"] == 2
+
+    # the replaced entry is gone from the persisted index too
+    reloaded = PlanTemplateIndex(str(tmp_path / "templates.json"), max_entries=10)
+    assert sorted(e["plan"]["id"] for e in reloaded.entries) == ["b", "c", "d"]
@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+import fakeredis
+
+from ferros.messaging.tenants import (
+    acquire_slot,
+    hold_slot,
+    release_slot,
+    running_count,
+)
+from ferros.models.settings import Settings
+from ferros.models.task import TaskConfig
+
+
+def test_held_slot_outlives_its_lease(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.tenants.lease = 1
+    task = TaskConfig(goal="goal", contexts=[], tenant_id="acme")
+
+    async def run() -> int:
+        acquire_slot(task)
+        heartbeat = asyncio.create_task(hold_slot(task))
+        await asyncio.sleep(1.5)
+        heartbeat.cancel()
+        return running_count("acme")
+
+    assert asyncio.run(run()) == 1
+    release_slot(task)
+    assert running_count("acme") == 0
+
+
+def test_unheld_slot_expires_after_its_lease(
+    redis: fakeredis.FakeRedis, settings: Settings
+) -> None:
+    settings.tenants.lease = 1
+    acquire_slot(TaskConfig(goal="goal", contexts=[], tenant_id="acme"))
+    assert running_count("acme") == 1
+    time.sleep(1.1)
+    assert running_count("acme") == 0